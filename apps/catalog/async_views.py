@@ -0,0 +1,56 @@
+from django.shortcuts import aget_object_or_404
+
+from apps.catalog.models import Category, Product
+from apps.catalog.serializers import category_list_projection, product_list_projection
+from apps.catalog.views import CategoryListView, CategoryView, ProductDetailView, ProductListView
+from apps.common import timing
+from apps.common.async_views import AsyncAPIView
+from apps.common.db_router import areplica_reads
+
+
+# Async-версии публичных GET каталога (ASGI, CATALOG_ASYNC_VIEWS): ключи кэша, фильтры,
+# троттлы и формат ответа — из sync-вьюх; DELETE категории и прочее — через sync-вьюху.
+
+class AsyncCategoryListView(AsyncAPIView):
+    """GET /api/v1/categories/ — см. CategoryListView."""
+    sync_view_class = CategoryListView
+
+    async def abuild(self, view):
+        queryset = view.filter_queryset(view.get_queryset())
+        async with areplica_reads("catalog"):
+            with timing.phase("serialize"):
+                return await category_list_projection.adata(queryset)
+
+
+class AsyncCategoryView(AsyncAPIView):
+    """GET /api/v1/categories/{id}/ — см. CategoryView (DELETE — sync-вьюха)."""
+    sync_view_class = CategoryView
+
+    async def abuild(self, view):
+        async with areplica_reads("catalog"):
+            instance = await aget_object_or_404(Category, pk=view.kwargs["pk"], is_active=True)
+        with timing.phase("serialize"):
+            return view.get_serializer(instance).data
+
+
+class AsyncProductListView(AsyncAPIView):
+    """GET /api/v1/products/ — см. ProductListView."""
+    sync_view_class = ProductListView
+
+    async def abuild(self, view):
+        async with areplica_reads("catalog"):
+            with timing.phase("serialize"):
+                return await product_list_projection.adata(view.get_list_queryset())
+
+
+class AsyncProductDetailView(AsyncAPIView):
+    """GET /api/v1/products/{id}/ — см. ProductDetailView."""
+    sync_view_class = ProductDetailView
+
+    async def abuild(self, view):
+        async with areplica_reads("catalog"):
+            instance = await aget_object_or_404(
+                Product.objects.select_related("category"), pk=view.kwargs["pk"], is_active=True,
+            )
+        with timing.phase("serialize"):
+            return view.get_serializer(instance).data
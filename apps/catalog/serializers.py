@@ -2,6 +2,7 @@ from django.utils.text import slugify
 from rest_framework import serializers
 
 from apps.catalog.models import Category, Product
+from apps.common.projections import Projection
 
 
 class CategoryListSerializer(serializers.ModelSerializer):
@@ -13,6 +14,10 @@ class CategoryListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+# быстрое чтение списка (values_list вместо экземпляров моделей, тот же JSON)
+category_list_projection = Projection(CategoryListSerializer)
+
+
 class CategoryDetailSerializer(serializers.ModelSerializer):
     """Сериализатор деталей категории для публичного API (id, name, slug, created_at, updated_at)."""
 
@@ -67,6 +72,9 @@ class ProductListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+product_list_projection = Projection(ProductListSerializer)
+
+
 class ProductDetailSerializer(serializers.ModelSerializer):
     """
     Детали продукта для публичного API.
@@ -0,0 +1,106 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import include, path
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.catalog.async_views import (
+    AsyncCategoryListView, AsyncCategoryView, AsyncProductDetailView, AsyncProductListView,
+)
+from apps.catalog.views import AnonCatalogThrottle, CategoryListView, UserCatalogThrottle
+
+# sync-вьюхи каталога — /api/v1/ (CATALOG_ASYNC_VIEWS выключен), async — /async/
+urlpatterns = [
+    path("api/v1/", include("apps.catalog.urls")),
+    path("async/categories/", AsyncCategoryListView.as_view()),
+    path("async/categories/<int:pk>/", AsyncCategoryView.as_view()),
+    path("async/products/", AsyncProductListView.as_view()),
+    path("async/products/<int:pk>/", AsyncProductDetailView.as_view()),
+]
+
+pytestmark = pytest.mark.urls(__name__)
+
+
+def aget(url, **kwargs):
+    return async_to_sync(AsyncClient().get)(url, **kwargs)
+
+
+@pytest.mark.parametrize("url", [
+    "products/", "products/?search=PHONE&price_min=100", "categories/", "categories/?search=elec",
+])
+def test_async_list_matches_sync_and_shares_cache(product, url):
+    first = aget(f"/async/{url}")
+    assert first.status_code == 200
+    assert first["X-Cache"] == "MISS"
+    assert first["Content-Type"] == "application/json"
+
+    # запись, сделанная async-вьюхой, — HIT для sync-вьюхи с тем же телом
+    sync = APIClient().get(f"/api/v1/{url}")
+    assert sync["X-Cache"] == "HIT"
+    assert first.content == sync.content
+    assert aget(f"/async/{url}")["X-Cache"] == "HIT"
+
+
+def test_async_detail_matches_sync(product, category):
+    for url in (f"products/{product.pk}/", f"categories/{category.pk}/"):
+        sync = APIClient().get(f"/api/v1/{url}")
+        response = aget(f"/async/{url}")
+        assert response.status_code == 200
+        assert response["X-Cache"] == "HIT"
+        assert response.content == sync.content
+        assert response["Allow"] == sync["Allow"]
+
+
+def test_async_not_found_matches_drf(inactive_product):
+    response = aget(f"/async/products/{inactive_product.pk}/")
+    assert response.status_code == 404
+    assert response.content == APIClient().get(f"/api/v1/products/{inactive_product.pk}/").content
+
+
+def test_async_throttle_shares_history_with_sync(monkeypatch, category):
+    monkeypatch.setattr(AnonCatalogThrottle, "rate", "3/min")
+    assert aget("/async/categories/").status_code == 200
+    assert APIClient().get("/api/v1/categories/").status_code == 200
+    assert aget("/async/categories/").status_code == 200
+
+    throttled = aget("/async/categories/")
+    assert throttled.status_code == 429
+    assert int(throttled["Retry-After"]) > 0
+    assert throttled.json()["detail"].startswith("Request was throttled")
+
+
+def test_non_json_and_write_requests_go_to_sync_view(category):
+    browsable = aget("/async/categories/", headers={"Accept": "text/html"})
+    assert browsable.status_code == 200
+    assert browsable["Content-Type"].startswith("text/html")
+
+    response = async_to_sync(AsyncClient().delete)(f"/async/categories/{category.pk}/")
+    # первый аутентификатор — JWT: аноним получает 401 с WWW-Authenticate, как в DRF
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"].startswith("Bearer")
+
+
+def test_async_views_report_server_timing(settings, product):
+    settings.SERVER_TIMING_HEADER = True
+    header = aget("/async/products/")["Server-Timing"]
+    for phase in ("db;", "cache;", "serialize;", "render;"):
+        assert phase in header
+
+
+def test_bearer_tokens_are_handled_natively(monkeypatch, django_user_model, category):
+    def sync_list(*args, **kwargs):
+        raise AssertionError("Bearer-запрос ушёл в sync-вьюху")
+    monkeypatch.setattr(CategoryListView, "list", sync_list)
+    monkeypatch.setattr(UserCatalogThrottle, "rate", "1/min")
+    user = django_user_model.objects.create_user("jwt", password="x")
+    headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+    assert aget("/async/categories/", headers=headers).status_code == 200
+    # лимит — по id пользователя из claims (UserCatalogThrottle), аноним не затронут
+    assert aget("/async/categories/", headers=headers).status_code == 429
+    assert aget("/async/categories/").status_code == 200
+
+    invalid = aget("/async/categories/", headers={"Authorization": "Bearer broken"})
+    assert invalid.status_code == 401
+    assert invalid["WWW-Authenticate"].startswith("Bearer")
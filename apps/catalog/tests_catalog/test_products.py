@@ -33,7 +33,7 @@ def test_product_list_filters_and_cache_version_bump(api_client, product):
     assert api_client.get(url, {"price_max": "1000"}).status_code == 200
 
     # --- проверяем версионирование списка (сигналы инкрементируют версию) ---
-    # Изменяем продукт (post_save триггерит _incr_version("products:list:version"))
+    # Изменяем продукт (post_save триггерит bump_version("products:list:version"))
     product.price = 888
     product.save()
 
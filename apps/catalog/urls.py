@@ -1,10 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from .views import (
-    CategoryListView,
-    CategoryView,
-    ProductListView,
-    ProductDetailView,
-)
+
+if settings.CATALOG_ASYNC_VIEWS:
+    # ASGI: нативные async GET (apps.catalog.async_views), остальное — через sync-вьюхи
+    from .async_views import (
+        AsyncCategoryListView as CategoryListView,
+        AsyncCategoryView as CategoryView,
+        AsyncProductListView as ProductListView,
+        AsyncProductDetailView as ProductDetailView,
+    )
+else:
+    from .views import (
+        CategoryListView,
+        CategoryView,
+        ProductListView,
+        ProductDetailView,
+    )
 
 urlpatterns = [
     # Категории
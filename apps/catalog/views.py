@@ -1,8 +1,3 @@
-import hashlib
-import random
-from urllib.parse import urlencode
-
-from django.core.cache import cache
 from django.db.models.functions import Lower
 from django.shortcuts import get_object_or_404
 
@@ -12,68 +7,45 @@ from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.catalog.models import Category, Product
+from apps.common import timing
+from apps.common.async_views import AsyncThrottleMixin
+from apps.common.caching import VersionedCacheMixin
+from apps.common.db_router import replica_reads
 from apps.catalog.serializers import (
     CategoryListSerializer,
     CategoryDetailSerializer,
     ProductListSerializer, ProductDetailSerializer,
+    category_list_projection, product_list_projection,
 )
 
 
-# ---------- cache utils ----------
-
-def _ttl_with_jitter(base: int = 300, jitter: float = 0.10) -> int:
-    """TTL с анти-догпайлом: ±jitter от базового значения (по умолчанию ±10%)."""
-    delta = int(base * jitter)
-    return base + random.randint(-delta, delta)
-
-
-def _hash_params(params: dict) -> str:
-    """Стабильный sha256-хэш нормализованных параметров запроса (для ключей кэша)."""
-    encoded = urlencode(sorted(params.items()), doseq=True)
-    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
-
-
-def _products_list_version() -> int:
-    """
-    Версия списков продуктов для кэша.
-    Инкрементируется сигналами при create/update/delete/soft_delete Product.
-    Если версии нет — инициализируем 1 (см. сигнал).
-    """
-    key = "products:list:version"
-    v = cache.get(key)
-    return v if isinstance(v, int) and v > 0 else 1
-
-
-def _categories_list_version() -> int:
-    key = "categories:list:version"
-    v = cache.get(key)
-    return v if isinstance(v, int) and v > 0 else 1
-
-
 # ---------- throttling ----------
 
-class AnonCatalogThrottle(AnonRateThrottle):
-    """Троттлинг для анонимных пользователей каталога."""
+class AnonCatalogThrottle(AsyncThrottleMixin, AnonRateThrottle):
+    """Троттлинг для анонимных пользователей каталога (и async-вьюх каталога)."""
     rate = "60/min"
 
 
-class UserCatalogThrottle(UserRateThrottle):
-    """Троттлинг для аутентифицированных пользователей каталога."""
+class UserCatalogThrottle(AsyncThrottleMixin, UserRateThrottle):
+    """Троттлинг для аутентифицированных пользователей каталога (и async-вьюх каталога)."""
     rate = "240/min"
 
 
 # ---------- categories ----------
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(VersionedCacheMixin, generics.ListAPIView):
     """
     GET /api/v1/categories/
     Назначение:
       - вернуть список активных категорий.
     Функционал:
       - поиск по name (?search=..., регистр не важен);
-      - ручной кэш Memcached с ключом, учитывающим параметры;
+      - ручной кэш Memcached: categories:list:{hash(params)}, версия списка в значении
+        (VersionedCacheMixin), TTL 5 минут ±10%;
       - заголовок X-Cache: HIT|MISS.
     """
+    cache_prefix = "categories:list"
+    cache_version_key = "categories:list:version"
     serializer_class = CategoryListSerializer
     throttle_classes = [AnonCatalogThrottle, UserCatalogThrottle]
     filter_backends = [filters.SearchFilter]
@@ -83,31 +55,23 @@ class CategoryListView(generics.ListAPIView):
     def get_queryset(self):
         return Category.objects.filter(is_active=True).order_by(Lower('name'))
 
-    def list(self, request, *args, **kwargs):
+    def get_cache_params(self) -> dict:
         # нормализуем параметры для ключа кэша
-        params = {
-            "search": (request.query_params.get("search") or "").strip().lower(),
+        return {
+            "search": (self.request.query_params.get("search") or "").strip().lower(),
         }
-        version = _categories_list_version()
-        cache_key = f"categories:list:v{version}:{_hash_params(params)}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            resp = Response(cached)
-            resp["X-Cache"] = "HIT"
-            return resp
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(self._build)
 
+    def _build(self):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
-
-        cache.set(cache_key, data, timeout=_ttl_with_jitter(300, 0.10))
-        resp = Response(data)
-        resp["X-Cache"] = "MISS"
-        return resp
+        # values_list-проекция вместо CategoryListSerializer(many=True): тот же JSON
+        with replica_reads("catalog"), timing.phase("serialize"):
+            return category_list_projection.data(queryset)
 
 
-class CategoryView(generics.RetrieveAPIView):
+class CategoryView(VersionedCacheMixin, generics.RetrieveAPIView):
     """
     GET /api/v1/categories/{id}/
     DELETE /api/v1/categories/{id}/
@@ -124,25 +88,22 @@ class CategoryView(generics.RetrieveAPIView):
     throttle_classes = [AnonCatalogThrottle, UserCatalogThrottle]
     lookup_field = "pk"
 
+    def get_cache_key(self) -> str:
+        return f"category:{self.kwargs['pk']}"
+
     def get_permissions(self):
         if self.request.method == "DELETE":
             return [permissions.IsAdminUser()]
         return super().get_permissions()
 
     def get(self, request, *args, **kwargs):
-        pk = kwargs.get("pk")
-        cache_key = f"category:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            resp = Response(cached)
-            resp["X-Cache"] = "HIT"
-            return resp
-        instance = get_object_or_404(Category, pk=pk, is_active=True)
-        data = self.get_serializer(instance).data
-        cache.set(cache_key, data, timeout=_ttl_with_jitter(300, 0.10))
-        resp = Response(data)
-        resp["X-Cache"] = "MISS"
-        return resp
+        return self.cached_response(self._build)
+
+    def _build(self):
+        with replica_reads("catalog"):
+            instance = get_object_or_404(Category, pk=self.kwargs["pk"], is_active=True)
+        with timing.phase("serialize"):
+            return self.get_serializer(instance).data
 
     def delete(self, request, pk, *args, **kwargs):
         category = get_object_or_404(Category, pk=pk)
@@ -161,7 +122,7 @@ class CategoryView(generics.RetrieveAPIView):
 
 # ---------- products ----------
 
-class ProductListView(generics.ListAPIView):
+class ProductListView(VersionedCacheMixin, generics.ListAPIView):
     """
     GET /api/v1/products/
     Назначение:
@@ -173,11 +134,14 @@ class ProductListView(generics.ListAPIView):
           * ?price_min=<num> (price__gte)
           * ?price_max=<num> (price__lte)
       - сортировка по name (ASC);
-      - ручной кэш Memcached: ключ = products:list:v{N}:{hash(filters)}, TTL 5 минут ±10%;
+      - ручной кэш Memcached: ключ = products:list:{hash(filters)}, версия списка в значении
+        (VersionedCacheMixin), TTL 5 минут ±10%;
       - заголовок X-Cache: HIT|MISS.
     Ответ (по текущему сериализатору):
       - [{id, name, price, category}] — category = имя категории.
     """
+    cache_prefix = "products:list"
+    cache_version_key = "products:list:version"
     throttle_classes = [AnonCatalogThrottle, UserCatalogThrottle]
     serializer_class = ProductListSerializer
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
@@ -197,60 +161,51 @@ class ProductListView(generics.ListAPIView):
             .order_by(Lower('name'))
         )
 
-    def list(self, request, *args, **kwargs):
+    def get_cache_params(self) -> dict:
         # Собираем и нормализуем параметры фильтрации/поиска для ключа кэша
-        search = (request.query_params.get("search") or "").strip().lower()
-        category_id = (request.query_params.get("category") or "").strip()
-        category_slug = (request.query_params.get("category_slug") or "").strip().lower()
-        price_min = (request.query_params.get("price_min") or "").strip()
-        price_max = (request.query_params.get("price_max") or "").strip()
-
-        version = _products_list_version()
-        params = {
-            "search": search,
-            "category": category_id,
-            "category_slug": category_slug,
-            "price_min": price_min,
-            "price_max": price_max,
+        query_params = self.request.query_params
+        return {
+            "search": (query_params.get("search") or "").strip().lower(),
+            "category": (query_params.get("category") or "").strip(),
+            "category_slug": (query_params.get("category_slug") or "").strip().lower(),
+            "price_min": (query_params.get("price_min") or "").strip(),
+            "price_max": (query_params.get("price_max") or "").strip(),
         }
-        cache_key = f"products:list:v{version}:{_hash_params(params)}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            resp = Response(cached)
-            resp["X-Cache"] = "HIT"
-            return resp
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(self._build)
+
+    def _build(self):
+        # values_list-проекция вместо ProductListSerializer(many=True): тот же JSON
+        with replica_reads("catalog"), timing.phase("serialize"):
+            return product_list_projection.data(self.get_list_queryset())
+
+    def get_list_queryset(self):
+        """Queryset списка с фильтрами и поиском из запроса (общий для sync и async вьюх)."""
+        params = self.get_cache_params()
 
         # Применяем фильтры к queryset
         qs = self.get_queryset()
-        if category_id:
-            qs = qs.filter(category_id=category_id)
-        if category_slug:
-            qs = qs.filter(category__slug=category_slug)
-        if price_min:
+        if params["category"]:
+            qs = qs.filter(category_id=params["category"])
+        if params["category_slug"]:
+            qs = qs.filter(category__slug=params["category_slug"])
+        if params["price_min"]:
             try:
-                qs = qs.filter(price__gte=price_min)
+                qs = qs.filter(price__gte=params["price_min"])
             except Exception:
                 pass  # игнорируем некорректный параметр, не падаем
-        if price_max:
+        if params["price_max"]:
             try:
-                qs = qs.filter(price__lte=price_max)
+                qs = qs.filter(price__lte=params["price_max"])
             except Exception:
                 pass
 
         # Поиск по имени через SearchFilter
-        qs = self.filter_queryset(qs)
-
-        serializer = self.get_serializer(qs, many=True)
-        data = serializer.data
-        cache.set(cache_key, data, timeout=_ttl_with_jitter(300, 0.10))
-
-        resp = Response(data)
-        resp["X-Cache"] = "MISS"
-        return resp
+        return self.filter_queryset(qs)
 
 
-class ProductDetailView(generics.RetrieveAPIView):
+class ProductDetailView(VersionedCacheMixin, generics.RetrieveAPIView):
     """
     GET /api/v1/products/{id}/
     Назначение:
@@ -264,23 +219,17 @@ class ProductDetailView(generics.RetrieveAPIView):
     throttle_classes = [AnonCatalogThrottle, UserCatalogThrottle]
     lookup_field = "pk"
 
-    def retrieve(self, request, *args, **kwargs):
-        pk = kwargs.get("pk")
-        cache_key = f"product:{pk}"
+    def get_cache_key(self) -> str:
+        return f"product:{self.kwargs['pk']}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            resp = Response(cached)
-            resp["X-Cache"] = "HIT"
-            return resp
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(self._build)
 
+    def _build(self):
         # Публичный контракт: неактивные продукты в публичном API не выдаём
-        instance = get_object_or_404(Product.objects.select_related("category"), pk=pk, is_active=True)
+        with replica_reads("catalog"):
+            instance = get_object_or_404(Product.objects.select_related("category"), pk=self.kwargs["pk"], is_active=True)
 
         serializer = self.get_serializer(instance)
-        data = serializer.data
-        cache.set(cache_key, data, timeout=_ttl_with_jitter(300, 0.10))
-
-        resp = Response(data)
-        resp["X-Cache"] = "MISS"
-        return resp
+        with timing.phase("serialize"):
+            return serializer.data
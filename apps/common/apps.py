@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.common'
+
+    def ready(self):
+        """Подключение сигналов Celery для метрик задач и замера SQL для Server-Timing"""
+        from django.db.backends.signals import connection_created
+
+        from . import metrics  # noqa: F401
+        from .timing import install_db_wrapper
+
+        connection_created.connect(install_db_wrapper, dispatch_uid="server_timing_db_wrapper")
@@ -0,0 +1,208 @@
+import asyncio
+import weakref
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.memcached import PyMemcacheCache
+from pymemcache.exceptions import MemcacheServerError, MemcacheUnexpectedCloseError, MemcacheUnknownError
+
+from apps.common import cache_metrics, timing
+
+# соединений на сервер memcached в одном event loop
+POOL_SIZE = 32
+
+
+class _Pool:
+    """Соединения с одним сервером memcached в одном event loop (текстовый протокол)."""
+
+    def __init__(self, host: str, port: int, connect_timeout, timeout):
+        self.host, self.port = host, port
+        self.connect_timeout, self.timeout = connect_timeout, timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(POOL_SIZE)
+
+    async def execute(self, payload: bytes, read):
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            reader, writer = conn
+            try:
+                writer.write(payload)
+                result = await asyncio.wait_for(read(reader), self.timeout)
+            except BaseException:
+                # ответ мог остаться в сокете недочитанным — соединение больше не используем
+                writer.close()
+                raise
+            self._idle.append(conn)
+            return result
+
+    async def _connect(self):
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.connect_timeout)
+
+
+async def _readline(reader) -> bytes:
+    line = await reader.readline()
+    if not line:
+        raise MemcacheUnexpectedCloseError()
+    if line.startswith((b"SERVER_ERROR", b"CLIENT_ERROR")):
+        raise MemcacheServerError(line.strip().decode(errors="replace"))
+    if line.startswith(b"ERROR"):
+        raise MemcacheUnknownError(line.strip().decode(errors="replace"))
+    return line[:-2]
+
+
+async def _read_values(reader) -> dict:
+    """Ответ get: VALUE <key> <flags> <bytes>\\r\\n<data>\\r\\n ... END."""
+    found = {}
+    while True:
+        line = await _readline(reader)
+        if line == b"END":
+            return found
+        _, key, flags, size = line.split()[:4]
+        data = await reader.readexactly(int(size) + 2)
+        found[key] = (data[:-2], int(flags))
+
+
+class AsyncMemcached:
+    """
+    asyncio-клиент к серверам PyMemcacheCache: ключи (KEY_PREFIX, версия), выбор сервера
+    (RendezvousHash HashClient'а) и сериализация (pickle_serde) — те же, что у sync-бэкенда,
+    так что sync- и async-вьюхи делят записи кэша. Пулы соединений — на каждый event loop.
+    """
+
+    def __init__(self, backend: PyMemcacheCache):
+        self.backend = backend
+        client = backend._cache  # pymemcache HashClient: серверы, hasher, serde, таймауты
+        self._hasher = client.hasher
+        self._servers = {node: c.server for node, c in client.clients.items()}
+        self._serde = client.default_kwargs.get("serde")
+        self._connect_timeout = client.default_kwargs.get("connect_timeout")
+        self._timeout = client.default_kwargs.get("timeout")
+        self._pools = weakref.WeakKeyDictionary()
+
+    def _pool(self, key: str) -> _Pool:
+        loop = asyncio.get_running_loop()
+        pools = self._pools.setdefault(loop, {})
+        node = self._hasher.get_node(key)
+        if node not in pools:
+            host, port = self._servers[node]
+            pools[node] = _Pool(host, port, self._connect_timeout, self._timeout)
+        return pools[node]
+
+    # ---------- команды ----------
+
+    async def get_many(self, keys) -> dict:
+        key_map = {self.backend.make_and_validate_key(key): key for key in keys}
+        by_pool = {}
+        for full in key_map:
+            by_pool.setdefault(self._pool(full), []).append(full)
+
+        async def fetch(pool, batch):
+            payload = b"get " + b" ".join(k.encode() for k in batch) + b"\r\n"
+            return await pool.execute(payload, _read_values)
+
+        found = {}
+        for part in await asyncio.gather(*(fetch(pool, batch) for pool, batch in by_pool.items())):
+            for raw_key, (data, flags) in part.items():
+                full = raw_key.decode()
+                found[key_map[full]] = self._serde.deserialize(full, data, flags)
+        return found
+
+    async def _store(self, command: bytes, key: str, value, timeout) -> bool:
+        full = self.backend.make_and_validate_key(key)
+        data, flags = self._serde.serialize(full, value)
+        if isinstance(data, str):
+            data = data.encode()
+        expire = self.backend.get_backend_timeout(timeout)
+        payload = b"%s %s %d %d %d\r\n%s\r\n" % (command, full.encode(), flags, expire, len(data), data)
+        return await self._pool(full).execute(payload, _readline) == b"STORED"
+
+    async def set(self, key: str, value, timeout=DEFAULT_TIMEOUT) -> bool:
+        return await self._store(b"set", key, value, timeout)
+
+    async def add(self, key: str, value, timeout=DEFAULT_TIMEOUT) -> bool:
+        return await self._store(b"add", key, value, timeout)
+
+    async def incr(self, key: str, delta: int = 1) -> int:
+        full = self.backend.make_and_validate_key(key)
+        command = b"incr" if delta >= 0 else b"decr"
+        line = await self._pool(full).execute(b"%s %s %d\r\n" % (command, full.encode(), abs(delta)), _readline)
+        if line == b"NOT_FOUND":
+            raise ValueError("Key '%s' not found" % full)
+        return int(line)
+
+    async def delete(self, key: str) -> bool:
+        full = self.backend.make_and_validate_key(key)
+        return await self._pool(full).execute(b"delete %s\r\n" % full.encode(), _readline) == b"DELETED"
+
+
+class AsyncCache:
+    """
+    Async-доступ к кэшу "default" для async-вьюх.
+    PyMemcacheCache (и Timed*) — нативный asyncio-клиент, без потока на обращение:
+    фаза "cache" Server-Timing и счётчики cache_metrics ведутся здесь.
+    Прочие бэкенды — их aget_many/aset/... (sync_to_async; счёт ведёт TimedCacheMixin).
+    """
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+        self._client = None
+
+    @property
+    def _native(self):
+        # caches[alias] в async — свой экземпляр на контекст: клиент (и его пулы) держим один на процесс
+        if self._client is None:
+            backend = caches[self.alias]
+            if not isinstance(backend, PyMemcacheCache):
+                return None
+            self._client = AsyncMemcached(backend)
+        return self._client
+
+    async def get_many(self, keys) -> dict:
+        keys = list(keys)
+        native = self._native
+        if native is None:
+            return await caches[self.alias].aget_many(keys)
+        with timing.phase("cache"):
+            found = await native.get_many(keys)
+        for key in keys:
+            cache_metrics.record_lookup(key, key in found)
+        return found
+
+    async def get(self, key: str, default=None):
+        found = await self.get_many([key])
+        return found.get(key, default)
+
+    async def set(self, key: str, value, timeout=DEFAULT_TIMEOUT) -> None:
+        native = self._native
+        if native is None:
+            return await caches[self.alias].aset(key, value, timeout)
+        cache_metrics.record_set(key)
+        with timing.phase("cache"):
+            await native.set(key, value, timeout)
+
+    async def add(self, key: str, value, timeout=DEFAULT_TIMEOUT) -> bool:
+        native = self._native
+        if native is None:
+            return await caches[self.alias].aadd(key, value, timeout)
+        with timing.phase("cache"):
+            return await native.add(key, value, timeout)
+
+    async def incr(self, key: str, delta: int = 1) -> int:
+        native = self._native
+        if native is None:
+            return await caches[self.alias].aincr(key, delta)
+        with timing.phase("cache"):
+            value = await native.incr(key, delta)
+        cache_metrics.record_incr(key)
+        return value
+
+    async def delete(self, key: str) -> bool:
+        native = self._native
+        if native is None:
+            return await caches[self.alias].adelete(key)
+        cache_metrics.record_delete(key)
+        with timing.phase("cache"):
+            return await native.delete(key)
+
+
+acache = AsyncCache()
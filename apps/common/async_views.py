@@ -0,0 +1,170 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from apps.common import timing
+from apps.common.async_cache import acache
+from apps.common.caching import mark
+from apps.common.renderers import FastJSONRenderer
+
+
+# ---------- throttling ----------
+
+class AsyncThrottleMixin:
+    """
+    aallow_request — SimpleRateThrottle.allow_request через AsyncCache (кэш "default"):
+    тот же ключ throttle_{scope}_{ident} и та же история, что у sync-вьюх, так что лимит общий.
+    Ставить перед классом троттла: class AnonX(AsyncThrottleMixin, AnonRateThrottle).
+    """
+
+    async def aallow_request(self, request, view) -> bool:
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.history = await acache.get(self.key, [])
+        self.now = self.timer()
+        while self.history and self.history[-1] <= self.now - self.duration:
+            self.history.pop()
+        if len(self.history) >= self.num_requests:
+            return self.throttle_failure()
+        self.history.insert(0, self.now)
+        await acache.set(self.key, self.history, self.duration)
+        return True
+
+
+# ---------- вьюхи ----------
+
+class AsyncAPIView(View):
+    """
+    Нативный async GET поверх DRF-вьюхи sync_view_class (ASGI, без потока на запрос).
+
+    Логику берём из DRF-вьюхи: ключ кэша, фильтры, троттлы, права, обработчик ошибок;
+    подкласс реализует только abuild(view) — данные ответа на MISS кэша (async ORM).
+    Кэш — VersionedCacheMixin.acached_data, JSON — FastJSONRenderer: ответ и записи кэша
+    совпадают с sync-вьюхой байт-в-байт.
+
+    Аутентификация без потока: Bearer — JWTStatelessUserAuthentication (подпись и claims,
+    без БД), cookie сессии — request.auser(), иначе аноним.
+    В sync-вьюху (sync_to_async) уходят запросы, где нужна полная машинерия DRF:
+    не GET/HEAD, Authorization другой схемы (Basic) или без stateless JWT у вьюхи, ?format=,
+    browsable API (text/html), Accept с параметрами (indent) или без JSON.
+    """
+    sync_view_class = None
+    renderer_class = FastJSONRenderer
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # как и APIView.as_view: CSRF проверяет SessionAuthentication (в sync-вьюхе)
+        return csrf_exempt(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method in ("GET", "HEAD") and self._is_native(request):
+            return await self.get(request, *args, **kwargs)
+        sync_view = sync_to_async(self.sync_view_class.as_view())
+        return await sync_view(request, *args, **kwargs)
+
+    def _is_native(self, request) -> bool:
+        authorization = request.META.get("HTTP_AUTHORIZATION")
+        if authorization is not None:
+            scheme = authorization.split(" ", 1)[0]
+            if scheme not in jwt_settings.AUTH_HEADER_TYPES or self._bearer_authenticator() is None:
+                return False
+        if "format" in request.GET:
+            return False
+        if not hasattr(request, "auser"):  # без AuthenticationMiddleware
+            return False
+        accept = request.META.get("HTTP_ACCEPT", "")
+        if not accept:
+            return True
+        if "text/html" in accept or ";" in accept:
+            return False
+        return "json" in accept or "*/*" in accept
+
+    async def get(self, request, *args, **kwargs):
+        view = self.sync_view_class()
+        view.setup(request, *args, **kwargs)
+        view.request = Request(request, parsers=view.get_parsers(), authenticators=view.get_authenticators())
+        view.format_kwarg = None
+        view.headers = view.default_response_headers
+        try:
+            await self._authenticate(view.request, request)
+            view.check_permissions(view.request)
+            await self._check_throttles(view)
+            data, hit = await view.acached_data(lambda: self.abuild(view))
+        except Exception as exc:
+            return self._handle_exception(view, exc)
+        return mark(self._render(view, data), hit)
+
+    async def abuild(self, view):
+        raise NotImplementedError(".abuild() must be overridden")
+
+    def _bearer_authenticator(self):
+        """JWTStatelessUserAuthentication из authentication_classes sync-вьюхи (или None)."""
+        for auth_class in self.sync_view_class.authentication_classes:
+            if issubclass(auth_class, JWTStatelessUserAuthentication):
+                return auth_class()
+        return None
+
+    async def _authenticate(self, drf_request, request) -> None:
+        authenticator, user_auth = None, None
+        if "HTTP_AUTHORIZATION" in request.META:
+            authenticator = self._bearer_authenticator()
+            user_auth = authenticator.authenticate(drf_request)
+        elif settings.SESSION_COOKIE_NAME in request.COOKIES:
+            user = await request.auser()
+            if user.is_authenticated:
+                authenticator = next((a for a in drf_request.authenticators if isinstance(a, SessionAuthentication)), None)
+                user_auth = (user, None)
+        # как Request._authenticate: successful_authenticator не запустит sync-аутентификаторы
+        drf_request._authenticator = authenticator if user_auth else None
+        drf_request.user, drf_request.auth = user_auth or (AnonymousUser(), None)
+
+    async def _check_throttles(self, view) -> None:
+        durations = []
+        for throttle in view.get_throttles():
+            if isinstance(throttle, AsyncThrottleMixin):
+                allowed = await throttle.aallow_request(view.request, view)
+            else:
+                allowed = await sync_to_async(throttle.allow_request)(view.request, view)
+            if not allowed:
+                durations.append(throttle.wait())
+        if durations:
+            view.throttled(view.request, max((d for d in durations if d is not None), default=None))
+
+    def _handle_exception(self, view, exc):
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            # как APIView.handle_exception: 401 с WWW-Authenticate, без схемы — 403
+            auth_header = view.get_authenticate_header(view.request)
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = status.HTTP_403_FORBIDDEN
+        # тот же EXCEPTION_HANDLER, что у DRF (Http404 → NotFound, Throttled → Retry-After)
+        response = view.get_exception_handler()(exc, view.get_exception_handler_context())
+        if response is None:
+            raise exc
+        out = self._render(view, response.data, response.status_code)
+        for name, value in response.items():  # Retry-After, WWW-Authenticate
+            if name != "Content-Type":
+                out[name] = value
+        return out
+
+    def _render(self, view, data, status: int = 200) -> HttpResponse:
+        renderer = self.renderer_class()
+        with timing.phase("render"):
+            content = renderer.render(data, renderer.media_type, {"view": view, "request": view.request})
+        response = HttpResponse(content, status=status, content_type=renderer.media_type)
+        for name, value in view.headers.items():  # Allow, Vary: Accept — как у APIView
+            response[name] = value
+        return response
@@ -0,0 +1,97 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import PyMemcacheCache
+
+from apps.common import cache_metrics, timing
+
+_MISSING = object()
+
+
+class TimedCacheMixin:
+    """
+    Обёртка кэш-бэкенда:
+      - каждое обращение попадает в фазу "cache" текущего запроса (Server-Timing);
+      - hits/misses/sets/удаления/подъёмы версий считаются по семействам ключей (cache_metrics).
+    Вне запроса — прямой вызов + счётчики.
+    """
+
+    def get(self, key, default=None, version=None):
+        with timing.phase("cache"):
+            value = super().get(key, _MISSING, version)
+        hit = value is not _MISSING
+        cache_metrics.record_lookup(key, hit)
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        with timing.phase("cache"):
+            found = super().get_many(keys, version)
+        for key in keys:
+            cache_metrics.record_lookup(key, key in found)
+        return found
+
+    def set(self, key, value, *args, **kwargs):
+        cache_metrics.record_set(key)
+        with timing.phase("cache"):
+            return super().set(key, value, *args, **kwargs)
+
+    def set_many(self, data, *args, **kwargs):
+        for key in data:
+            cache_metrics.record_set(key)
+        with timing.phase("cache"):
+            return super().set_many(data, *args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        # add — только инициализация версий и служебные счётчики: в метрики семейств не идёт
+        with timing.phase("cache"):
+            return super().add(*args, **kwargs)
+
+    def incr(self, key, *args, **kwargs):
+        with timing.phase("cache"):
+            value = super().incr(key, *args, **kwargs)
+        cache_metrics.record_incr(key)
+        return value
+
+    def delete(self, key, *args, **kwargs):
+        cache_metrics.record_delete(key)
+        with timing.phase("cache"):
+            return super().delete(key, *args, **kwargs)
+
+    def delete_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        for key in keys:
+            cache_metrics.record_delete(key)
+        with timing.phase("cache"):
+            return super().delete_many(keys, *args, **kwargs)
+
+    def touch(self, *args, **kwargs):
+        with timing.phase("cache"):
+            return super().touch(*args, **kwargs)
+
+
+class MeteredSerde:
+    """
+    serde pymemcache, считающий размер записываемых значений (cache_metrics.record_set_size):
+    длина берётся у байтов, которые и так уходят в memcached, — без второй сериализации.
+    """
+
+    def __init__(self, serde):
+        self._serde = serde
+
+    def serialize(self, key, value):
+        data, flags = self._serde.serialize(key, value)
+        cache_metrics.record_set_size(key, len(data))
+        return data, flags
+
+    def deserialize(self, key, value, flags):
+        return self._serde.deserialize(key, value, flags)
+
+
+class TimedPyMemcacheCache(TimedCacheMixin, PyMemcacheCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        # тот же serde использует и AsyncMemcached (client.default_kwargs)
+        self._options["serde"] = MeteredSerde(self._options["serde"])
+
+
+class TimedLocMemCache(TimedCacheMixin, LocMemCache):
+    pass
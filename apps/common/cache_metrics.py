@@ -0,0 +1,141 @@
+import threading
+
+from django.conf import settings
+
+# семейства ключей: префикс ключа → имя в метках (первое совпадение)
+FAMILIES = (
+    ("product:", "product"),
+    ("products:list", "products:list"),
+    ("category:", "category"),
+    ("categories:list", "categories:list"),
+    ("order:", "order"),
+    ("orders:list:user", "orders:list:user"),
+    ("admin:orders:list", "admin:orders:list"),
+    ("user:", "user"),
+)
+_PREFIXES = tuple(prefix for prefix, _ in FAMILIES)
+
+# ключи версий списков → семейство, чьи ключи они инвалидируют
+VERSION_KEYS = {
+    "products:list:version": "products:list",
+    "categories:list:version": "categories:list",
+    "orders:user:list:version": "orders:list:user",
+    "orders:admin:list:version": "admin:orders:list",
+}
+
+# счётчик → (метрика Prometheus, тип, описание)
+COUNTERS = {
+    "hits": ("cache_hits_total", "counter", "Cache lookups that returned a value"),
+    "misses": ("cache_misses_total", "counter", "Cache lookups that found nothing"),
+    "stale": ("cache_stale_total", "counter", "Hits on a payload from an older list version (served as MISS)"),
+    "sets": ("cache_sets_total", "counter", "Values written to the cache"),
+    "set_failures": ("cache_set_failures_total", "counter", "Writes rejected as larger than CACHE_MAX_VALUE_BYTES"),
+    "set_bytes": ("cache_set_bytes_total", "counter", "Serialized payload bytes written (memcached)"),
+    "max_value_bytes": ("cache_max_value_bytes", "gauge", "Largest serialized payload written (memcached)"),
+    "deletes": ("cache_deletes_total", "counter", "Explicit key invalidations"),
+    "version_bumps": ("cache_version_bumps_total", "counter", "List version bumps (invalidate the whole family)"),
+}
+
+_lock = threading.Lock()
+_counters = {}
+
+
+def family(key) -> str | None:
+    """Семейство ключа или None (служебные ключи — версии, метрики, throttling, count — не считаем)."""
+    if not isinstance(key, str) or not key.startswith(_PREFIXES) or key in VERSION_KEYS:
+        return None
+    for prefix, name in FAMILIES:
+        if key.startswith(prefix):
+            return name
+    return None
+
+
+def _add(name: str, counter: str, delta: int = 1) -> None:
+    with _lock:
+        series = _counters.setdefault(name, dict.fromkeys(COUNTERS, 0))
+        if counter == "max_value_bytes":
+            series[counter] = max(series[counter], delta)
+        else:
+            series[counter] += delta
+
+
+# ---------- хуки Timed*Cache ----------
+
+def record_lookup(key, hit: bool) -> None:
+    name = family(key)
+    if name is not None:
+        _add(name, "hits" if hit else "misses")
+
+
+def record_stale(key) -> None:
+    """Payload найден, но версия в значении устарела (apps.common.caching.lookup)."""
+    name = family(key)
+    if name is not None:
+        _add(name, "stale")
+
+
+def record_set(key) -> None:
+    """Запись значения (размер считает record_set_size — при сериализации в memcached)."""
+    if key in VERSION_KEYS:
+        # fallback bump_version без incr — тоже подъём версии
+        _add(VERSION_KEYS[key], "version_bumps")
+        return
+    name = family(key)
+    if name is not None:
+        _add(name, "sets")
+
+
+def record_set_size(full_key, size: int) -> None:
+    """
+    Размер сериализованного значения (apps.common.cache.MeteredSerde): ключ — уже с префиксом
+    и версией Django (":1:product:5"); сверх лимита memcached запись не примет.
+    """
+    if isinstance(full_key, bytes):
+        full_key = full_key.decode()
+    name = family(full_key.split(":", 2)[-1])
+    if name is None:
+        return
+    _add(name, "set_bytes", size)
+    _add(name, "max_value_bytes", size)
+    if size > getattr(settings, "CACHE_MAX_VALUE_BYTES", 1024 * 1024):
+        _add(name, "set_failures")
+
+
+def record_delete(key) -> None:
+    name = family(key)
+    if name is not None:
+        _add(name, "deletes")
+
+
+def record_incr(key) -> None:
+    if key in VERSION_KEYS:
+        _add(VERSION_KEYS[key], "version_bumps")
+
+
+# ---------- чтение ----------
+
+def snapshot() -> dict:
+    """{семейство: {счётчик: значение}} текущего процесса, с hit_ratio (устаревшие — промах)."""
+    with _lock:
+        data = {name: dict(series) for name, series in _counters.items()}
+    for series in data.values():
+        lookups = series["hits"] + series["misses"]
+        series["hit_ratio"] = round((series["hits"] - series["stale"]) / lookups, 4) if lookups else None
+    return data
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+
+
+def prometheus() -> str:
+    """Текстовый формат Prometheus 0.0.4 (счётчики процесса: каждый воркер отдаёт свои)."""
+    data = snapshot()
+    lines = []
+    for counter, (metric, kind, help_text) in COUNTERS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name in sorted(data):
+            lines.append(f'{metric}{{family="{name}"}} {data[name][counter]}')
+    return "\n".join(lines) + "\n"
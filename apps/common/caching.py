@@ -0,0 +1,136 @@
+import hashlib
+import random
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from apps.common import cache_metrics
+from apps.common.async_cache import acache
+
+
+# ---------- утилиты ----------
+
+def ttl_with_jitter(base: int = 300, jitter: float = 0.10) -> int:
+    """TTL с анти-догпайлом: ±jitter от базового значения (по умолчанию ±10%)."""
+    delta = int(base * jitter)
+    return base + random.randint(-delta, delta)
+
+
+def hash_params(params: dict) -> str:
+    """Стабильный sha256-хэш нормализованных параметров запроса (для ключей кэша)."""
+    encoded = urlencode(sorted(params.items()), doseq=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _as_version(value) -> int:
+    # нет ключа (или мусор) — версия 1, как и начальное значение bump_version
+    return value if isinstance(value, int) and value > 0 else 1
+
+
+def bump_version(key: str, initial: int = 1) -> None:
+    """
+    Атомарно инкрементируем версию кэш-списков.
+    Если ключа нет — создаём с initial, затем инкрементируем (fallback для backends без incr).
+    """
+    cache.add(key, initial)
+    try:
+        cache.incr(key)
+    except Exception:
+        current = cache.get(key) or initial
+        cache.set(key, int(current) + 1)
+
+
+# ---------- версия внутри значения ----------
+
+def _unpack(key: str, found: dict, version_key: str) -> tuple:
+    version = _as_version(found.get(version_key))
+    entry = found.get(key)
+    if entry is None:
+        return None, version
+    if not (isinstance(entry, tuple) and len(entry) == 2 and entry[0] == version):
+        cache_metrics.record_stale(key)
+        return None, version
+    return entry[1], version
+
+
+def lookup(key: str, version_key: str = None) -> tuple:
+    """
+    Один get_many на версию и payload: (data | None, version).
+    Payload хранится как (version, data) под ключом без версии; версия не совпала — MISS,
+    и следующий store перезапишет тот же ключ (устаревшие копии не копятся до TTL).
+    """
+    if version_key is None:
+        return cache.get(key), None
+    return _unpack(key, cache.get_many([version_key, key]), version_key)
+
+
+def store(key: str, data, version: int = None, ttl: int = 300, jitter: float = 0.10) -> None:
+    """Сохранить payload; version — та, что прочитана в lookup (на момент построения ответа)."""
+    value = data if version is None else (version, data)
+    cache.set(key, value, timeout=ttl_with_jitter(ttl, jitter))
+
+
+async def alookup(key: str, version_key: str = None) -> tuple:
+    """lookup для async-вьюх (AsyncCache: тот же формат значений, что и у sync)."""
+    if version_key is None:
+        return await acache.get(key), None
+    return _unpack(key, await acache.get_many([version_key, key]), version_key)
+
+
+async def astore(key: str, data, version: int = None, ttl: int = 300, jitter: float = 0.10) -> None:
+    value = data if version is None else (version, data)
+    await acache.set(key, value, timeout=ttl_with_jitter(ttl, jitter))
+
+
+def mark(response, hit: bool):
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+# ---------- вьюхи ----------
+
+class VersionedCacheMixin:
+    """
+    Ручной кэш ответа GET для list/detail вьюх:
+      - ключ: {cache_prefix}:{hash(get_cache_params())} (или свой get_cache_key());
+      - cache_version_key — версия списка (поднимают сигналы через bump_version);
+        None — деталь без версии (инвалидация удалением ключа);
+      - TTL cache_ttl ±cache_jitter, заголовок X-Cache: HIT|MISS.
+    Вью вызывает cached_response(build): build() строит данные ответа на MISS;
+    async-вьюхи (apps.common.async_views) — acached_data(abuild) с тем же ключом и форматом.
+    """
+    cache_prefix: str = None
+    cache_version_key: str = None
+    cache_ttl = 300
+    cache_jitter = 0.10
+
+    def get_cache_params(self) -> dict:
+        return {}
+
+    def get_cache_key(self) -> str:
+        return f"{self.cache_prefix}:{hash_params(self.get_cache_params())}"
+
+    def check_cached(self, data) -> None:
+        """Хук для HIT: проверки прав по закэшированным данным (бросает исключение DRF)."""
+
+    def cached_response(self, build) -> Response:
+        key = self.get_cache_key()
+        data, version = lookup(key, self.cache_version_key)
+        if data is not None:
+            self.check_cached(data)
+            return mark(Response(data), hit=True)
+        data = build()
+        store(key, data, version, self.cache_ttl, self.cache_jitter)
+        return mark(Response(data), hit=False)
+
+    async def acached_data(self, abuild) -> tuple:
+        """(data, hit): то же, что cached_response, для async-вьюх; abuild — корутина-функция."""
+        key = self.get_cache_key()
+        data, version = await alookup(key, self.cache_version_key)
+        if data is not None:
+            self.check_cached(data)
+            return data, True
+        data = await abuild()
+        await astore(key, data, version, self.cache_ttl, self.cache_jitter)
+        return data, False
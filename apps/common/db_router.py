@@ -0,0 +1,102 @@
+import random
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.common.async_cache import acache
+
+# внутри replica_reads(): чтения ORM без явного using() уходят на реплику
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def replicas() -> list:
+    """Алиасы реплик чтения (DATABASE_REPLICAS); пусто — всё на primary."""
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def replica_alias() -> str:
+    """Алиас для явного using() (тяжёлые выгрузки): случайная реплика или primary."""
+    aliases = replicas()
+    return random.choice(aliases) if aliases else DEFAULT_DB_ALIAS
+
+
+def _pin_key(pin: str) -> str:
+    return f"db:pin:{pin}"
+
+
+def pin_primary(*pins: str) -> None:
+    """
+    Read-your-writes: после записи читатели с этими метками DATABASE_REPLICA_PIN_SECONDS
+    ходят на primary (реплика могла не догнать, а построенный с неё ответ лёг бы в кэш).
+    Метки: "user:{id}" — заказы пользователя, "orders:users" — заказы всех пользователей
+    (авторы неизвестны), "orders:admin" — админский список, "catalog" — правки каталога.
+    """
+    if pins and replicas():
+        cache.set_many({_pin_key(pin): 1 for pin in pins}, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def replica_reads(*pins: str):
+    """
+    Чтения внутри блока — на реплику, если реплики настроены и ни одна из меток pins
+    не закреплена за primary (pin_primary). Запись, явный using() и чтения внутри
+    транзакции на primary роутер не трогает. Метка контекста переходит и в sync_to_async.
+    """
+    if not replicas() or (pins and cache.get_many([_pin_key(pin) for pin in pins])):
+        yield
+        return
+    with _routed():
+        yield
+
+
+@asynccontextmanager
+async def areplica_reads(*pins: str):
+    """replica_reads() для async-вьюх: закрепления читаются через AsyncCache."""
+    if not replicas() or (pins and await acache.get_many([_pin_key(pin) for pin in pins])):
+        yield
+        return
+    with _routed():
+        yield
+
+
+@contextmanager
+def _routed():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Роутер чтений на реплики (DATABASE_ROUTERS): только внутри replica_reads().
+    Реплики — копии primary (TEST.MIRROR = default), связи между ними разрешены,
+    миграции — как без роутера (репликация схемы — забота самой БД).
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        aliases = replicas()
+        instance = hints.get("instance")
+        if not aliases or (instance is not None and instance._state.db not in (DEFAULT_DB_ALIAS, *aliases)):
+            # связанные объекты из другой БД (архив) — туда же, как без роутера
+            return None
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        # объект, прочитанный с реплики, пишется на primary; остальное — как без роутера
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db in replicas():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
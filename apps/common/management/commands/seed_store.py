@@ -0,0 +1,260 @@
+import itertools
+import random
+import time
+from datetime import timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.catalog.models import Category, Product
+from apps.orders.models import Order, OrderItem
+
+User = get_user_model()
+
+# доли статусов заказов (старые заказы в основном завершены)
+STATUS_WEIGHTS = [
+    (Order.STATUS_PENDING, 8),
+    (Order.STATUS_PROCESSING, 7),
+    (Order.STATUS_SHIPPED, 10),
+    (Order.STATUS_DELIVERED, 65),
+    (Order.STATUS_CANCELLED, 10),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Детерминированная генерация больших объёмов данных магазина: категории, продукты, "
+        "пользователи, заказы и позиции со skew (Zipf по SKU и покупателям, степенной размер заказа)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=100_000)
+        parser.add_argument("--orders", type=int, default=1_000_000)
+        parser.add_argument("--categories", type=int, default=200)
+        parser.add_argument("--users", type=int, default=None, help="по умолчанию orders // 20")
+        parser.add_argument("--seed", type=int, default=42, help="одинаковый seed — одинаковые данные")
+        parser.add_argument("--days", type=int, default=365, help="заказы распределяются по последним N дням (даты — от текущего момента, остальное задаёт seed)")
+        parser.add_argument("--max-items", type=int, default=50, help="верхняя граница позиций в заказе")
+        parser.add_argument("--sku-skew", type=float, default=1.1, help="показатель Zipf популярности SKU")
+        parser.add_argument("--user-skew", type=float, default=0.8, help="показатель Zipf активности покупателей")
+        parser.add_argument("--size-alpha", type=float, default=1.5, help="показатель Парето числа позиций")
+        parser.add_argument("--batch-size", type=int, default=20_000, help="заказов на транзакцию")
+
+    def handle(self, *args, **opts):
+        if opts["products"] < 1 or opts["categories"] < 1 or opts["orders"] < 0:
+            raise CommandError("--products и --categories должны быть > 0, --orders >= 0")
+        users = opts["users"] if opts["users"] is not None else max(opts["orders"] // 20, 1)
+        rnd = random.Random(opts["seed"])
+        started = time.perf_counter()
+
+        self._tune_connection()
+        category_ids = self._seed_categories(opts["categories"])
+        products = self._seed_products(rnd, opts["products"], category_ids)
+        user_ids = self._seed_users(users, opts["seed"])
+        self._log(started, f"catalog: {len(category_ids)} categories, {len(products)} products, {len(user_ids)} users")
+
+        orders, items = self._seed_orders(rnd, opts, products, user_ids, started)
+        self._reset_sequences()
+        self._invalidate_cache()
+        self._log(started, f"done: {orders} orders, {items} order items")
+
+    # ---------- вспомогательное ----------
+
+    def _log(self, started: float, message: str) -> None:
+        self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}")
+
+    def _tune_connection(self) -> None:
+        """
+        SQLite: без fsync и журнала на диске — база свежая, при сбое её просто пересоздают.
+        Внутри внешней транзакции (тесты) PRAGMA менять нельзя — пропускаем.
+        """
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+                cursor.execute("PRAGMA journal_mode = MEMORY")
+                cursor.execute("PRAGMA temp_store = MEMORY")
+                cursor.execute("PRAGMA cache_size = -262144")  # 256 МБ
+
+    def _insert(self, model, columns: list, rows) -> int:
+        """
+        Потоковая вставка кортежей одним executemany: без экземпляров моделей и сигналов.
+        rows — iterable уже подготовленных для БД значений (id задаются явно).
+        """
+        opts = model._meta
+        qn = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            qn(opts.db_table),
+            ", ".join(qn(opts.get_field(c).column) for c in columns),
+            ", ".join(["%s"] * len(columns)),
+        )
+        rows = list(rows)
+        if rows:
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+        return len(rows)
+
+    def _next_id(self, model) -> int:
+        return (model.objects.aggregate(m=Max("pk"))["m"] or 0) + 1
+
+    def _dt(self, value):
+        return connection.ops.adapt_datetimefield_value(value)
+
+    def _dt_after(self, base):
+        """
+        Быстрый адаптер для base + секунды: SQLite хранит наивное UTC строкой — форматируем сами,
+        без adapt_datetimefield_value на каждую строку; остальным БД отдаём datetime как есть.
+        """
+        if isinstance(self._dt(base), str):
+            naive = base.astimezone(dt_timezone.utc).replace(tzinfo=None)
+            return lambda seconds: str(naive + timedelta(seconds=seconds))
+        return lambda seconds: base + timedelta(seconds=seconds)
+
+    @staticmethod
+    def _zipf_cum_weights(n: int, s: float) -> list:
+        return list(itertools.accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+    # ---------- каталог и пользователи ----------
+
+    def _seed_categories(self, count: int) -> list:
+        first = self._next_id(Category)
+        now = self._dt(timezone.now())
+        ids = list(range(first, first + count))
+        with transaction.atomic():
+            self._insert(
+                Category,
+                ["id", "name", "slug", "is_active", "created_at", "updated_at"],
+                ((cid, f"Category {cid}", f"category-{cid}", True, now, now) for cid in ids),
+            )
+        return ids
+
+    def _seed_products(self, rnd: random.Random, count: int, category_ids: list) -> list:
+        """Продукты: цена — логнормальная, категории — тоже со skew. Возвращает [(id, копейки, цена строкой)]."""
+        first = self._next_id(Product)
+        now = self._dt(timezone.now())
+        cat_weights = self._zipf_cum_weights(len(category_ids), 0.9)
+        products = []
+        rows = []
+        for pid in range(first, first + count):
+            cents = max(50, min(int(rnd.lognormvariate(8.0, 1.2)), 99_999_999))
+            price = _money(cents)
+            products.append((pid, cents, price))
+            rows.append((
+                pid, f"Product {pid}", "", price, 1_000_000,
+                rnd.choices(category_ids, cum_weights=cat_weights)[0], rnd.random() > 0.03, now, now,
+            ))
+        with transaction.atomic():
+            for i in range(0, len(rows), 50_000):
+                self._insert(
+                    Product,
+                    ["id", "name", "description", "price", "stock", "category", "is_active", "created_at", "updated_at"],
+                    rows[i:i + 50_000],
+                )
+        return products
+
+    def _seed_users(self, count: int, seed: int) -> list:
+        first = self._next_id(User)
+        now = self._dt(timezone.now())
+        ids = list(range(first, first + count))
+        with transaction.atomic():
+            for i in range(0, count, 50_000):
+                self._insert(
+                    User,
+                    ["id", "password", "is_superuser", "username", "first_name", "last_name",
+                     "email", "is_staff", "is_active", "date_joined"],
+                    # "!" — непригодный пароль: войти этими пользователями нельзя
+                    ((uid, "!", False, f"seed{seed}_{uid}", "", "", "", False, True, now) for uid in ids[i:i + 50_000]),
+                )
+        return ids
+
+    # ---------- заказы ----------
+
+    def _seed_orders(self, rnd: random.Random, opts: dict, products: list, user_ids: list, started: float) -> tuple:
+        """
+        Заказы и позиции потоком пачек по --batch-size заказов (одна транзакция на пачку).
+        Популярность SKU — Zipf по случайно перемешанному ранжированию (хиты не подряд по id),
+        активность покупателей — Zipf, число позиций — Парето, обрезанное --max-items.
+        """
+        total_orders = opts["orders"]
+        ranked = products[:]
+        rnd.shuffle(ranked)
+        sku_weights = self._zipf_cum_weights(len(ranked), opts["sku_skew"])
+        buyers = user_ids[:]
+        rnd.shuffle(buyers)
+        user_weights = self._zipf_cum_weights(len(buyers), opts["user_skew"])
+        statuses = [s for s, _ in STATUS_WEIGHTS]
+        status_cum = list(itertools.accumulate(w for _, w in STATUS_WEIGHTS))
+        max_items = min(opts["max_items"], len(ranked))
+        alpha = opts["size_alpha"]
+        span = opts["days"] * 86400
+        created_at = self._dt_after(timezone.now() - timedelta(seconds=span))
+
+        order_id = self._next_id(Order)
+        item_id = self._next_id(OrderItem)
+        done_orders = done_items = 0
+        report_every = max(total_orders // 20, opts["batch_size"])
+
+        while done_orders < total_orders:
+            batch = min(opts["batch_size"], total_orders - done_orders)
+            # время заказов в пачке идёт по возрастанию вместе с id
+            offsets = sorted(rnd.random() * span for _ in range(batch))
+            order_rows, item_rows = [], []
+            for offset in offsets:
+                size = min(max_items, int(rnd.paretovariate(alpha)))
+                picked = {}
+                for product in rnd.choices(ranked, cum_weights=sku_weights, k=size):
+                    picked[product[0]] = product  # дубликаты SKU схлопываются (uniq_order_product)
+                created = created_at(offset)
+                total_cents = 0
+                for pid, cents, price in picked.values():
+                    qty = 1 if rnd.random() < 0.8 else rnd.randint(2, 5)
+                    total_cents += cents * qty
+                    item_rows.append((item_id, order_id, pid, qty, price, created))
+                    item_id += 1
+                status = rnd.choices(statuses, cum_weights=status_cum)[0]
+                order_rows.append((
+                    order_id, rnd.choices(buyers, cum_weights=user_weights)[0], status,
+                    _money(total_cents), created, created,
+                ))
+                order_id += 1
+
+            with transaction.atomic():
+                self._insert(Order, ["id", "user", "status", "total_price", "created_at", "updated_at"], order_rows)
+                self._insert(OrderItem, ["id", "order", "product", "quantity", "price_at_purchase", "created_at"], item_rows)
+
+            before = done_orders
+            done_orders += batch
+            done_items += len(item_rows)
+            if done_orders // report_every != before // report_every or done_orders == total_orders:
+                self._log(started, f"orders {done_orders}/{total_orders}, items {done_items}")
+        return done_orders, done_items
+
+    # ---------- после вставки ----------
+
+    def _reset_sequences(self) -> None:
+        """id задавались явно — на PostgreSQL двигаем последовательности (на SQLite не нужно)."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [Category, Product, User, Order, OrderItem])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def _invalidate_cache(self) -> None:
+        """Сигналы не срабатывали — поднимаем версии списков один раз (кэш может быть недоступен)."""
+        from apps.common.caching import bump_version
+        from apps.orders.signals import bump_order_lists
+
+        try:
+            bump_version("products:list:version")
+            bump_version("categories:list:version")
+            bump_order_lists()
+        except Exception as exc:
+            self.stderr.write(self.style.WARNING(f"кэш не сброшен ({exc}); очистите его вручную"))
+
+
+def _money(cents: int) -> str:
+    # Decimal → str без float: строку одинаково принимают SQLite и PostgreSQL
+    return f"{cents // 100}.{cents % 100:02d}"
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.common import metrics
+
+
+class Command(BaseCommand):
+    help = "Метрики Celery-задач: счётчики и p50/p95/p99 по задачам и фазам"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="вывести снимок как JSON")
+        parser.add_argument("--reset", action="store_true", help="обнулить метрики после вывода")
+
+    def handle(self, *args, **options):
+        data = metrics.snapshot()
+        if options["json"]:
+            self.stdout.write(json.dumps(data, ensure_ascii=False, indent=2))
+        elif not data:
+            self.stdout.write("Метрик пока нет")
+        else:
+            self.stdout.write(f"{'task / phase':<56}{'count':>8}{'avg ms':>10}{'p50':>8}{'p95':>8}{'p99':>8}")
+            for task, info in data.items():
+                counters = ", ".join(f"{k}={v}" for k, v in info["counters"].items())
+                self.stdout.write(f"{task}  [{counters}]")
+                for name, ph in info["phases"].items():
+                    self.stdout.write(
+                        f"  {name:<54}{ph['count']:>8}{_fmt(ph['avg_ms']):>10}"
+                        f"{_fmt(ph['p50_ms']):>8}{_fmt(ph['p95_ms']):>8}{_fmt(ph['p99_ms']):>8}"
+                    )
+        if options["reset"]:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS("Метрики обнулены"))
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:g}"
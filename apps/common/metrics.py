@@ -0,0 +1,265 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from celery.signals import task_postrun, task_prerun, task_retry, worker_process_shutdown, worker_shutdown
+from django.conf import settings
+from django.core.cache import cache
+
+# верхние границы корзин гистограммы, мс (последняя — +inf)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf"))
+PHASE_TOTAL = "total"
+
+_PREFIX = "metrics:tasks"
+# реестры: какие (task, phase) и (task, event) есть в кэше — чтобы snapshot() знал, что читать
+_SERIES = "series"
+_COUNTERS = "counters"
+
+_local = threading.local()
+_lock = threading.Lock()
+_pending = {"observations": defaultdict(lambda: [0, 0, [0] * len(BUCKETS_MS)]), "counters": defaultdict(int)}
+_last_flush = 0.0
+_starts = {}
+_flusher_pid = None
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- наблюдения ----------
+
+def _bucket_index(ms: float) -> int:
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(BUCKETS_MS) - 1
+
+
+def observe(task: str, phase_name: str, seconds: float) -> None:
+    """Одно наблюдение длительности (фаза или вся задача)."""
+    ms = seconds * 1000
+    with _lock:
+        series = _pending["observations"][(task, phase_name)]
+        series[0] += 1
+        series[1] += int(seconds * 1_000_000)
+        series[2][_bucket_index(ms)] += 1
+
+
+def count(task: str, event: str, delta: int = 1) -> None:
+    """Счётчик события задачи: started | succeeded | failed | retried."""
+    with _lock:
+        _pending["counters"][(task, event)] += delta
+
+
+@contextmanager
+def phase(name: str):
+    """Таймер фазы текущей задачи (имя задачи берётся из task_prerun того же потока)."""
+    task = getattr(_local, "task", None) or "adhoc"
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(task, name, time.perf_counter() - started)
+
+
+# ---------- общий агрегат в кэше ----------
+
+def _incr(key: str, delta: int) -> None:
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def _series_key(task: str, phase_name: str, field: str) -> str:
+    return f"{_PREFIX}:{task}:{phase_name}:{field}"
+
+
+def flush(force: bool = False) -> None:
+    """
+    Сбросить накопленное процессом в общий кэш атомарными incr (не чаще
+    TASK_METRICS_FLUSH_INTERVAL, если не force): веб-процесс читает агрегат всех воркеров.
+    """
+    global _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < getattr(settings, "TASK_METRICS_FLUSH_INTERVAL", 10):
+        return
+    with _lock:
+        observations = dict(_pending["observations"])
+        counters = dict(_pending["counters"])
+        _pending["observations"].clear()
+        _pending["counters"].clear()
+        _last_flush = now
+    if not observations and not counters:
+        return
+
+    for (task, phase_name), (n, total_us, buckets) in observations.items():
+        _incr(_series_key(task, phase_name, "count"), n)
+        _incr(_series_key(task, phase_name, "sum_us"), total_us)
+        for i, hits in enumerate(buckets):
+            _incr(_series_key(task, phase_name, f"b{i}"), hits)
+    for (task, event), n in counters.items():
+        _incr(_series_key(task, "_", event), n)
+
+    _register(_SERIES, observations)
+    _register(_COUNTERS, counters)
+
+
+# ---------- реестры серий ----------
+
+def _registry_key(registry: str, suffix) -> str:
+    return f"{_PREFIX}:{registry}:{suffix}"
+
+
+def _register(registry: str, names) -> None:
+    """
+    Дописать имена в реестр без read-modify-write общего значения (иначе два воркера,
+    одновременно заводящие новые серии, затирают друг друга): метка имени ставится cache.add
+    (атомарно), и только первый добавивший берёт слот — incr счётчика реестра — и пишет туда имя.
+    """
+    for name in names:
+        if not cache.add(_registry_key(registry, "known:" + ":".join(name)), 1, timeout=None):
+            continue
+        count_key = _registry_key(registry, "n")
+        try:
+            slot = cache.incr(count_key)
+        except ValueError:
+            slot = 1 if cache.add(count_key, 1, timeout=None) else cache.incr(count_key)
+        cache.set(_registry_key(registry, slot), name, timeout=None)
+
+
+def _registry_keys(registry: str) -> list:
+    n = cache.get(_registry_key(registry, "n")) or 0
+    return [_registry_key(registry, slot) for slot in range(1, n + 1)]
+
+
+def _registered(registry: str) -> set:
+    return set(cache.get_many(_registry_keys(registry)).values())
+
+
+def _start_idle_flusher() -> None:
+    """
+    Фоновый поток процесса-воркера: сбрасывает накопленное раз в TASK_METRICS_FLUSH_INTERVAL,
+    даже когда задач нет (task_postrun не срабатывает и последние наблюдения иначе не дошли бы
+    до кэша). Один поток на процесс; после fork (prefork) — свой в каждом дочернем.
+    """
+    global _flusher_pid
+    pid = os.getpid()
+    with _lock:
+        if _flusher_pid == pid:
+            return
+        _flusher_pid = pid
+    threading.Thread(target=_idle_flush_loop, name="task-metrics-flush", daemon=True).start()
+
+
+def _idle_flush_loop() -> None:
+    while True:
+        time.sleep(max(getattr(settings, "TASK_METRICS_FLUSH_INTERVAL", 10), 0.1))
+        try:
+            flush()
+        except Exception:  # кэш недоступен — попробуем в следующий раз, поток не роняем
+            logger.warning("task metrics flush failed", exc_info=True)
+
+
+def _data_keys(series, counter_names) -> list:
+    keys = []
+    for task, phase_name in series:
+        keys += [_series_key(task, phase_name, f) for f in ("count", "sum_us")]
+        keys += [_series_key(task, phase_name, f"b{i}") for i in range(len(BUCKETS_MS))]
+    keys += [_series_key(task, "_", event) for task, event in counter_names]
+    return keys
+
+
+def _quantile(buckets: list, q: float):
+    """Оценка квантиля по гистограмме — верхняя граница корзины, где накопилась доля q."""
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, hits in zip(BUCKETS_MS, buckets):
+        seen += hits
+        if seen >= rank:
+            return bound if bound != float("inf") else None
+    return None
+
+
+def snapshot() -> dict:
+    """
+    Агрегат по всем процессам:
+    {task: {"counters": {event: n}, "phases": {phase: {count, avg_ms, p50_ms, p95_ms, p99_ms, buckets}}}}.
+    """
+    series = _registered(_SERIES)
+    counter_names = _registered(_COUNTERS)
+    values = cache.get_many(_data_keys(series, counter_names))
+
+    result = defaultdict(lambda: {"counters": {}, "phases": {}})
+    for task, phase_name in sorted(series):
+        n = values.get(_series_key(task, phase_name, "count"), 0)
+        total_us = values.get(_series_key(task, phase_name, "sum_us"), 0)
+        buckets = [values.get(_series_key(task, phase_name, f"b{i}"), 0) for i in range(len(BUCKETS_MS))]
+        result[task]["phases"][phase_name] = {
+            "count": n,
+            "avg_ms": round(total_us / n / 1000, 3) if n else None,
+            "p50_ms": _quantile(buckets, 0.50),
+            "p95_ms": _quantile(buckets, 0.95),
+            "p99_ms": _quantile(buckets, 0.99),
+            "buckets": {("+Inf" if b == float("inf") else str(b)): hits for b, hits in zip(BUCKETS_MS, buckets)},
+        }
+    for task, event in sorted(counter_names):
+        result[task]["counters"][event] = values.get(_series_key(task, "_", event), 0)
+    return dict(result)
+
+
+def reset() -> None:
+    """Очистить агрегат в кэше (и несброшенное в этом процессе)."""
+    with _lock:
+        _pending["observations"].clear()
+        _pending["counters"].clear()
+    keys, registered = [], {}
+    for registry in (_SERIES, _COUNTERS):
+        slots = _registry_keys(registry)
+        registered[registry] = set(cache.get_many(slots).values())
+        keys += slots + [_registry_key(registry, "n")]
+        keys += [_registry_key(registry, "known:" + ":".join(name)) for name in registered[registry]]
+    cache.delete_many(keys + _data_keys(registered[_SERIES], registered[_COUNTERS]))
+
+
+# ---------- сигналы Celery ----------
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, task=None, **kwargs):
+    _starts[task_id] = time.perf_counter()
+    _local.task = task.name
+    count(task.name, "started")
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _starts.pop(task_id, None)
+    if started is not None:
+        observe(task.name, PHASE_TOTAL, time.perf_counter() - started)
+    if state == "SUCCESS":
+        count(task.name, "succeeded")
+    elif state == "FAILURE":
+        count(task.name, "failed")
+    _local.task = None
+    flush()
+    _start_idle_flusher()
+
+
+@task_retry.connect
+def _on_task_retry(sender=None, **kwargs):
+    count(sender.name, "retried")
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def _on_worker_shutdown(**kwargs):
+    # последние наблюдения воркера — в кэш до выхода процесса
+    flush(force=True)
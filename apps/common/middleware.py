@@ -0,0 +1,79 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from apps.common import timing
+
+logger = logging.getLogger("apps.common.timing")
+
+
+class ServerTimingMiddleware:
+    """
+    Разбивка времени запроса: db (timing.db_wrapper на всех соединениях), cache (Timed*Cache,
+    AsyncCache), serialize (timing.phase во вьюхах), render (рендер Response) и app — остальное.
+
+    SERVER_TIMING_HEADER — отдавать заголовок Server-Timing (по умолчанию при DEBUG);
+    SERVER_TIMING_SLOW_MS — порог (мс) для warning-лога с фазами и списком SQL (0 — выключено).
+    Ставить первым в MIDDLEWARE, чтобы в замер попали сессии и аутентификация.
+    Работает и в sync, и в async цепочке (под ASGI async-вьюхи не уходят в поток).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.deactivate(token)
+        return self._finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.deactivate(token)
+        return self._finish(request, response, timings)
+
+    def process_template_response(self, request, response):
+        # вызывается прямо перед response.render(): конец рендера ловим post-render callback'ом
+        timings = timing.current()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda r: timings.add("render", time.perf_counter() - started))
+        return response
+
+    @staticmethod
+    def _start():
+        slow_ms = getattr(settings, "SERVER_TIMING_SLOW_MS", 0)
+        timings = timing.RequestTimings(collect_queries=bool(slow_ms))
+        return timings, timing.activate(timings)
+
+    def _finish(self, request, response, timings):
+        if getattr(settings, "SERVER_TIMING_HEADER", settings.DEBUG):
+            response["Server-Timing"] = timings.header()
+        slow_ms = getattr(settings, "SERVER_TIMING_SLOW_MS", 0)
+        if slow_ms and timings.total_ms() >= slow_ms:
+            self._log_slow(request, response, timings)
+        return response
+
+    @staticmethod
+    def _log_slow(request, response, timings) -> None:
+        summary = timings.summary()
+        breakdown = " ".join(f"{name}={ms}ms/{n}" for name, (ms, n) in summary.items())
+        queries = "\n".join(f"  {ms:>9.3f}ms  {sql}" for ms, sql in timings.queries or ())
+        logger.warning(
+            "Slow request %s %s -> %s: %s\n%s",
+            request.method, request.get_full_path(), response.status_code, breakdown, queries,
+            extra={"timings": summary},
+        )
@@ -0,0 +1,42 @@
+import codecs
+import re
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость: без неё — stdlib json DRF
+    orjson = None
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser, get_encoding
+from rest_framework.utils import json
+
+from apps.common.renderers import FastJSONRenderer
+
+# orjson молча превращает целые вне 64 бит во float: такие тела (и длинные числа вообще) — stdlib
+_LONG_NUMBER = re.compile(rb"\d{19}")
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser на orjson для тел в UTF-8. Другие кодировки, отсутствие orjson, числа от 19 цифр
+    и невалидный для orjson ввод разбирает stdlib-парсер DRF — с его же текстом ошибки.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = get_encoding(parser_context)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if not _LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        try:
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(body.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,155 @@
+import decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields as drf_fields
+from rest_framework.settings import api_settings
+
+
+class Projection:
+    """
+    Быстрое чтение для списков: поля ModelSerializer → колонки values_list(), строка → dict
+    скомпилированной функцией. JSON совпадает байт-в-байт с serializer(many=True).data,
+    но без экземпляров моделей и пополевого прохода DRF.
+
+    Колонка поля — его source через "__" (category.name → category__name); поля, чей source
+    не колонка (items.count), задаются выражениями в annotations={имя поля: выражение}.
+    Конвертеры повторяют to_representation DRF: int/str как есть из БД, Decimal — quantize
+    + строка, datetime — в текущую TZ + DATETIME_FORMAT; остальное — field.to_representation.
+
+        projection = Projection(ProductListSerializer)
+        data = projection.data(queryset)                   # без пагинации
+        page = paginator.paginate_queryset(projection.queryset(qs), ...)
+        data = projection.rows(page)                       # с пагинацией
+    """
+
+    def __init__(self, serializer_class, annotations: dict = None):
+        self.serializer_class = serializer_class
+        self.annotations = annotations or {}
+        self._compiled = None
+
+    # ---------- компиляция ----------
+
+    def _compile(self):
+        """
+        Лениво (после загрузки настроек/приложений): колонки, функция строки convert(row, tzs)
+        и getter'ы TZ datetime-полей (TZ — на момент запроса, tzs — их значения).
+        """
+        model = self.serializer_class.Meta.model
+        columns, items, tz_getters = [], [], []
+        namespace = {}
+        for i, (name, field) in enumerate(self.serializer_class().fields.items()):
+            column = name if name in self.annotations else "__".join(field.source_attrs)
+            columns.append(column)
+            converter, tz_getter = self._converter(model, field, column)
+            if converter is None:
+                items.append(f"{name!r}: row[{i}]")
+                continue
+            namespace[f"c{i}"] = converter
+            if tz_getter is None:
+                items.append(f"{name!r}: None if row[{i}] is None else c{i}(row[{i}])")
+            else:
+                items.append(f"{name!r}: None if row[{i}] is None else c{i}(row[{i}], tzs[{len(tz_getters)}])")
+                tz_getters.append(tz_getter)
+        source = "def convert(row, tzs):\n    return {" + ", ".join(items) + "}\n"
+        exec(compile(source, f"<projection {self.serializer_class.__name__}>", "exec"), namespace)
+        return columns, namespace["convert"], tz_getters
+
+    @staticmethod
+    def _model_field(model, column: str):
+        """Поле модели в конце пути column (или None для аннотаций/неизвестных путей)."""
+        field = None
+        for part in column.split("__"):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model if field.is_relation else model
+        return field
+
+    def _converter(self, model, field, column: str) -> tuple:
+        """
+        (converter, tz_getter): converter None — значение из БД отдаётся как есть;
+        tz_getter не None — converter(value, tz) для datetime.
+        """
+        model_field = self._model_field(model, column)
+        internal = model_field.get_internal_type() if model_field is not None else None
+        kind = type(field)
+
+        if kind is drf_fields.IntegerField and internal in ("AutoField", "BigAutoField", "IntegerField",
+                                                             "BigIntegerField", "PositiveIntegerField",
+                                                             "PositiveBigIntegerField", "SmallIntegerField"):
+            return None, None
+        if kind in (drf_fields.CharField, drf_fields.SlugField) and internal in ("CharField", "SlugField", "TextField"):
+            # trim_whitespace только на вход; на выход DRF отдаёт str(value)
+            return None, None
+        if kind is drf_fields.IntegerField:
+            return int, None
+        if kind is drf_fields.DecimalField and self._plain_decimal(field):
+            return self._decimal_converter(field), None
+        if kind is drf_fields.DateTimeField:
+            return self._datetime_converter(field)
+        return field.to_representation, None
+
+    @staticmethod
+    def _plain_decimal(field) -> bool:
+        coerce = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+        return coerce and not field.localize and not field.normalize_output and field.decimal_places is not None
+
+    @staticmethod
+    def _decimal_converter(field):
+        exp = decimal.Decimal(".1") ** field.decimal_places
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        rounding = field.rounding
+        fallback = field.to_representation
+
+        def convert(value):
+            if not isinstance(value, decimal.Decimal):
+                return fallback(value)
+            return f"{value.quantize(exp, rounding=rounding, context=context):f}"
+        return convert
+
+    @staticmethod
+    def _datetime_converter(field) -> tuple:
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        fallback = field.to_representation
+        if output_format is None or output_format.lower() == drf_fields.ISO_8601:
+            return fallback, None
+
+        def tz_getter():
+            # TZ поля или текущая на момент запроса — как DateTimeField.enforce_timezone
+            return field.timezone if hasattr(field, "timezone") else field.default_timezone()
+
+        def convert(value, tz):
+            if tz is None or value.tzinfo is None:
+                return fallback(value)
+            return value.astimezone(tz).strftime(output_format)
+        return convert, tz_getter
+
+    # ---------- использование ----------
+
+    def queryset(self, qs):
+        """values_list() по колонкам проекции (с аннотациями) — можно пагинировать."""
+        if self._compiled is None:
+            self._compiled = self._compile()
+        columns = self._compiled[0]
+        if self.annotations:
+            qs = qs.annotate(**self.annotations)
+        return qs.values_list(*columns)
+
+    def rows(self, rows) -> list:
+        """Строки values_list() → список dict в формате сериализатора."""
+        if self._compiled is None:
+            self._compiled = self._compile()
+        _, convert, tz_getters = self._compiled
+        tzs = [getter() for getter in tz_getters]
+        return [convert(row, tzs) for row in rows]
+
+    def data(self, qs) -> list:
+        return self.rows(self.queryset(qs))
+
+    async def adata(self, qs) -> list:
+        """data() для async-вьюх: выборка через async ORM."""
+        return self.rows([row async for row in self.queryset(qs)])
+
@@ -0,0 +1,65 @@
+import math
+import re
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость: без неё — stdlib json DRF
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+
+# U+2028/U+2029 в UTF-8: DRF экранирует их, чтобы JSON оставался подмножеством JavaScript
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+# float'ы, которые orjson пишет не как repr(): экспонента (1e16 против 1e+16) и 1e-5..1e-7
+# без экспоненты (0.00001 против 1e-05). Совпадения внутри строк дают лишь лишний фолбэк.
+# Регулярка начинается с литерала — поиск идёт быстрым сканом, а не пробой каждой позиции.
+_FLOAT_EXPONENT = re.compile(rb"e[-\d]")
+_FLOAT_TINY = b"0.0000"
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson: тот же байтовый вывод, что у DRF с настройками по умолчанию
+    (компактно, UTF-8 без \\u-экранирования, \\u2028/\\u2029 экранированы).
+    datetime/date/time, Decimal и прочие не-JSON типы уходят в encoder_class.default —
+    форматы DATETIME_FORMAT и decimal-строкой не меняются.
+    Отступы (?indent=, Browsable API), ensure_ascii/не-compact режимы, отсутствие orjson и
+    то, что orjson не умеет (целые > 64 бит), — через stdlib-рендер DRF.
+    float'ы пишет orjson; если в выводе есть экспонента или 0.0000x (форматы расходятся с
+    repr), рендер повторяется через DRF. Decimal encoder отдаёт float'ом; NaN/Infinity из
+    Decimal — TypeError в default, orjson падает, и DRF (STRICT_JSON) поднимает свой ValueError.
+    Нативные float NaN/Infinity до default не доходят — orjson пишет их как null.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_finite_default(self.encoder_class().default),
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _FLOAT_EXPONENT.search(ret) or _FLOAT_TINY in ret:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"\xe2\x80" in ret:
+            for raw, escaped in _LINE_SEPARATORS:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+def _finite_default(default):
+    """default encoder'а, отказывающий на Decimal, который не переводится в конечный float."""
+
+    def wrapped(obj):
+        value = default(obj)
+        if isinstance(obj, Decimal) and not math.isfinite(value):
+            raise TypeError(f"Out of range decimal: {obj!r}")
+        return value
+
+    return wrapped
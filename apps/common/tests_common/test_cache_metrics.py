@@ -0,0 +1,88 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category, Product
+from apps.common import cache_metrics
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    cache.clear()
+    cache_metrics.reset()
+    yield
+    cache_metrics.reset()
+
+
+def test_family_classification():
+    assert cache_metrics.family("product:5") == "product"
+    assert cache_metrics.family("products:list:abc") == "products:list"
+    assert cache_metrics.family("categories:list:abc") == "categories:list"
+    assert cache_metrics.family("orders:list:user:7:abc") == "orders:list:user"
+    assert cache_metrics.family("admin:orders:list:abc") == "admin:orders:list"
+    assert cache_metrics.family("admin:orders:count:abc") is None
+    assert cache_metrics.family("products:list:version") is None
+    assert cache_metrics.family("metrics:tasks:series") is None
+
+
+@pytest.mark.django_db
+def test_hits_misses_sets_and_invalidations_per_family(admin_user, settings):
+    category = Category.objects.create(name="Metrics", slug="metrics")
+    product = Product.objects.create(name="M", price="10.00", stock=5, category=category)
+    client = APIClient()
+
+    for _ in range(3):
+        client.get(reverse("products-detail", args=[product.pk]))
+    client.get(reverse("products-list"))
+    # инвалидация: сигнал удаляет product:<pk> и поднимает версию списка
+    product.name = "M2"
+    product.save()
+    client.get(reverse("products-list"))
+
+    stats = cache_metrics.snapshot()
+    assert stats["product"]["misses"] == 1 and stats["product"]["hits"] == 2
+    assert stats["product"]["sets"] == 1 and stats["product"]["set_bytes"] > 0
+    assert stats["product"]["deletes"] >= 1
+    # после подъёма версии payload найден, но устарел: stale, ответ — MISS
+    assert stats["products:list"]["misses"] == 1 and stats["products:list"]["stale"] == 1
+    assert stats["products:list"]["sets"] == 2 and stats["products:list"]["hit_ratio"] == 0
+    assert stats["products:list"]["version_bumps"] >= 1
+    assert stats["product"]["hit_ratio"] == pytest.approx(2 / 3, abs=1e-3)
+
+    # слишком большое значение считается неудачной записью
+    settings.CACHE_MAX_VALUE_BYTES = 100
+    cache.set("category:999", "x" * 500)
+    assert cache_metrics.snapshot()["category"]["set_failures"] == 1
+
+    admin = APIClient()
+    admin.force_authenticate(admin_user)
+    resp = admin.get(reverse("internal-cache-metrics"))
+    assert resp.status_code == 200
+    assert resp["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = resp.content.decode()
+    assert "# TYPE cache_hits_total counter" in body
+    assert 'cache_hits_total{family="product"} 2' in body
+    assert 'cache_set_failures_total{family="category"} 1' in body
+
+    assert APIClient().get(reverse("internal-cache-metrics")).status_code in (401, 403)
+
+
+def test_value_size_is_taken_from_the_memcached_serde(monkeypatch):
+    serde = cache._options["serde"]
+    calls = []
+    inner = serde._serde
+
+    class Spy:
+        def serialize(self, key, value):
+            calls.append(key)
+            return inner.serialize(key, value)
+    monkeypatch.setattr(serde, "_serde", Spy())
+
+    value = {"rows": list(range(1000))}
+    cache.set("products:list:size", value)
+    # одна сериализация на запись — та, что уходит в memcached
+    assert len(calls) == 1
+    stats = cache_metrics.snapshot()["products:list"]
+    assert stats["sets"] == 1
+    assert stats["set_bytes"] == stats["max_value_bytes"] == len(inner.serialize(calls[0], value)[0])
@@ -0,0 +1,87 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category, Product
+from apps.common import caching
+
+
+class _CountingCache:
+    """Прокси кэша: считает обращения (round trips) по методам."""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self.calls = []
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls.append(name)
+            return attr(*args, **kwargs)
+        return counted
+
+
+@pytest.fixture
+def counting_cache(monkeypatch):
+    cache.clear()
+    proxy = _CountingCache(cache)
+    monkeypatch.setattr(caching, "cache", proxy)
+    return proxy
+
+
+def test_lookup_reads_version_and_payload_in_one_round_trip(counting_cache):
+    data, version = caching.lookup("products:list:k", "products:list:version")
+    assert data is None and version == 1
+
+    caching.store("products:list:k", ["a"], version)
+    counting_cache.calls.clear()
+    assert caching.lookup("products:list:k", "products:list:version") == (["a"], 1)
+    assert counting_cache.calls == ["get_many"]
+
+    # подъём версии делает payload устаревшим без удаления ключа
+    caching.bump_version("products:list:version")
+    assert caching.lookup("products:list:k", "products:list:version") == (None, 2)
+    caching.store("products:list:k", ["b"], 2)
+    assert caching.lookup("products:list:k", "products:list:version") == (["b"], 2)
+
+
+@pytest.mark.django_db
+def test_list_view_hit_miss_and_invalidation(counting_cache):
+    category = Category.objects.create(name="Cached", slug="cached")
+    product = Product.objects.create(name="C", price="10.00", stock=5, category=category)
+    client = APIClient()
+    url = reverse("products-list")
+
+    miss = client.get(url)
+    hit = client.get(url)
+    assert (miss["X-Cache"], hit["X-Cache"]) == ("MISS", "HIT")
+    assert hit.json() == miss.json()
+
+    product.name = "C2"
+    product.save()
+    fresh = client.get(url)
+    assert fresh["X-Cache"] == "MISS"
+    assert fresh.json()[0]["name"] == "C2"
+
+
+@pytest.mark.django_db
+def test_order_detail_hit_still_checks_owner(django_user_model):
+    from apps.orders.models import Order
+
+    cache.clear()
+    owner = django_user_model.objects.create_user("owner", password="x")
+    other = django_user_model.objects.create_user("other", password="x")
+    order = Order.objects.create(user=owner, total_price="0.00")
+    url = reverse("orders-detail", args=[order.pk])
+
+    client = APIClient()
+    client.force_authenticate(owner)
+    assert client.get(url)["X-Cache"] == "MISS"
+    assert client.get(url)["X-Cache"] == "HIT"
+
+    client.force_authenticate(other)
+    assert client.get(url).status_code == 403
@@ -0,0 +1,119 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router, transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category, Product
+from apps.common.db_router import ReplicaRouter, areplica_reads, pin_primary, replica_reads
+from apps.orders.models import Order
+
+
+@pytest.fixture
+def routed(settings, monkeypatch):
+    """Реплика — зеркало default (запросы выполняются); решения роутера пишутся в список."""
+    settings.DATABASE_REPLICAS = ["default"]
+    cache.clear()
+    seen = []
+    original = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        alias = original(self, model, **hints)
+        seen.append((model.__name__, alias))
+        return alias
+    monkeypatch.setattr(ReplicaRouter, "db_for_read", spy)
+    return seen
+
+
+def test_reads_go_to_replica_only_inside_scope(settings):
+    settings.DATABASE_REPLICAS = ["replica1", "replica2"]
+    assert router.db_for_read(Product) == "default"
+    with replica_reads():
+        assert router.db_for_read(Product) in ("replica1", "replica2")
+        assert router.db_for_write(Product) == "default"
+    assert router.db_for_read(Product) == "default"
+
+    settings.DATABASE_REPLICAS = []
+    with replica_reads():
+        assert router.db_for_read(Product) == "default"
+
+
+def test_pinned_readers_stay_on_primary(settings):
+    settings.DATABASE_REPLICAS = ["replica1"]
+    pin_primary("user:1")
+    with replica_reads("user:1"):
+        assert router.db_for_read(Order) == "default"
+    with replica_reads("user:2"):
+        assert router.db_for_read(Order) == "replica1"
+
+    async def check():
+        async with areplica_reads("user:1"):
+            pinned = router.db_for_read(Order)
+        async with areplica_reads("user:2"):
+            free = router.db_for_read(Order)
+        return pinned, free
+    assert async_to_sync(check)() == ("default", "replica1")
+
+
+def test_replica_instances_are_written_to_primary(settings):
+    settings.DATABASE_REPLICAS = ["replica1"]
+    product = Product(name="x")
+    product._state.db = "replica1"
+    assert router.db_for_write(Product, instance=product) == "default"
+    product._state.db = "archive"
+    assert router.db_for_write(Product, instance=product) == "archive"
+
+
+def test_transactions_on_primary_read_primary(routed, transactional_db):
+    with transaction.atomic(), replica_reads():
+        list(Category.objects.all())
+    with replica_reads():
+        list(Category.objects.all())
+    assert routed == [("Category", None), ("Category", "default")]
+
+
+def test_catalog_and_order_lists_read_replicas_until_own_order(routed, transactional_db):
+    user = get_user_model().objects.create_user("reader", password="x")
+    category = Category.objects.create(name="Books", slug="books")
+    product = Product.objects.create(name="Book", price=10, stock=5, category=category)
+    client = APIClient()
+    client.force_authenticate(user)
+
+    # правка каталога закрепила его чтения за primary на DATABASE_REPLICA_PIN_SECONDS
+    routed.clear()
+    assert client.get(reverse("products-list")).status_code == 200
+    assert routed == [("Product", None)]
+
+    cache.delete("db:pin:catalog")  # закрепление истекло
+    routed.clear()
+    assert client.get(reverse("products-list"), {"search": "book"}).status_code == 200
+    assert client.get(reverse("orders-list")).status_code == 200
+    assert routed == [("Product", "default"), ("Order", "default")]
+
+    response = client.post(reverse("orders-list"), {"items": [{"product_id": product.id, "quantity": 1}]}, format="json")
+    assert response.status_code == 201
+
+    # свой заказ виден сразу: список пользователя строится с primary
+    routed.clear()
+    assert client.get(reverse("orders-list")).json()[0]["id"] == response.json()["id"]
+    assert routed and all(alias is None for model, alias in routed if model == "Order")
+
+
+def test_order_writes_pin_affected_lists(settings, transactional_db):
+    settings.DATABASE_REPLICAS = ["replica1"]
+    from apps.orders.services import transition_orders
+
+    owner = get_user_model().objects.create_user("owner", password="x")
+    order = Order.objects.create(user=owner, status=Order.STATUS_PENDING, total_price=10)
+    cache.clear()
+
+    # отмена/смена статуса: список автора и админский список — с primary, чужие — с реплики
+    assert transition_orders([order.id], Order.STATUS_CANCELLED)[0] == [order.id]
+    with replica_reads("orders:admin"):
+        assert router.db_for_read(Order) == "default"
+    with replica_reads("orders:users", f"user:{owner.id}"):
+        assert router.db_for_read(Order) == "default"
+    with replica_reads("orders:users", f"user:{owner.id + 1}"):
+        assert router.db_for_read(Order) == "replica1"
@@ -0,0 +1,82 @@
+import io
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category, Product
+from apps.common import renderers
+from apps.common.parsers import FastJSONParser
+from apps.common.renderers import FastJSONRenderer
+
+SAMPLE = {
+    "price": Decimal("12.30"),
+    "created_at": datetime(2025, 3, 1, 10, 5, 7, 123456, tzinfo=timezone.utc),
+    "day": date(2025, 3, 1),
+    "text": "ёлка и  \"кавычки\" </script>",
+    "lazy": gettext_lazy("Not found."),
+    1: [1.5, None, True, {"nested": ("a", "b")}],
+}
+
+
+@pytest.mark.parametrize("data", [
+    SAMPLE, [SAMPLE] * 3, [], {}, "plain", 2 ** 70,
+    {"hit_ratio": 0.25, "big": 1e16, "small": 1e-7, "negative": -2.5e-05}, [1e300, 0.1 + 0.2], {1e16: "key"},
+    [Decimal("1E+20"), Decimal("0.00001"), Decimal("-0")], {"label": "1e5 и 0.00001 в строке"},
+])
+def test_renderer_output_matches_drf(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize("value", [Decimal("NaN"), Decimal("Infinity"), Decimal("-Infinity"), Decimal("1E+400")])
+def test_renderer_rejects_non_finite_decimals_like_drf(value):
+    with pytest.raises(ValueError):
+        JSONRenderer().render({"ratio": value})
+    with pytest.raises(ValueError):
+        FastJSONRenderer().render({"ratio": value})
+
+
+def test_renderer_uses_orjson_and_falls_back_for_indent(monkeypatch):
+    assert renderers.orjson is not None
+    drf_render = JSONRenderer.render
+    expected = drf_render(JSONRenderer(), SAMPLE)
+    with monkeypatch.context() as patch:
+        patch.setattr(JSONRenderer, "render", lambda *args, **kwargs: pytest.fail("фолбэк на DRF"))
+        assert FastJSONRenderer().render(SAMPLE) == expected
+
+    expected = JSONRenderer().render(SAMPLE, "application/json; indent=4")
+    assert FastJSONRenderer().render(SAMPLE, "application/json; indent=4") == expected
+
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+
+
+@pytest.mark.parametrize("body", [b'{"a": [1, 2.5, "\xd1\x91"], "b": null}', b"[" + b"9" * 30 + b"]"])
+def test_parser_matches_drf(body):
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+
+@pytest.mark.parametrize("body", [b"{broken", b'{"a": NaN}'])
+def test_parser_errors_match_drf(body):
+    with pytest.raises(ParseError) as fast:
+        FastJSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError) as drf:
+        JSONParser().parse(io.BytesIO(body))
+    assert str(fast.value) == str(drf.value)
+
+
+@pytest.mark.django_db
+def test_api_uses_fast_renderer_by_default():
+    category = Category.objects.create(name="Json", slug="json")
+    Product.objects.create(name="Ёлка", price="1999.90", stock=1, category=category)
+
+    response = APIClient().get(reverse("products-list"))
+    assert isinstance(response.accepted_renderer, FastJSONRenderer)
+    assert response.content == JSONRenderer().render(response.data)
+    assert response.json()[0]["price"] == "1999.90"
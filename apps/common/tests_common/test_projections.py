@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models.functions import Lower
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category, Product
+from apps.catalog.serializers import (
+    CategoryListSerializer, ProductListSerializer, category_list_projection, product_list_projection,
+)
+from apps.orders.models import Order, OrderItem
+from apps.orders.serializers import OrderListSerializer, order_list_projection
+
+
+def _render(data) -> bytes:
+    return JSONRenderer().render(data)
+
+
+@pytest.fixture
+def store(db):
+    user = get_user_model().objects.create_user("proj", password="x")
+    categories = [Category.objects.create(name=f"Cat {i} ёж", slug=f"cat-{i}") for i in range(3)]
+    products = [
+        Product.objects.create(name=f"P{i}", price=Decimal(price), stock=1, category=categories[i % 3])
+        for i, price in enumerate(["0.50", "10", "1999.99", "12.3"])
+    ]
+    orders = [Order.objects.create(user=user, total_price=Decimal("0")) for _ in range(3)]
+    for order, count in zip(orders, (0, 1, 3)):
+        for product in products[:count]:
+            OrderItem.objects.create(order=order, product=product, quantity=1, price_at_purchase=product.price)
+    return user
+
+
+@pytest.mark.parametrize("tz", ["UTC", "Asia/Vladivostok"])
+def test_projections_match_serializers_byte_for_byte(store, tz):
+    products = Product.objects.filter(is_active=True).select_related("category").order_by(Lower("name"))
+    categories = Category.objects.order_by(Lower("name"))
+    orders = Order.objects.order_by("-created_at")
+
+    with timezone.override(tz):
+        assert _render(product_list_projection.data(products)) == _render(ProductListSerializer(products, many=True).data)
+        assert _render(category_list_projection.data(categories)) == _render(CategoryListSerializer(categories, many=True).data)
+        assert _render(order_list_projection.data(orders)) == _render(OrderListSerializer(orders, many=True).data)
+
+    assert sorted(row["items_count"] for row in order_list_projection.data(orders)) == [0, 1, 3]
+
+
+def test_order_list_views_use_projection_without_n_plus_one(store, admin_user, django_assert_max_num_queries):
+    client = APIClient()
+    client.force_authenticate(admin_user)
+    with django_assert_max_num_queries(6):
+        response = client.get(reverse("admin-orders-list"))
+    assert response.status_code == 200
+    assert response.json()["results"][0]["items_count"] == 3
+
+    client.force_authenticate(store)
+    with django_assert_max_num_queries(4):
+        data = client.get(reverse("orders-list")).json()
+    assert _render(data) == _render(OrderListSerializer(Order.objects.filter(user=store).order_by("-created_at"), many=True).data)
@@ -0,0 +1,73 @@
+from collections import Counter
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F, Max, Sum
+
+from apps.catalog.models import Category, Product
+from apps.orders.models import Order, OrderItem
+
+MODELS = {"category": Category, "product": Product, "user": get_user_model(), "order": Order}
+
+
+def _last_ids() -> dict:
+    return {name: model.objects.aggregate(m=Max("pk"))["m"] or 0 for name, model in MODELS.items()}
+
+
+def _run(start: dict, end: dict) -> tuple:
+    """Строки одного прогона (id из (start, end]); ссылки — относительно начала прогона."""
+    products = Product.objects.filter(pk__gt=start["product"], pk__lte=end["product"]).order_by("id")
+    orders = Order.objects.filter(pk__gt=start["order"], pk__lte=end["order"]).order_by("id")
+    items = OrderItem.objects.filter(order_id__gt=start["order"], order_id__lte=end["order"]).order_by("id")
+    return (
+        [(price, cat - start["category"], active)
+         for price, cat, active in products.values_list("price", "category_id", "is_active")],
+        [(user - start["user"], status, total)
+         for user, status, total in orders.values_list("user_id", "status", "total_price")],
+        [(order - start["order"], prod - start["product"], qty, price)
+         for order, prod, qty, price in items.values_list("order_id", "product_id", "quantity", "price_at_purchase")],
+    )
+
+
+@pytest.mark.django_db
+def test_seed_store_generates_consistent_skewed_data():
+    cache.clear()
+    call_command("seed_store", products=300, orders=2000, categories=10, users=50, seed=3, batch_size=700, stdout=None)
+
+    assert Category.objects.count() == 10
+    assert Product.objects.count() == 300
+    assert Order.objects.count() == 2000
+    assert Order.objects.values("user").distinct().count() <= 50
+
+    # total_price = Σ позиций, цена позиции = цена продукта
+    sums = dict(
+        OrderItem.objects.values("order_id").annotate(s=Sum(F("quantity") * F("price_at_purchase"))).values_list("order_id", "s")
+    )
+    for oid, total in Order.objects.values_list("id", "total_price"):
+        assert Decimal(sums[oid]).quantize(Decimal("0.01")) == total
+    assert not OrderItem.objects.exclude(price_at_purchase=F("product__price")).exists()
+
+    # skew: самый популярный SKU встречается намного чаще медианного
+    per_product = sorted(Counter(OrderItem.objects.values_list("product_id", flat=True)).values(), reverse=True)
+    assert per_product[0] > 10 * per_product[len(per_product) // 2]
+
+    # сигналы не срабатывали — версии списков подняты одним шагом
+    assert cache.get("products:list:version") == 2
+    assert cache.get("orders:user:list:version") == 2
+
+
+@pytest.mark.django_db
+def test_seed_store_is_deterministic():
+    options = dict(products=50, orders=200, categories=3, users=10, seed=11, stdout=None)
+    start = _last_ids()
+    call_command("seed_store", **options)
+    middle = _last_ids()
+    call_command("seed_store", **options)
+    end = _last_ids()
+
+    first, second = _run(start, middle), _run(middle, end)
+    assert len(first[2]) > 200
+    assert first == second
@@ -0,0 +1,80 @@
+import logging
+import re
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Category, Product
+from apps.common import timing
+
+
+def _phases(header: str) -> dict:
+    """'db;dur=1.2;desc="db x3", app;dur=0.4' → {"db": (1.2, 3), "app": (0.4, None)}."""
+    out = {}
+    for part in header.split(", "):
+        m = re.match(r'(\w+);dur=([\d.]+)(?:;desc="\w+ x(\d+)")?$', part)
+        assert m, part
+        out[m.group(1)] = (float(m.group(2)), int(m.group(3)) if m.group(3) else None)
+    return out
+
+
+@pytest.mark.django_db
+def test_server_timing_header_has_phase_breakdown(settings):
+    settings.SERVER_TIMING_HEADER = True
+    cache.clear()
+    category = Category.objects.create(name="Timing", slug="timing")
+    for i in range(3):
+        Product.objects.create(name=f"T{i}", price="10.00", stock=5, category=category)
+    client = APIClient()
+
+    miss = client.get(reverse("products-list"))
+    assert miss.status_code == 200 and miss["X-Cache"] == "MISS"
+    phases = _phases(miss["Server-Timing"])
+    assert {"db", "cache", "serialize", "render", "app", "total"} <= set(phases)
+    assert phases["db"][1] >= 1
+    # фазы исключающие: их сумма не превышает общего времени
+    measured = sum(ms for name, (ms, _) in phases.items() if name != "total")
+    assert measured <= phases["total"][0] + 0.01
+
+    hit = client.get(reverse("products-list"))
+    assert hit["X-Cache"] == "HIT"
+    phases = _phases(hit["Server-Timing"])
+    assert "serialize" not in phases and "cache" in phases
+
+
+@pytest.mark.django_db
+def test_server_timing_disabled_and_slow_log(settings, caplog):
+    settings.SERVER_TIMING_HEADER = False
+    settings.SERVER_TIMING_SLOW_MS = 0.001
+    cache.clear()
+    Category.objects.create(name="Slow", slug="slow")
+
+    with caplog.at_level(logging.WARNING, logger="apps.common.timing"):
+        response = APIClient().get(reverse("categories-list"))
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response
+    record = next(r for r in caplog.records if r.name == "apps.common.timing")
+    assert "Slow request GET /api/" in record.getMessage()
+    assert "SELECT" in record.getMessage()
+    assert "db" in record.timings and "total" in record.timings
+    # вне запроса collector не активен
+    assert timing.current() is None
+
+
+def test_db_wrapper_survives_connection_opened_inside_execute_wrapper():
+    def mine(execute, sql, params, many, context):
+        return execute(sql, params, many, context)
+
+    # соединение открылось внутри чужого execute_wrapper(): connection_created срабатывает в блоке
+    saved = list(connection.execute_wrappers)
+    connection.execute_wrappers.clear()
+    try:
+        with connection.execute_wrapper(mine):
+            timing.install_db_wrapper(sender=type(connection), connection=connection)
+        assert connection.execute_wrappers == [timing.db_wrapper]
+    finally:
+        connection.execute_wrappers[:] = saved
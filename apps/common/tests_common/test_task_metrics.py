@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.common import metrics
+from apps.orders import notifier, tasks
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics(settings):
+    settings.TASK_METRICS_FLUSH_INTERVAL = 0
+    cache.clear()
+    metrics.reset()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_task_phases_counters_and_retries_reach_endpoint(admin_user, django_user_model, settings, tmp_path, monkeypatch):
+    from apps.catalog.models import Category, Product
+    from apps.orders.models import Order
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    category = Category.objects.create(name="Cat")
+    product = Product.objects.create(name="Mouse", price="10.00", stock=5, category=category)
+    order = Order.objects.create(user=admin_user)
+    order.items.create(product=product, quantity=1, price_at_purchase=Decimal("10.00"))
+
+    name = tasks.order_created_generate_pdf_and_email.name
+    tasks.order_created_generate_pdf_and_email.apply(args=(order.id,))
+    tasks.order_created_generate_pdf_and_email.apply(args=(order.id,))  # файл уже есть — без render
+
+    def circuit_open(order_id):
+        raise notifier.CircuitOpenError(5)
+
+    monkeypatch.setattr(notifier, "send_shipped", circuit_open)
+    tasks.order_shipped_notify_external.apply(args=(order.id,))
+
+    client = APIClient()
+    client.force_authenticate(admin_user)
+    data = client.get(reverse("internal-task-metrics")).json()
+
+    created = data[name]
+    assert created["counters"] == {"started": 2, "succeeded": 2}
+    assert created["phases"]["fetch"]["count"] == 2
+    assert created["phases"]["render"]["count"] == 1
+    assert created["phases"]["write"]["count"] == 1
+    assert created["phases"]["total"]["count"] == 2
+    assert created["phases"]["total"]["p99_ms"] is not None
+    assert sum(created["phases"]["total"]["buckets"].values()) == 2
+
+    shipped = data[tasks.order_shipped_notify_external.name]
+    assert shipped["counters"]["retried"] >= 1
+
+    user = django_user_model.objects.create_user(username="plain", password="x")
+    client.force_authenticate(user)
+    assert client.get(reverse("internal-task-metrics")).status_code == 403
+
+
+def test_management_command_prints_and_resets(capsys):
+    metrics.observe("orders.demo", "render", 0.02)
+    metrics.count("orders.demo", "started")
+    metrics.flush(force=True)
+
+    call_command("task_metrics", "--json")
+    out = json.loads(capsys.readouterr().out)
+    assert out["orders.demo"]["phases"]["render"]["p50_ms"] == 25
+
+    call_command("task_metrics", "--reset")
+    assert "orders.demo" in capsys.readouterr().out
+    assert metrics.snapshot() == {}
+
+
+def test_idle_worker_flushes_by_age_and_on_shutdown(settings):
+    from celery.signals import worker_process_shutdown, worker_shutdown
+
+    settings.TASK_METRICS_FLUSH_INTERVAL = 3600
+    metrics.flush(force=True)  # интервал отсчитывается от этого сброса
+
+    # без задач task_postrun не сработает: сброс — сигналом завершения воркера
+    metrics.count("quiet", "succeeded")
+    worker_process_shutdown.send(sender=None, pid=0, exitcode=0)
+    assert metrics.snapshot()["quiet"]["counters"] == {"succeeded": 1}
+    metrics.count("quiet", "succeeded")
+    worker_shutdown.send(sender=None)
+    assert metrics.snapshot()["quiet"]["counters"] == {"succeeded": 2}
+
+    # простаивающий воркер: фоновый поток сбрасывает накопленное по возрасту
+    settings.TASK_METRICS_FLUSH_INTERVAL = 0.1
+    metrics.count("quiet", "failed")
+    metrics._start_idle_flusher()
+    deadline = time.monotonic() + 5
+    while "failed" not in metrics.snapshot()["quiet"]["counters"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert metrics.snapshot()["quiet"]["counters"] == {"succeeded": 2, "failed": 1}
+
+
+def test_concurrent_flushes_keep_every_new_series():
+    # два воркера одновременно заводят новые серии: реестр не перезаписывается целиком
+    def worker(i):
+        metrics.observe(f"task{i}", "total", 0.01)
+        metrics.count(f"task{i}", "succeeded")
+        metrics.flush(force=True)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    data = metrics.snapshot()
+    assert sorted(data) == [f"task{i}" for i in range(8)]
+    assert all(data[f"task{i}"]["counters"] == {"succeeded": 1} for i in range(8))
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
@@ -0,0 +1,122 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("request_timings", default=None)
+
+# фазы в порядке вывода в Server-Timing
+PHASES = ("db", "cache", "serialize", "render")
+
+
+class RequestTimings:
+    """
+    Разбивка времени одного запроса по фазам: {phase: [секунды, число вызовов]} (+ SQL для slow-лога).
+    Фазы исключающие: ленивые SQL внутри serialize идут в db, а не в serialize.
+    """
+
+    def __init__(self, collect_queries: bool = False):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.queries = [] if collect_queries else None
+        self._active = set()
+        self._accounted = 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+        self._accounted += seconds
+
+    def add_query(self, sql: str, seconds: float) -> None:
+        self.add("db", seconds)
+        if self.queries is not None and len(self.queries) < 100:
+            self.queries.append((round(seconds * 1000, 3), sql))
+
+    @contextmanager
+    def phase(self, name: str):
+        # вложенные вызовы одной фазы (cache.get_many → get) не считаем дважды
+        if name in self._active:
+            yield
+            return
+        self._active.add(name)
+        started = time.perf_counter()
+        accounted = self._accounted
+        try:
+            yield
+        finally:
+            self._active.discard(name)
+            nested = self._accounted - accounted
+            self.add(name, max(time.perf_counter() - started - nested, 0.0))
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self) -> dict:
+        """{phase: (мс, вызовов)} + app — время вне измеренных фаз."""
+        total = self.total_ms()
+        out = {name: (round(sec * 1000, 3), n) for name, (sec, n) in self.phases.items()}
+        measured = sum(ms for ms, _ in out.values())
+        out["app"] = (round(max(total - measured, 0.0), 3), 1)
+        out["total"] = (round(total, 3), 1)
+        return out
+
+    def header(self) -> str:
+        """Значение заголовка Server-Timing."""
+        summary = self.summary()
+        names = [p for p in PHASES if p in summary] + [p for p in summary if p not in PHASES]
+        parts = []
+        for name in names:
+            ms, count = summary[name]
+            if name in ("app", "total"):
+                parts.append(f"{name};dur={ms}")
+            else:
+                parts.append(f'{name};dur={ms};desc="{name} x{count}"')
+        return ", ".join(parts)
+
+
+def current():
+    """Collector текущего запроса или None (вне ServerTimingMiddleware)."""
+    return _current.get()
+
+
+def activate(timings: RequestTimings):
+    return _current.set(timings)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """
+    execute_wrapper для всех соединений (CommonConfig.ready, connection_created): SQL идёт в фазу
+    db текущего запроса. Collector — в contextvar, поэтому работает и для async ORM (sync_to_async
+    копирует контекст в поток с соединением).
+    """
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(sql, time.perf_counter() - started)
+
+
+def install_db_wrapper(sender, connection, **kwargs) -> None:
+    """Обработчик connection_created: wrapper ставится один раз на DatabaseWrapper (и переживает переподключения)."""
+    if db_wrapper not in connection.execute_wrappers:
+        # в начало списка: connection.execute_wrapper() снимает последний элемент (LIFO),
+        # а соединение может открыться внутри такого блока
+        connection.execute_wrappers.insert(0, db_wrapper)
+
+
+@contextmanager
+def phase(name: str):
+    """Замер фазы в текущем запросе; вне запроса — без накладных расходов."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    with timings.phase(name):
+        yield
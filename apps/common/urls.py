@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import CacheMetricsView, TaskMetricsView
+
+urlpatterns = [
+    # внутренние метрики
+    path("internal/metrics/tasks/", TaskMetricsView.as_view(), name="internal-task-metrics"),
+    path("internal/metrics/cache/", CacheMetricsView.as_view(), name="internal-cache-metrics"),
+]
@@ -1,3 +1,27 @@
-from django.shortcuts import render
+from django.http import HttpResponse
+from rest_framework import generics, permissions
+from rest_framework.response import Response
 
-# Create your views here.
+from apps.common import cache_metrics, metrics
+
+
+class TaskMetricsView(generics.GenericAPIView):
+    """
+    GET /api/v1/internal/metrics/tasks/ — метрики Celery-задач (только админ):
+    счётчики и гистограммы длительности по задаче и фазе (apps.common.metrics.snapshot).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(metrics.snapshot())
+
+
+class CacheMetricsView(generics.GenericAPIView):
+    """
+    GET /api/v1/internal/metrics/cache/ — эффективность кэша по семействам ключей (только админ),
+    текстовый формат Prometheus. Счётчики в памяти процесса: каждый воркер отдаёт свои.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(cache_metrics.prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
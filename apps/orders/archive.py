@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils import timezone
+
+from apps.orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderIntent, OrderItem, ReceiptJob
+from apps.orders.signals import bump_order_lists
+
+FINAL_STATUSES = (Order.STATUS_DELIVERED, Order.STATUS_CANCELLED)
+
+
+def archive_database() -> str:
+    """Алиас БД архива (ORDERS_ARCHIVE_DATABASE, по умолчанию та же default)."""
+    return getattr(settings, "ORDERS_ARCHIVE_DATABASE", "default")
+
+
+def archive_batch(older_than_days: int, batch_size: int) -> int:
+    """
+    Перенос одной пачки завершённых заказов в архив. Возвращает число перенесённых заказов.
+    Порядок: копия в архив (ignore_conflicts — повтор после сбоя идемпотентен), затем
+    удаление из горячих таблиц одной транзакцией. Удаление — _raw_delete без сбора
+    объектов и post_delete на каждую позицию: кэш сбрасываем одним delete_many + bump.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    ids = list(
+        Order.objects
+        .filter(status__in=FINAL_STATUSES, updated_at__lt=cutoff)
+        .order_by("id")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+
+    orders = [
+        ArchivedOrder(
+            id=oid, user_id=user_id, status=status, total_price=total,
+            created_at=created_at, updated_at=updated_at,
+        )
+        for oid, user_id, status, total, created_at, updated_at in Order.objects.filter(pk__in=ids).values_list(
+            "id", "user_id", "status", "total_price", "created_at", "updated_at"
+        )
+    ]
+    items = [
+        ArchivedOrderItem(
+            id=iid, order_id=order_id, product_id=product_id, product_name=name, category_id=category_id,
+            quantity=qty, price_at_purchase=price, created_at=created_at,
+        )
+        for iid, order_id, product_id, name, category_id, qty, price, created_at in (
+            OrderItem.objects.filter(order_id__in=ids).values_list(
+                "id", "order_id", "product_id", "product__name", "product__category_id",
+                "quantity", "price_at_purchase", "created_at",
+            )
+        )
+    ]
+
+    db = archive_database()
+    with transaction.atomic(using=db):
+        ArchivedOrder.objects.using(db).bulk_create(orders, ignore_conflicts=True)
+        ArchivedOrderItem.objects.using(db).bulk_create(items, ignore_conflicts=True, batch_size=1000)
+
+    with transaction.atomic():
+        OrderIntent.objects.filter(order_id__in=ids).update(order=None)
+        ReceiptJob.objects.filter(order_id__in=ids)._raw_delete(router.db_for_write(ReceiptJob))
+        OrderItem.objects.filter(order_id__in=ids)._raw_delete(router.db_for_write(OrderItem))
+        Order.objects.filter(pk__in=ids)._raw_delete(router.db_for_write(Order))
+
+    cache.delete_many([f"order:{oid}" for oid in ids])
+    bump_order_lists([order.user_id for order in orders])
+    return len(ids)
+
+
+def get_archived_order(pk: int):
+    """Архивный заказ с позициями (для fallback в OrderDetailView) или None."""
+    return (
+        ArchivedOrder.objects.using(archive_database())
+        .prefetch_related("items")
+        .filter(pk=pk)
+        .first()
+    )
@@ -0,0 +1,83 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from apps.orders.models import OrderItem
+
+ORDER_FIELDS = ("id", "user_id", "status", "total_price", "created_at", "updated_at")
+CSV_HEADER = ORDER_FIELDS + ("items_count", "items")
+
+
+class _Echo:
+    """Псевдо-буфер для csv.writer: write() возвращает строку, а не копит её."""
+
+    def write(self, value):
+        return value
+
+
+def _fmt_dt(value) -> str:
+    # тот же формат, что и в API (REST_FRAMEWORK.DATETIME_FORMAT)
+    return timezone.localtime(value).strftime(api_settings.DATETIME_FORMAT)
+
+
+def iter_order_chunks(queryset, chunk_size: int = 2000):
+    """
+    Заказы пачками по chunk_size: values_list() через .iterator(chunk_size) — без моделей и без
+    кэша результатов queryset; позиции подгружаются одним запросом на пачку из той же БД (queryset.db).
+    Отдаёт списки dict'ов: {id, user_id, status, total_price, created_at, updated_at, items: [...]}.
+    """
+    rows = queryset.values_list(*ORDER_FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        items_by_order = defaultdict(list)
+        items_qs = (
+            OrderItem.objects.using(queryset.db)
+            .filter(order_id__in=[row[0] for row in chunk])
+            .order_by("order_id", "id")
+            .values_list("order_id", "product_id", "quantity", "price_at_purchase")
+        )
+        for order_id, product_id, quantity, price in items_qs:
+            items_by_order[order_id].append(
+                {"product_id": product_id, "quantity": quantity, "price_at_purchase": f"{price:.2f}"}
+            )
+        yield [
+            {
+                "id": order_id,
+                "user_id": user_id,
+                "status": status,
+                "total_price": f"{total:.2f}",
+                "created_at": _fmt_dt(created_at),
+                "updated_at": _fmt_dt(updated_at),
+                "items": items_by_order.get(order_id, []),
+            }
+            for order_id, user_id, status, total, created_at, updated_at in chunk
+        ]
+
+
+def stream_csv(chunks):
+    """CSV: строка на заказ; items — «product_id:quantity:price» через «|»."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for chunk in chunks:
+        yield "".join(
+            writer.writerow(
+                [row[f] for f in ORDER_FIELDS]
+                + [
+                    len(row["items"]),
+                    "|".join(f"{i['product_id']}:{i['quantity']}:{i['price_at_purchase']}" for i in row["items"]),
+                ]
+            )
+            for row in chunk
+        )
+
+
+def stream_jsonl(chunks):
+    """JSON Lines: объект заказа с позициями на строку."""
+    for chunk in chunks:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in chunk)
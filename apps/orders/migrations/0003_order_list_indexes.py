@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+        ('orders', '0002_orderintent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at'], include=('status', 'user', 'total_price', 'updated_at'), name='order_created_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at'], include=('status', 'total_price', 'updated_at'), name='order_user_created_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'user', '-created_at'], include=('total_price', 'updated_at'), name='order_status_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=8)),
+                ('bucket', models.DateTimeField()),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('product', 'Product'), ('category', 'Category')], max_length=16)),
+                ('ref_id', models.BigIntegerField(default=0)),
+                ('orders_count', models.IntegerField(default=0)),
+                ('units', models.BigIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'dimension', 'bucket'], name='orders_sale_period_3c2449_idx')],
+                'constraints': [models.UniqueConstraint(fields=('period', 'bucket', 'dimension', 'ref_id'), name='uniq_sales_rollup_row')],
+            },
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db.models import F, Sum, DecimalField, Value
 from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from apps.catalog.models import Product  # важно: используем каталог
 
@@ -38,27 +39,85 @@ class Order(models.Model):
         indexes = [
             models.Index(fields=['user']),
             models.Index(fields=['status', '-created_at']),
+            # админские/пользовательские списки: фильтр + сортировка по -created_at;
+            # include делает индексы покрывающими для OrderListSerializer (PostgreSQL)
+            models.Index(
+                fields=['-created_at'],
+                include=['status', 'user', 'total_price', 'updated_at'],
+                name='order_created_cover_idx',
+            ),
+            models.Index(
+                fields=['user', '-created_at'],
+                include=['status', 'total_price', 'updated_at'],
+                name='order_user_created_cover_idx',
+            ),
+            models.Index(
+                fields=['status', 'user', '-created_at'],
+                include=['total_price', 'updated_at'],
+                name='order_status_user_created_idx',
+            ),
         ]
 
+    # машина состояний: статус → допустимые следующие статусы
+    VALID_TRANSITIONS = {
+        STATUS_PENDING: [STATUS_PROCESSING, STATUS_CANCELLED],
+        STATUS_PROCESSING: [STATUS_SHIPPED, STATUS_CANCELLED],
+        STATUS_SHIPPED: [STATUS_DELIVERED],
+        STATUS_DELIVERED: [],
+        STATUS_CANCELLED: [],
+    }
+
+    @classmethod
+    def allowed_predecessors(cls, status: str) -> list:
+        """Статусы, из которых допустим переход в status."""
+        return [src for src, targets in cls.VALID_TRANSITIONS.items() if status in targets]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # статус на момент чтения — для clean() без повторного SELECT
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def clean(self):
         """Валидируем переход статуса и инварианты."""
-        valid_transitions = {
-            self.STATUS_PENDING: [self.STATUS_PROCESSING, self.STATUS_CANCELLED],
-            self.STATUS_PROCESSING: [self.STATUS_SHIPPED, self.STATUS_CANCELLED],
-            self.STATUS_SHIPPED: [self.STATUS_DELIVERED],
-            self.STATUS_DELIVERED: [],
-            self.STATUS_CANCELLED: [],
-        }
         if self.pk:
-            old_status = type(self).objects.only('status').get(pk=self.pk).status
-            if self.status != old_status and self.status not in valid_transitions[old_status]:
+            old_status = getattr(self, '_loaded_status', None)
+            if old_status is None:
+                old_status = type(self).objects.only('status').get(pk=self.pk).status
+            if self.status != old_status and self.status not in self.VALID_TRANSITIONS[old_status]:
                 raise ValidationError(f"Невозможно изменить статус {old_status} → {self.status}")
 
         if self.total_price < 0:
             raise ValidationError("total_price не может быть меньше 0")
 
+    def transition_to(self, status: str) -> bool:
+        """
+        Compare-and-set перехода статуса одним запросом:
+          UPDATE ... SET status=? WHERE id=? AND status IN (допустимые предшественники)
+        0 затронутых строк → переход недопустим (в т.ч. статус успели сменить конкурентно).
+        Возвращает False, если заказ уже в этом статусе (ничего не пишем).
+        update() не шлёт post_save — инвалидация кэша на вызывающей стороне.
+        """
+        if status == self.status:
+            return False
+        now = timezone.now()
+        rows = type(self).objects.filter(
+            pk=self.pk, status__in=self.allowed_predecessors(status)
+        ).update(status=status, updated_at=now)
+        if not rows:
+            raise ValidationError(f"Невозможно изменить статус {self.status} → {status}")
+        self.status = status
+        self.updated_at = now
+        self._loaded_status = status
+        return True
+
     def recalc_total(self, save: bool = True):
-        """Пересчёт total_price: Σ(quantity * price_at_purchase)."""
+        """
+        Полный пересчёт total_price: Σ(quantity * price_at_purchase).
+        В штатном потоке не нужен — total ведут дельты OrderItem.save()/delete();
+        расхождения чинит tasks.verify_order_totals.
+        """
         agg = self.items.aggregate(
             s=Coalesce(
                 Sum(
@@ -75,13 +134,19 @@ class Order(models.Model):
 
     def save(self, *args, **kwargs):
         """
-        Сохраняем заказ. total не считаем до появления items.
-        Рекомендованная последовательность в сервисе:
-          1) создать Order
-          2) создать OrderItem(...)
-          3) order.recalc_total()
+        Сохраняем заказ. total не считаем до появления items:
+          - services.place_orders создаёт заказ сразу с готовым total_price;
+          - дальнейшие изменения состава применяют дельту к total (OrderItem.save()/delete()).
         """
         super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'status' in update_fields:
+            self._loaded_status = self.status
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or 'status' in fields:
+            self._loaded_status = self.status
 
     @property
     def is_readonly(self):
@@ -111,23 +176,218 @@ class OrderItem(models.Model):
         if self.order.is_readonly:
             raise ValidationError("Нельзя изменять состав заказа после отправки/доставки/отмены")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # значения на момент чтения: проверка «исторических» полей и дельта total без SELECT
+        tracked = ('product_id', 'price_at_purchase', 'quantity')
+        if all(f in instance.__dict__ for f in tracked):
+            instance._loaded_values = {f: instance.__dict__[f] for f in tracked}
+        return instance
+
+    def _apply_total_delta(self, delta: Decimal) -> None:
+        """total_price заказа += delta одним UPDATE с F() (без агрегата по всем позициям)."""
+        if not delta or not self.order_id:
+            return
+        Order.objects.filter(pk=self.order_id).update(total_price=F('total_price') + delta)
+        if type(self).order.is_cached(self):
+            self.order.total_price += delta
+
     def save(self, *args, **kwargs):
         is_create = self._state.adding
         if is_create:
             # проставляем цену покупки, если не задана
             if self.price_at_purchase is None:
                 self.price_at_purchase = self.product.price
+            old_quantity = 0
         else:
             # запрещаем менять «исторические» поля
-            old = type(self).objects.only('product_id', 'price_at_purchase').get(pk=self.pk)
-            if self.product_id != old.product_id:
+            old = getattr(self, '_loaded_values', None)
+            if old is None:
+                row = type(self).objects.only('product_id', 'price_at_purchase', 'quantity').get(pk=self.pk)
+                old = {'product_id': row.product_id, 'price_at_purchase': row.price_at_purchase, 'quantity': row.quantity}
+            if self.product_id != old['product_id']:
                 raise ValidationError("Нельзя менять продукт в существующей позиции заказа")
-            if self.price_at_purchase != old.price_at_purchase:
+            if self.price_at_purchase != old['price_at_purchase']:
                 raise ValidationError("Нельзя менять price_at_purchase в существующей позиции заказа")
+            old_quantity = old['quantity']
 
         super().save(*args, **kwargs)
 
-        # после изменения состава — пересчитать total заказа
-        # (делаем только если у order уже есть pk)
-        if self.order_id:
-            self.order.recalc_total(save=True)
+        # после изменения состава — дельта к total заказа
+        self._apply_total_delta((self.quantity - old_quantity) * Decimal(self.price_at_purchase))
+        self._loaded_values = {
+            'product_id': self.product_id,
+            'price_at_purchase': self.price_at_purchase,
+            'quantity': self.quantity,
+        }
+
+    def delete(self, *args, **kwargs):
+        quantity = getattr(self, '_loaded_values', {}).get('quantity', self.quantity)
+        result = super().delete(*args, **kwargs)
+        self._apply_total_delta(-quantity * Decimal(self.price_at_purchase))
+        return result
+
+
+class OrderIntent(models.Model):
+    """
+    Заявка на заказ при асинхронном приёме (202 Accepted).
+    Payload уже провалидирован OrderCreateSerializer; заказ создаёт воркер
+    пакетно (tasks.process_order_intents).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.PROTECT, related_name='order_intents')
+    items = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    order = models.OneToOneField(
+        Order, null=True, blank=True, on_delete=models.SET_NULL, related_name='intent'
+    )
+    error = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+
+class ReceiptJob(models.Model):
+    """
+    Задание на PDF-квитанцию (ORDERS_RECEIPTS_MODE=batch).
+    Задания разбирает пакетно tasks.render_pending_receipts — без задачи Celery на каждый заказ.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='receipt_job')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+
+class OutboxEvent(models.Model):
+    """
+    Transactional outbox: событие по заказу пишется в той же транзакции, что и сам заказ;
+    в Celery его публикует relay (tasks.relay_outbox) пачками и затем удаляет строку.
+    order_id — без FK: событие переживает архивацию заказа.
+    """
+    TOPIC_ORDER_CREATED = 'order.created'
+    TOPIC_ORDER_SHIPPED = 'order.shipped'
+
+    TOPIC_CHOICES = [
+        (TOPIC_ORDER_CREATED, 'Order created'),
+        (TOPIC_ORDER_SHIPPED, 'Order shipped'),
+    ]
+
+    topic = models.CharField(max_length=50, choices=TOPIC_CHOICES)
+    order_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+
+class SalesRollup(models.Model):
+    """
+    Инкрементальные агрегаты продаж (отчёты читают только их, без SUM по заказам).
+    Строка = (период, начало бакета UTC, измерение, ref_id):
+      - dimension=total:    ref_id = 0
+      - dimension=product:  ref_id = product_id
+      - dimension=category: ref_id = category_id (на момент продажи)
+    Отменённые заказы вычитаются. Ведение — apps.orders.rollups.
+    """
+    PERIOD_HOUR = 'hour'
+    PERIOD_DAY = 'day'
+    PERIOD_CHOICES = [
+        (PERIOD_HOUR, 'Hour'),
+        (PERIOD_DAY, 'Day'),
+    ]
+
+    DIMENSION_TOTAL = 'total'
+    DIMENSION_PRODUCT = 'product'
+    DIMENSION_CATEGORY = 'category'
+    DIMENSION_CHOICES = [
+        (DIMENSION_TOTAL, 'Total'),
+        (DIMENSION_PRODUCT, 'Product'),
+        (DIMENSION_CATEGORY, 'Category'),
+    ]
+
+    period = models.CharField(max_length=8, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    dimension = models.CharField(max_length=16, choices=DIMENSION_CHOICES)
+    ref_id = models.BigIntegerField(default=0)
+    orders_count = models.IntegerField(default=0)
+    units = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'bucket', 'dimension', 'ref_id'], name='uniq_sales_rollup_row'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'dimension', 'bucket']),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """
+    Архив завершённых заказов (delivered/cancelled старше ORDERS_ARCHIVE_AFTER_DAYS).
+    id сохраняется исходный; связи — голые id (архив может жить в отдельной БД,
+    ORDERS_ARCHIVE_DATABASE). Перенос — apps.orders.archive.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user_id = models.BigIntegerField(db_index=True)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+
+class ArchivedOrderItem(models.Model):
+    """Позиция архивного заказа со снимком имени продукта и категории на момент архивации."""
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    product_id = models.BigIntegerField()
+    product_name = models.CharField(max_length=150)
+    category_id = models.BigIntegerField()
+    quantity = models.PositiveIntegerField()
+    price_at_purchase = models.DecimalField(max_digits=8, decimal_places=2)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['id']
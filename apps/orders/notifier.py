@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Внешний API признан недоступным — вызов не делаем до истечения reset_timeout."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"circuit open, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Простой circuit breaker на процесс воркера.
+    closed → (threshold ошибок подряд) → open: вызовы сразу отклоняются →
+    (reset_timeout) → half-open: пропускаем один пробный вызов; успех закрывает, ошибка снова открывает.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probe = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._probe:
+                raise CircuitOpenError(max(remaining, 0.0))
+            self._probe = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probe or self._failures >= self.threshold:
+                if self._opened_at is None or self._probe:
+                    logger.warning("Shipping notifications: circuit opened after %s failures", self._failures)
+                self._opened_at = time.monotonic()
+                self._probe = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+
+breaker = CircuitBreaker(
+    threshold=getattr(settings, "ORDERS_NOTIFY_BREAKER_THRESHOLD", 5),
+    reset_timeout=getattr(settings, "ORDERS_NOTIFY_BREAKER_RESET", 30),
+)
+
+
+# ---------- HTTP ----------
+
+def get_session() -> requests.Session:
+    """
+    Общая requests.Session на процесс: keep-alive и пул соединений (HTTPAdapter) вместо
+    нового TCP/TLS-рукопожатия на каждое уведомление. Повторы — только на установку соединения
+    (POST не идемпотентен); остальное решают ретраи задачи и breaker.
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                pool_size = getattr(settings, "ORDERS_NOTIFY_CONCURRENCY", 16)
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=pool_size,
+                    max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1),
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def send_shipped(order_id: int) -> dict:
+    """Одно уведомление об отправке через общую сессию и breaker. Ошибки пробрасываются."""
+    breaker.before_call()
+    payload = {"title": f"order-{order_id}", "body": "shipped", "userId": 1}
+    try:
+        resp = get_session().post(
+            settings.ORDERS_NOTIFY_URL,
+            json=payload,
+            timeout=(getattr(settings, "ORDERS_NOTIFY_CONNECT_TIMEOUT", 2), getattr(settings, "ORDERS_NOTIFY_READ_TIMEOUT", 5)),
+        )
+        resp.raise_for_status()
+        data = resp.json()
+    except (requests.RequestException, ValueError):
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    logger.info("Order #%s shipped notification sent. External id=%s", order_id, data.get("id"))
+    return data
+
+
+def notify_shipped(order_ids: list) -> tuple:
+    """
+    Пакет уведомлений с ограниченной конкурентностью (ThreadPoolExecutor, ORDERS_NOTIFY_CONCURRENCY).
+    Открытый breaker отклоняет оставшиеся вызовы сразу, без сети.
+    Возвращает (sent_ids, failed_ids); failed — и сетевые ошибки, и отклонённые breaker'ом.
+    """
+    if not order_ids:
+        return [], []
+
+    def _send(order_id):
+        try:
+            send_shipped(order_id)
+            return True
+        except CircuitOpenError:
+            return False
+        except (requests.RequestException, ValueError) as exc:
+            logger.warning("Order #%s shipped notification failed: %s", order_id, exc)
+            return False
+
+    workers = min(getattr(settings, "ORDERS_NOTIFY_CONCURRENCY", 16), len(order_ids))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="notify") as pool:
+        results = list(pool.map(_send, order_ids))
+
+    sent = [oid for oid, ok in zip(order_ids, results) if ok]
+    failed = [oid for oid, ok in zip(order_ids, results) if not ok]
+    return sent, failed
@@ -0,0 +1,51 @@
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+
+from apps.orders.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def record(topic: str, order_ids: list) -> None:
+    """
+    Записать события в outbox. Вызывать внутри транзакции, меняющей заказы:
+    откат транзакции откатывает и события, коммит — гарантирует их публикацию relay.
+    """
+    if not order_ids:
+        return
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError("outbox.record должен вызываться внутри transaction.atomic()")
+    OutboxEvent.objects.bulk_create([OutboxEvent(topic=topic, order_id=oid) for oid in order_ids])
+
+
+def relay(handlers: dict, batch_size: int) -> int:
+    """
+    Одна пачка relay: события забираются select_for_update(skip_locked) (несколько relay
+    не публикуют одно и то же), группируются по topic и отдаются handlers[topic](order_ids)
+    одним вызовом на topic. Строки удаляются в той же транзакции: упал брокер — транзакция
+    откатывается, события остаются и уйдут следующим запуском (at-least-once).
+    Возвращает число опубликованных событий.
+    """
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects
+            .select_for_update(skip_locked=True)
+            .order_by("id")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        by_topic = defaultdict(list)
+        for event in events:
+            by_topic[event.topic].append(event.order_id)
+        for topic, order_ids in by_topic.items():
+            handler = handlers.get(topic)
+            if handler is None:
+                logger.error("Outbox: no handler for topic %s, %s events dropped", topic, len(order_ids))
+                continue
+            handler(order_ids)
+
+        OutboxEvent.objects.filter(pk__in=[e.pk for e in events]).delete()
+    return len(events)
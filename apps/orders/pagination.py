@@ -0,0 +1,101 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+# ---------- estimated count ----------
+
+class EstimatedPage(Page):
+    """Страница, которая знает о следующей по «лишней» строке, а не по count."""
+
+    def __init__(self, object_list, number, paginator, has_more: bool):
+        super().__init__(object_list, number, paginator)
+        self._has_more = has_more
+
+    def has_next(self):
+        return self._has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор без точного COUNT(*) на каждый запрос.
+    count:
+      1) из кэша по ключу фильтров (count_cache_key, TTL ORDERS_ADMIN_COUNT_TTL);
+      2) для нефильтрованного queryset на PostgreSQL — pg_class.reltuples;
+      3) иначе точный COUNT(*) — результат кладём в кэш.
+    Навигация не зависит от count: страница читает per_page + 1 строк, номер страницы
+    сверху не ограничивается (оценка может быть устаревшей).
+    """
+
+    def __init__(self, object_list, per_page, count_cache_key: str = None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_cache_key = count_cache_key
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key:
+            cached = cache.get(self.count_cache_key)
+            if isinstance(cached, int):
+                return cached
+
+        value = self._estimate_from_stats()
+        if value is None:
+            value = super().count
+        if self.count_cache_key:
+            cache.set(self.count_cache_key, value, timeout=getattr(settings, "ORDERS_ADMIN_COUNT_TTL", 300))
+        return value
+
+    def _estimate_from_stats(self):
+        """Оценка по статистике планировщика (только без WHERE и только PostgreSQL)."""
+        qs = self.object_list
+        if not hasattr(qs, "query") or qs.query.where:
+            return None
+        connection = connections[qs.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [qs.model._meta.db_table])
+            row = cursor.fetchone()
+        # reltuples = -1/0, пока таблица не анализировалась — тогда считаем точно
+        return int(row[0]) if row and row[0] > 0 else None
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedPage(rows[:self.per_page], number, self, has_more=len(rows) > self.per_page)
+
+
+# ---------- DRF pagination ----------
+
+class AdminOrderPagination(PageNumberPagination):
+    """
+    Пагинация админского списка заказов (?page=&page_size=).
+    ORDERS_ADMIN_COUNT_MODE = "estimated" (по умолчанию) — EstimatedCountPaginator,
+    "exact" — стандартный COUNT(*).
+    Ключ кэша count задаёт вью через view.get_count_cache_key().
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = getattr(settings, "ORDERS_ADMIN_COUNT_MODE", "estimated")
+        if mode == "estimated":
+            key = view.get_count_cache_key() if hasattr(view, "get_count_cache_key") else None
+            self.django_paginator_class = partial(EstimatedCountPaginator, count_cache_key=key)
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,148 @@
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+
+_POOL = None
+_POOL_WORKERS = 0
+_FONT = "Helvetica"
+# версия вёрстки: меняется при правке render_receipt_pdf — все квитанции перерендерятся
+LAYOUT_VERSION = 1
+
+
+# ---------- данные квитанции ----------
+
+def receipt_payload(order) -> dict:
+    """
+    Плоские данные для рендера (picklable — уходят в процесс пула).
+    order — с prefetch_related("items__product") или ArchivedOrder (prefetch items).
+    Позиции — по id: порядок строк из БД не задан (реплика, VACUUM), а от него зависит хэш.
+    """
+    return {
+        "id": order.id,
+        "user_id": order.user_id,
+        "status": order.status,
+        "total_price": str(order.total_price),
+        "items": [
+            (_product_name(item), item.quantity, str(item.price_at_purchase), str(item.quantity * item.price_at_purchase))
+            for item in sorted(order.items.all(), key=lambda item: item.pk)
+        ],
+    }
+
+
+def _product_name(item) -> str:
+    # у архивной позиции имя продукта денормализовано
+    return item.product_name if hasattr(item, "product_name") else item.product.name
+
+
+def content_hash(payload: dict) -> str:
+    """sha256 от состояния заказа (payload + версия вёрстки) — адрес файла квитанции."""
+    raw = json.dumps([LAYOUT_VERSION, payload], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ---------- хранилище ----------
+
+def receipts_root() -> Path:
+    return Path(getattr(settings, "MEDIA_ROOT", ".")) / "order_receipts"
+
+
+def receipt_relpath(digest: str) -> str:
+    """Путь относительно receipts_root(): двухуровневый шардинг по хэшу (ab/cd/abcd....pdf)."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.pdf"
+
+
+def store_receipt(digest: str, pdf: bytes) -> Path:
+    """Атомарная запись (tmp + os.replace): читатель не увидит недописанный файл."""
+    path = receipts_root() / receipt_relpath(digest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(pdf)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def ensure_receipt(payload: dict, digest: str = None) -> tuple:
+    """
+    Квитанция для текущего состояния заказа: (path, digest, rendered).
+    Файл по хэшу уже есть — рендера нет; состояние изменилось — хэш другой, рендерим заново.
+    """
+    digest = digest or content_hash(payload)
+    path = receipts_root() / receipt_relpath(digest)
+    if path.exists():
+        return path, digest, False
+    return store_receipt(digest, render_receipt_pdf(payload)), digest, True
+
+
+# ---------- рендер ----------
+
+def _init_worker():
+    """Инициализация процесса пула: метрики шрифта грузятся один раз, а не на каждый PDF."""
+    pdfmetrics.getFont(_FONT)
+
+
+def render_receipt_pdf(payload: dict) -> bytes:
+    """PDF квитанции по receipt_payload() — чистая функция (для пула процессов)."""
+    buffer = io.BytesIO()
+    # invariant — без дат/случайного ID в PDF: одинаковый заказ даёт одинаковые байты
+    c = canvas.Canvas(buffer, pagesize=A4, pageCompression=0, invariant=1)
+    text = c.beginText(40, 800)
+    text.setFont(_FONT, 12)
+    text.textLine(f"Order #{payload['id']}")
+    text.textLine(f"User ID: {payload['user_id']}")
+    text.textLine(f"Status: {payload['status']}")
+    text.textLine(f"Total: {payload['total_price']}")
+    text.textLine("")
+    text.textLine("Items:")
+    for name, quantity, price, line_total in payload["items"]:
+        text.textLine(f"- {name} x{quantity} @ {price} = {line_total}")
+    c.drawText(text)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def _render_safe(payload: dict) -> tuple:
+    """(pdf, None) или (None, текст ошибки) — сбой одной квитанции не роняет всю пачку."""
+    try:
+        return render_receipt_pdf(payload), None
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def _get_pool() -> tuple:
+    """(пул, число процессов) — пул создаётся один раз на процесс воркера."""
+    global _POOL, _POOL_WORKERS
+    if _POOL is None:
+        _POOL_WORKERS = getattr(settings, "ORDERS_RECEIPTS_WORKERS", None) or os.cpu_count() or 1
+        _POOL = ProcessPoolExecutor(max_workers=_POOL_WORKERS, initializer=_init_worker)
+    return _POOL, _POOL_WORKERS
+
+
+def render_many(payloads: list) -> list:
+    """
+    Рендер пачки квитанций в ProcessPoolExecutor (пул живёт всё время процесса воркера).
+    Возвращает список (pdf, error) в порядке payloads.
+    Демон-процесс (prefork-воркер Celery) не может порождать детей — тогда рендерим
+    последовательно; для параллельного рендера очередь receipts слушает воркер с --pool=solo|threads.
+    """
+    if len(payloads) < 2 or multiprocessing.current_process().daemon:
+        _init_worker()
+        return [_render_safe(p) for p in payloads]
+    pool, workers = _get_pool()
+    chunksize = max(1, len(payloads) // (workers * 4))
+    return list(pool.map(_render_safe, payloads, chunksize=chunksize))
@@ -0,0 +1,216 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import F
+
+from apps.orders.archive import archive_database
+from apps.orders.models import ArchivedOrderItem, Order, OrderItem, SalesRollup
+
+UPSERT_VENDORS = {"sqlite", "postgresql"}
+UPSERT_BATCH = 100  # строк на один INSERT (лимит параметров SQLite)
+
+
+# ---------- бакеты ----------
+
+def _buckets(created_at: datetime):
+    """Начало часа и дня (UTC) для момента создания заказа."""
+    ts = created_at.astimezone(dt_timezone.utc)
+    hour = ts.replace(minute=0, second=0, microsecond=0)
+    return (
+        (SalesRollup.PERIOD_HOUR, hour),
+        (SalesRollup.PERIOD_DAY, hour.replace(hour=0)),
+    )
+
+
+def _add_order(acc: dict, created_at: datetime, lines: list, sign: int) -> None:
+    """
+    Дельты одного заказа в аккумулятор acc[(period, bucket, dimension, ref_id)] = [orders, units, revenue].
+    lines: [(product_id, category_id, quantity, price_at_purchase), ...]
+    """
+    per_category = defaultdict(lambda: [0, Decimal("0.00")])
+    units_total = 0
+    revenue_total = Decimal("0.00")
+    per_product = []
+    for product_id, category_id, quantity, price in lines:
+        revenue = quantity * price
+        per_product.append((product_id, quantity, revenue))
+        per_category[category_id][0] += quantity
+        per_category[category_id][1] += revenue
+        units_total += quantity
+        revenue_total += revenue
+
+    for period, bucket in _buckets(created_at):
+        rows = [(SalesRollup.DIMENSION_TOTAL, 0, units_total, revenue_total)]
+        rows += [(SalesRollup.DIMENSION_PRODUCT, pid, qty, rev) for pid, qty, rev in per_product]
+        rows += [(SalesRollup.DIMENSION_CATEGORY, cid, qty, rev) for cid, (qty, rev) in per_category.items()]
+        for dimension, ref_id, units, revenue in rows:
+            cell = acc.setdefault((period, bucket, dimension, ref_id), [0, 0, Decimal("0.00")])
+            cell[0] += sign
+            cell[1] += sign * units
+            cell[2] += sign * revenue
+
+
+# ---------- запись ----------
+
+def _apply(acc: dict) -> None:
+    """Применить накопленные дельты: INSERT ... ON CONFLICT DO UPDATE пачками (SQLite/PostgreSQL)."""
+    if not acc:
+        return
+    # фиксированный порядок строк — одинаковый порядок блокировок у конкурентных транзакций
+    rows = sorted(acc.items())
+    connection = connections[router.db_for_write(SalesRollup)]
+    if connection.vendor not in UPSERT_VENDORS:
+        _apply_fallback(rows)
+        return
+
+    ops = connection.ops
+    qn = ops.quote_name
+    table = qn(SalesRollup._meta.db_table)
+    revenue_field = SalesRollup._meta.get_field("revenue")
+    cols = ("period", "bucket", "dimension", "ref_id", "orders_count", "units", "revenue")
+    row_sql = "(" + ", ".join(["%s"] * len(cols)) + ")"
+    conflict_sql = (
+        f" ON CONFLICT ({', '.join(qn(c) for c in cols[:4])}) DO UPDATE SET "
+        + ", ".join(f"{qn(c)} = {table}.{qn(c)} + excluded.{qn(c)}" for c in cols[4:])
+    )
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), UPSERT_BATCH):
+            batch = rows[i:i + UPSERT_BATCH]
+            params = []
+            for (period, bucket, dimension, ref_id), (orders, units, revenue) in batch:
+                params += [
+                    period,
+                    ops.adapt_datetimefield_value(bucket),
+                    dimension,
+                    ref_id,
+                    orders,
+                    units,
+                    ops.adapt_decimalfield_value(revenue, revenue_field.max_digits, revenue_field.decimal_places),
+                ]
+            sql = (
+                f"INSERT INTO {table} ({', '.join(qn(c) for c in cols)}) VALUES "
+                + ", ".join([row_sql] * len(batch))
+                + conflict_sql
+            )
+            cursor.execute(sql, params)
+
+
+def _apply_fallback(rows: list) -> None:
+    """Бэкенды без ON CONFLICT: UPDATE с F(), при отсутствии строки — INSERT."""
+    for (period, bucket, dimension, ref_id), (orders, units, revenue) in rows:
+        lookup = {"period": period, "bucket": bucket, "dimension": dimension, "ref_id": ref_id}
+        updated = SalesRollup.objects.filter(**lookup).update(
+            orders_count=F("orders_count") + orders,
+            units=F("units") + units,
+            revenue=F("revenue") + revenue,
+        )
+        if not updated:
+            SalesRollup.objects.create(**lookup, orders_count=orders, units=units, revenue=revenue)
+
+
+# ---------- публичный API ----------
+
+def record_orders(placed: list) -> None:
+    """
+    Учесть новые заказы. placed: [(order, [OrderItem, ...]), ...] — как в services.place_orders
+    (у позиций подгружен product с category_id).
+    """
+    acc = {}
+    for order, items in placed:
+        lines = [(i.product_id, i.product.category_id, i.quantity, i.price_at_purchase) for i in items]
+        _add_order(acc, order.created_at, lines, sign=1)
+    _apply(acc)
+
+
+def record_cancellations(order_ids: list) -> None:
+    """Вычесть отменённые заказы (позиции читаем одним запросом)."""
+    if not order_ids:
+        return
+    created = dict(Order.objects.filter(pk__in=order_ids).values_list("id", "created_at"))
+    lines = defaultdict(list)
+    items_qs = OrderItem.objects.filter(order_id__in=order_ids).values_list(
+        "order_id", "product_id", "product__category_id", "quantity", "price_at_purchase"
+    )
+    for order_id, *line in items_qs:
+        lines[order_id].append(tuple(line))
+
+    acc = {}
+    for order_id, created_at in created.items():
+        _add_order(acc, created_at, lines[order_id], sign=-1)
+    _apply(acc)
+
+
+def _iter_order_lines(rows):
+    """Строки (order_id, created_at, *line), отсортированные по order_id → (created_at, [line, ...])."""
+    current_id, current_created, lines = None, None, []
+    for order_id, created_at, *line in rows:
+        if order_id != current_id:
+            if current_id is not None:
+                yield current_created, lines
+            current_id, current_created, lines = order_id, created_at, []
+        lines.append(tuple(line))
+    if current_id is not None:
+        yield current_created, lines
+
+
+def rebuild(date_from, date_to, chunk_size: int = 5000) -> int:
+    """
+    Пересобрать агрегаты за дни [date_from, date_to] (UTC) из заказов: удаляем бакеты диапазона
+    и заново суммируем неотменённые заказы — горячие и архивные (apps.orders.archive).
+    Заказы читаются с primary в той же транзакции, после удаления: «закрытых» дней нет —
+    record_cancellations пишет дельту в бакет дня создания заказа, каким бы давним он ни был,
+    а дельта, закоммиченная между чтением и удалением (или не доехавшая до реплики), иначе
+    потерялась бы. Удалённые бакеты заблокированы до коммита: конкурентная дельта ляжет
+    поверх пересобранной строки.
+    Возвращает число учтённых заказов.
+    """
+    start = datetime.combine(date_from, time.min, tzinfo=dt_timezone.utc)
+    end = datetime.combine(date_to, time.min, tzinfo=dt_timezone.utc) + timedelta(days=1)
+    with transaction.atomic():
+        SalesRollup.objects.filter(bucket__gte=start, bucket__lt=end).delete()
+        acc, orders = _scan(start, end, chunk_size)
+        _insert_buckets(acc)
+    return orders
+
+
+def _scan(start: datetime, end: datetime, chunk_size: int) -> tuple:
+    """Суммы неотменённых заказов (горячих и архивных) за [start, end): (acc, число заказов)."""
+    hot_qs = (
+        OrderItem.objects
+        .filter(order__created_at__gte=start, order__created_at__lt=end)
+        .exclude(order__status=Order.STATUS_CANCELLED)
+        .order_by("order_id")
+        .values_list(
+            "order_id", "order__created_at", "product_id", "product__category_id", "quantity", "price_at_purchase"
+        )
+    )
+    archived_qs = (
+        ArchivedOrderItem.objects.using(archive_database())
+        .filter(order__created_at__gte=start, order__created_at__lt=end)
+        .exclude(order__status=Order.STATUS_CANCELLED)
+        .order_by("order_id")
+        .values_list("order_id", "order__created_at", "product_id", "category_id", "quantity", "price_at_purchase")
+    )
+    acc = {}
+    orders = 0
+    for qs in (hot_qs, archived_qs):
+        for created_at, lines in _iter_order_lines(qs.iterator(chunk_size=chunk_size)):
+            _add_order(acc, created_at, lines, sign=1)
+            orders += 1
+    return acc, orders
+
+
+def _insert_buckets(acc: dict) -> None:
+    """Бакеты из аккумулятора (старые удалены в той же транзакции)."""
+    SalesRollup.objects.bulk_create(
+        [
+            SalesRollup(
+                period=period, bucket=bucket, dimension=dimension, ref_id=ref_id,
+                orders_count=o, units=u, revenue=r,
+            )
+            for (period, bucket, dimension, ref_id), (o, u, r) in acc.items()
+        ],
+        batch_size=1000,
+    )
@@ -1,13 +1,18 @@
 from collections import defaultdict
 
-from django.db import transaction
-from django.db.models import F
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 
-from apps.catalog.models import Product
-from apps.orders.models import Order, OrderItem
-from apps.orders import tasks
+from apps.orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderIntent, OutboxEvent
+from apps.common.projections import Projection
+from apps.orders import outbox, rollups
+from apps.orders.services import place_orders
+from apps.orders.signals import invalidate_order_cache
+from apps.users.services import missing_user_as_401
 
 
 # ---------- ВСПОМОГАТЕЛЬНЫЕ ----------
@@ -45,8 +50,8 @@ class OrderCreateSerializer(serializers.Serializer):
     Создание заказа:
       - принимает список позиций [{product_id, quantity}, ...]
       - агрегирует дубликаты product_id
-      - в транзакции: select_for_update по продуктам, проверка stock, списание, создание Order + OrderItem[]
-      - пересчитывает total_price через order.recalc_total()
+      - в транзакции (services.place_orders): select_for_update по продуктам, проверка stock,
+        списание, создание Order + OrderItem[] с готовым total_price
       - триггерит Celery-задачу генерации PDF и "отправки" email
     """
     items = OrderItemInputSerializer(many=True)
@@ -61,66 +66,23 @@ class OrderCreateSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         user = self.context["request"].user
-        items = validated_data["items"]
-
-        product_ids = [i["product_id"] for i in items]
-
-        with transaction.atomic():
-            # блокируем продукты для исключения гонок (уникальные id)
-            products_qs = (
-                Product.objects
-                .select_for_update()
-                .filter(pk__in=set(product_ids), is_active=True)
-            )
-            products_by_id = {p.id: p for p in products_qs}
-
-            # проверяем, что все продукты существуют и активны
-            missing = sorted(set(int(pid) for pid in product_ids) - set(products_by_id.keys()))
-            if missing:
-                raise PlainBadRequest({
-                    "items": [f"Продукт(ы) не найдены или неактивны: {sorted(missing)}"]
-                })
-
-            # проверка stock
-            errors = []
-            for it in items:
-                prod = products_by_id[it["product_id"]]
-                requested = it["quantity"]
-                if prod.stock < requested:
-                    errors.append(
-                        {"product_id": int(prod.pk), "available": int(prod.stock), "requested": int(requested)}
-                    )
-            if errors:
-                raise PlainBadRequest({
-                    "stock": "Недостаточно товара на складе",
-                    "details": errors,
-                })
-
-            # создаём заказ
-            order = Order.objects.create(user=user, status=Order.STATUS_PENDING)
-
-            # списываем stock и создаём позиции
-            order_items = []
-            for it in items:
-                prod = products_by_id[it["product_id"]]
-                qty = it["quantity"]
-
-                Product.objects.filter(pk=prod.pk).update(stock=F("stock") - qty)
-                prod.stock -= qty  # локально тоже уменьшим
-
-                order_items.append(
-                    OrderItem(order=order, product=prod, quantity=qty, price_at_purchase=prod.price)
-                )
-            OrderItem.objects.bulk_create(order_items)
-
-            # пересчёт total
-            order.recalc_total(save=True)
-
-        # Celery: PDF + имитация email
-        tasks.order_created_generate_pdf_and_email.delay(order.id)
+        with missing_user_as_401(user.id):
+            [(order, error)] = place_orders([{"user_id": user.id, "items": validated_data["items"]}])
+        if error:
+            raise PlainBadRequest(error)
+        # PDF + email — событие order.created в outbox (записано place_orders), публикует relay
         return order
 
 
+class OrderIntentSerializer(serializers.ModelSerializer):
+    """Статус асинхронной заявки на заказ (GET /api/v1/orders/intents/{id}/)."""
+
+    class Meta:
+        model = OrderIntent
+        fields = ("id", "status", "order", "error", "created_at", "processed_at")
+        read_only_fields = fields
+
+
 # ---------- ЧТЕНИЕ ЗАКАЗОВ ----------
 
 class OrderListSerializer(serializers.ModelSerializer):
@@ -133,6 +95,20 @@ class OrderListSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+# быстрое чтение списков: items_count — коррелированный подзапрос по индексу order_id
+# (считается только для строк страницы, без GROUP BY по всей выборке)
+order_list_projection = Projection(OrderListSerializer, annotations={
+    "items_count": Coalesce(
+        Subquery(
+            OrderItem.objects.filter(order=OuterRef("pk")).order_by()
+            .values("order").annotate(n=Count("*")).values("n"),
+            output_field=IntegerField(),
+        ),
+        0,
+    ),
+})
+
+
 class OrderDetailSerializer(serializers.ModelSerializer):
     """Детали заказа со списком позиций."""
     items = OrderItemReadSerializer(many=True, read_only=True)
@@ -143,12 +119,36 @@ class OrderDetailSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class ArchivedOrderItemReadSerializer(serializers.ModelSerializer):
+    """Позиция архивного заказа — тот же контракт, что у OrderItemReadSerializer."""
+    product = serializers.IntegerField(source="product_id", read_only=True)
+
+    class Meta:
+        model = ArchivedOrderItem
+        fields = ("id", "product", "product_name", "quantity", "price_at_purchase", "created_at")
+        read_only_fields = fields
+
+
+class ArchivedOrderDetailSerializer(serializers.ModelSerializer):
+    """Деталь архивного заказа — тот же контракт, что у OrderDetailSerializer."""
+    user = serializers.IntegerField(source="user_id", read_only=True)
+    items = ArchivedOrderItemReadSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedOrder
+        fields = ("id", "user", "status", "total_price", "created_at", "updated_at", "items")
+        read_only_fields = fields
+
+
 # ---------- PATCH СТАТУСА ----------
 
 class OrderStatusPatchSerializer(serializers.ModelSerializer):
     """
     Обновление статуса (PATCH).
-    Переходы валидируются на уровне модели (clean()).
+    Переход применяется compare-and-set'ом (Order.transition_to): один UPDATE с условием
+    на допустимые предыдущие статусы, без повторного чтения заказа и без блокировок —
+    из двух конкурентных переходов пройдёт только допустимый.
+    Отмена вычитает заказ из агрегатов продаж (SalesRollup) в той же транзакции.
     """
 
     class Meta:
@@ -156,14 +156,30 @@ class OrderStatusPatchSerializer(serializers.ModelSerializer):
         fields = ("status",)
 
     def update(self, instance: Order, validated_data):
-        instance.status = validated_data["status"]
+        target = validated_data["status"]
         try:
-            instance.full_clean()  # дергает Order.clean() с валидацией перехода
+            with transaction.atomic():
+                changed = instance.transition_to(target)
+                if changed and target == Order.STATUS_CANCELLED:
+                    rollups.record_cancellations([instance.pk])
+                elif changed and target == Order.STATUS_SHIPPED:
+                    outbox.record(OutboxEvent.TOPIC_ORDER_SHIPPED, [instance.pk])
         except DjangoValidationError as e:
             # конвертируем в DRF-валидатор → HTTP 400
-            raise serializers.ValidationError(e.message_dict or {"detail": e.messages})
+            raise serializers.ValidationError({"status": e.messages})
 
-        instance.save(update_fields=["status", "updated_at"])
-        if instance.status == Order.STATUS_SHIPPED:
-            tasks.order_shipped_notify_external.delay(instance.id)
+        if changed:
+            invalidate_order_cache(instance.pk, instance.user_id)
         return instance
+
+
+class OrderBulkStatusSerializer(serializers.Serializer):
+    """Массовая смена статуса (админ): {"ids": [...], "status": "..."}."""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+    def validate_ids(self, ids):
+        max_ids = getattr(settings, "ORDERS_BULK_STATUS_MAX_IDS", 1000)
+        if len(ids) > max_ids:
+            raise serializers.ValidationError(f"Не больше {max_ids} заказов за запрос.")
+        return ids
@@ -0,0 +1,217 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.db.models import Case, DecimalField, F, Sum, When
+from django.utils import timezone
+
+from apps.catalog.models import Product
+from apps.orders import outbox, rollups
+from apps.orders.models import Order, OrderItem, OutboxEvent
+from apps.orders.signals import bump_order_lists
+
+
+# ---------- размещение заказов ----------
+
+def place_orders(entries: list) -> list:
+    """
+    Пакетное размещение заказов — общий код-путь для синхронного POST, асинхронного
+    приёма (OrderIntent) и bulk-эндпоинта.
+
+    entries: [{"user_id": int, "items": [{"product_id": int, "quantity": int}, ...]}, ...]
+             (позиции уже агрегированы по product_id, см. OrderCreateSerializer.validate_items)
+
+    В одной транзакции:
+      - select_for_update по объединению всех product_id (каждый продукт блокируется один раз);
+      - проверка наличия/stock по порядку заявок (stock уменьшается в памяти);
+      - bulk_create для Order и OrderItem, один UPDATE stock (CASE по продуктам).
+    Агрегаты продаж (SalesRollup) и события order.created (outbox) пишутся в той же транзакции.
+    Версии списков поднимаются один раз на пакет (bulk_create не шлёт post_save).
+
+    Возвращает список той же длины: (order, None) при успехе или (None, payload) с ошибкой
+    в формате PlainBadRequest.
+    """
+    product_ids = {it["product_id"] for entry in entries for it in entry["items"]}
+    results = []
+    created = []
+
+    with transaction.atomic():
+        products_qs = (
+            Product.objects
+            .select_for_update()
+            .filter(pk__in=product_ids, is_active=True)
+        )
+        products_by_id = {p.id: p for p in products_qs}
+        consumed = defaultdict(int)
+
+        for entry in entries:
+            error = _check_entry(entry["items"], products_by_id, consumed)
+            if error:
+                results.append((None, error))
+                continue
+
+            order = Order(user_id=entry["user_id"], status=Order.STATUS_PENDING)
+            order_items = []
+            total = Decimal("0.00")
+            for it in entry["items"]:
+                prod = products_by_id[it["product_id"]]
+                qty = it["quantity"]
+                consumed[prod.pk] += qty
+                order_items.append(
+                    OrderItem(order=order, product=prod, quantity=qty, price_at_purchase=prod.price)
+                )
+                total += qty * prod.price
+            order.total_price = total
+            results.append((order, None))
+            created.append((order, order_items))
+
+        if created:
+            _insert_orders(created)
+            # списываем stock: один UPDATE ... CASE на все продукты пакета
+            Product.objects.filter(pk__in=consumed.keys()).update(
+                stock=Case(*[When(pk=pid, then=F("stock") - qty) for pid, qty in consumed.items()])
+            )
+            for pid, qty in consumed.items():
+                products_by_id[pid].stock -= qty
+            rollups.record_orders(created)
+            outbox.record(OutboxEvent.TOPIC_ORDER_CREATED, [order.id for order, _ in created])
+
+    if created:
+        # read-your-writes: списки авторов новых заказов какое-то время читаются с primary
+        bump_order_lists([order.user_id for order, _ in created])
+    return results
+
+
+def _check_entry(items: list, products_by_id: dict, consumed: dict):
+    """Проверка одной заявки против заблокированных продуктов и уже списанного в пакете."""
+    missing = sorted({int(it["product_id"]) for it in items} - set(products_by_id.keys()))
+    if missing:
+        return {"items": [f"Продукт(ы) не найдены или неактивны: {missing}"]}
+
+    errors = []
+    for it in items:
+        prod = products_by_id[it["product_id"]]
+        available = prod.stock - consumed[prod.pk]
+        requested = it["quantity"]
+        if available < requested:
+            errors.append(
+                {"product_id": int(prod.pk), "available": int(available), "requested": int(requested)}
+            )
+    if errors:
+        return {"stock": "Недостаточно товара на складе", "details": errors}
+    return None
+
+
+def _insert_orders(created: list) -> None:
+    """bulk_create заказов и позиций; без RETURNING (MySQL) — заказы сохраняем по одному."""
+    orders = [order for order, _ in created]
+    connection = connections[router.db_for_write(Order)]
+    if connection.features.can_return_rows_from_bulk_insert:
+        Order.objects.bulk_create(orders)
+    else:
+        for order in orders:
+            order.save()
+    OrderItem.objects.bulk_create([item for _, items in created for item in items])
+
+
+# ---------- массовая смена статуса ----------
+
+def transition_orders(order_ids: list, target: str) -> tuple:
+    """
+    Массовый переход заказов в статус target (склад: сотни shipped за раз).
+    Переходы проверяются по множеству против Order.VALID_TRANSITIONS, применяются одним
+    условным UPDATE на каждый исходный статус (WHERE id IN (...) AND status = src) —
+    конкурентно изменённые заказы просто не попадут под условие.
+    Затем: отмена — вычет из SalesRollup, shipped — события в outbox (в той же транзакции),
+    delete_many по order:{id}, один bump версий списков.
+
+    Возвращает (updated_ids, skipped), skipped: [{"id", "reason", "status"}, ...],
+    reason: not_found | unchanged | invalid_transition | conflict.
+    """
+    current, owners = {}, {}
+    for oid, status, user_id in Order.objects.filter(pk__in=set(order_ids)).values_list("id", "status", "user_id"):
+        current[oid], owners[oid] = status, user_id
+    allowed = set(Order.allowed_predecessors(target))
+
+    by_source = defaultdict(list)
+    skipped = []
+    seen = set()
+    for oid in order_ids:
+        if oid in seen:
+            continue
+        seen.add(oid)
+        status = current.get(oid)
+        if status is None:
+            skipped.append({"id": oid, "reason": "not_found", "status": None})
+        elif status == target:
+            skipped.append({"id": oid, "reason": "unchanged", "status": status})
+        elif status not in allowed:
+            skipped.append({"id": oid, "reason": "invalid_transition", "status": status})
+        else:
+            by_source[status].append(oid)
+
+    updated_ids = []
+    now = timezone.now()
+    with transaction.atomic():
+        for source, ids in by_source.items():
+            rows = Order.objects.filter(pk__in=ids, status=source).update(status=target, updated_at=now)
+            if rows == len(ids):
+                updated_ids += ids
+                continue
+            # часть заказов успели изменить конкурентно — выясняем, какие обновили мы
+            done = set(
+                Order.objects.filter(pk__in=ids, status=target, updated_at=now).values_list("id", flat=True)
+            )
+            updated_ids += [oid for oid in ids if oid in done]
+            skipped += [{"id": oid, "reason": "conflict", "status": None} for oid in ids if oid not in done]
+
+        if target == Order.STATUS_CANCELLED:
+            rollups.record_cancellations(updated_ids)
+        elif target == Order.STATUS_SHIPPED:
+            outbox.record(OutboxEvent.TOPIC_ORDER_SHIPPED, updated_ids)
+
+    if updated_ids:
+        cache.delete_many([f"order:{oid}" for oid in updated_ids])
+        bump_order_lists([owners[oid] for oid in updated_ids])
+    return updated_ids, skipped
+
+
+# ---------- сверка total_price ----------
+
+def verify_order_totals(batch_size: int = 1000, repair: bool = True) -> int:
+    """
+    Сверка total_price с Σ(quantity * price_at_purchase) вне запроса пользователя.
+    Заказы идут пачками по pk (keyset), суммы позиций — один GROUP BY на пачку.
+    Починка — compare-and-set по каждому расхождению (UPDATE ... WHERE total_price = прочитанное),
+    чтобы не затереть параллельно применённую дельту. Возвращает число найденных расхождений.
+    """
+    mismatched = 0
+    repaired = {}
+    last_id = 0
+    while True:
+        chunk = list(
+            Order.objects.filter(pk__gt=last_id).order_by("pk").values_list("id", "total_price", "user_id")[:batch_size]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        sums = dict(
+            OrderItem.objects
+            .filter(order_id__in=[oid for oid, _, _ in chunk])
+            .values("order_id")
+            .annotate(s=Sum(F("quantity") * F("price_at_purchase"), output_field=DecimalField(max_digits=10, decimal_places=2)))
+            .values_list("order_id", "s")
+        )
+        for oid, total, user_id in chunk:
+            expected = sums.get(oid) or Decimal("0.00")
+            if expected == total:
+                continue
+            mismatched += 1
+            if repair and Order.objects.filter(pk=oid, total_price=total).update(total_price=expected):
+                repaired[oid] = user_id
+
+    if repaired:
+        cache.delete_many([f"order:{oid}" for oid in repaired])
+        bump_order_lists(repaired.values())
+    return mismatched
@@ -3,24 +3,41 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from apps.orders.models import Order, OrderItem
+from apps.common.caching import bump_version
+from apps.common.db_router import pin_primary
 
 
-def _incr_version(key: str, initial: int = 1) -> None:
-    """Атомарно инкрементируем версию кэш-списков (fallback для backends без incr)."""
-    cache.add(key, initial)
-    try:
-        cache.incr(key)
-    except Exception:
-        current = cache.get(key) or initial
-        cache.set(key, int(current) + 1)
+def bump_order_lists(user_ids=None) -> None:
+    """
+    Поднять версии пользовательских и админских списков (в т.ч. после bulk-операций без сигналов)
+    и закрепить их чтения за primary (read-your-writes, см. db_router.pin_primary): иначе список
+    под новой версией построится с отстающей реплики и пролежит в кэше весь TTL.
+    user_ids — авторы изменённых заказов; None — неизвестны, закрепляются списки всех пользователей.
+    """
+    # список конкретного пользователя (учитывается в ключе OrderListCreateView)
+    bump_version("orders:user:list:version")
+    # общий админский список (AdminOrderListView)
+    bump_version("orders:admin:list:version")
+    user_pins = ["orders:users"] if user_ids is None else [f"user:{uid}" for uid in set(user_ids)]
+    pin_primary("orders:admin", *user_pins)
+
+
+def invalidate_order_cache(order_id: int, user_id: int = None) -> None:
+    """Сбросить деталь заказа и поднять версии списков (для изменений через queryset.update())."""
+    cache.delete(f"order:{order_id}")
+    bump_order_lists(None if user_id is None else [user_id])
 
 
 def _bump_user_admin_lists(order: Order):
     """Поднять версии пользовательских и админских списков после изменений заказа/состава."""
-    # список конкретного пользователя (учитывается в ключе OrderListCreateView)
-    _incr_version("orders:user:list:version")
-    # общий админский список (AdminOrderListView)
-    _incr_version("orders:admin:list:version")
+    bump_order_lists([order.user_id])
+
+
+def _item_user_ids(item: OrderItem):
+    """Автор заказа позиции, если заказ уже загружен (без лишнего запроса), иначе None."""
+    if OrderItem.order.is_cached(item):
+        return [item.order.user_id]
+    return None
 
 
 # -------- Order: инвалидация --------
@@ -43,12 +60,12 @@ def order_deleted(sender, instance: Order, **kwargs):
 
 @receiver(post_save, sender=OrderItem, dispatch_uid="orderitem_saved_cache_invalidation")
 def orderitem_saved(sender, instance: OrderItem, **kwargs):
-    # изменение состава влияет на деталь заказа + списки
+    # изменение состава влияет на деталь заказа + списки (instance.order не грузим — хватает order_id)
     cache.delete(f"order:{instance.order_id}")
-    _bump_user_admin_lists(instance.order)
+    bump_order_lists(_item_user_ids(instance))
 
 
 @receiver(post_delete, sender=OrderItem, dispatch_uid="orderitem_deleted_cache_invalidation")
 def orderitem_deleted(sender, instance: OrderItem, **kwargs):
     cache.delete(f"order:{instance.order_id}")
-    _bump_user_admin_lists(instance.order)
+    bump_order_lists(_item_user_ids(instance))
@@ -1,25 +1,24 @@
-import io
 import logging
-import time
-from pathlib import Path
+from datetime import timedelta
 
 import requests
-from celery import shared_task
+from celery import group, shared_task
 from django.conf import settings
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
-from apps.orders.models import Order
+from apps.common import metrics
+from apps.common.db_router import replica_reads
+from apps.orders import archive, notifier, outbox, receipts, rollups
+from apps.orders.models import Order, OrderIntent, OutboxEvent, ReceiptJob
+from apps.orders.services import place_orders, verify_order_totals as verify_totals
 
 logger = logging.getLogger(__name__)
 
 
-def _pdf_path(order_id: int) -> Path:
-    base = Path(getattr(settings, "MEDIA_ROOT", ".")) / "order_receipts"
-    base.mkdir(parents=True, exist_ok=True)
-    return base / f"order_{order_id}.pdf"
-
-
 @shared_task(
     name="orders.order_created_generate_pdf_and_email",
     autoretry_for=(Exception,),
@@ -28,59 +27,308 @@ def _pdf_path(order_id: int) -> Path:
 def order_created_generate_pdf_and_email(order_id: int) -> str:
     """
     Генерация PDF по заказу + имитация отправки email (лог).
+    PDF кладётся в хранилище по хэшу состояния заказа; фазы fetch/render/write — в метриках.
     Возвращает путь к PDF.
     """
-    order = Order.objects.select_related("user").prefetch_related("items__product").get(pk=order_id)
-
-    # --- generate PDF in memory ---
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    text = c.beginText(40, 800)
-    text.textLine(f"Order #{order.id}")
-    text.textLine(f"User ID: {order.user_id}")
-    text.textLine(f"Status: {order.status}")
-    text.textLine(f"Total: {order.total_price}")
-    text.textLine("")
-    text.textLine("Items:")
-    for item in order.items.all():
-        text.textLine(
-            f"- {item.product.name} x{item.quantity} @ {item.price_at_purchase} = "
-            f"{item.quantity * item.price_at_purchase}"
-        )
-    c.drawText(text)
-    c.showPage()
-    c.save()
-
-    # --- save to MEDIA_ROOT/order_receipts/order_<id>.pdf ---
-    pdf_file = _pdf_path(order.id)
-    pdf_file.write_bytes(buffer.getvalue())
-
-    # --- simulate email send (log) ---
-    logger.info("Order #%s PDF generated at %s; email sent to user %s", order.id, str(pdf_file), order.user_id)
+    with metrics.phase("fetch"):
+        with replica_reads():
+            order = Order.objects.prefetch_related("items__product").filter(pk=order_id).first()
+        if order is None:
+            # заказ только что создан — реплика могла ещё не догнать primary
+            order = Order.objects.prefetch_related("items__product").get(pk=order_id)
+        payload = receipts.receipt_payload(order)
 
+    digest = receipts.content_hash(payload)
+    pdf_file = receipts.receipts_root() / receipts.receipt_relpath(digest)
+    if not pdf_file.exists():
+        with metrics.phase("render"):
+            pdf = receipts.render_receipt_pdf(payload)
+        with metrics.phase("write"):
+            pdf_file = receipts.store_receipt(digest, pdf)
+
+    send_order_created_email(order.id, order.user_id, pdf_file)
     return str(pdf_file)
 
 
 @shared_task(
+    name="orders.order_created_send_email",
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 5},
+)
+def order_created_send_email(order_ids: list) -> int:
+    """
+    Письма о созданных заказах без PDF (ORDERS_RECEIPTS_MODE=lazy): квитанция — ссылкой,
+    рендер — при первом GET /orders/{id}/receipt/. Авторы заказов — одним запросом на пачку.
+    Возвращает число отправленных писем.
+    """
+    with metrics.phase("fetch"):
+        with replica_reads():
+            owners = dict(Order.objects.filter(pk__in=order_ids).values_list("id", "user_id"))
+        missing = set(order_ids) - owners.keys()
+        if missing:
+            # заказы только что созданы — реплика могла ещё не догнать primary
+            owners.update(Order.objects.filter(pk__in=missing).values_list("id", "user_id"))
+    for order_id, user_id in owners.items():
+        send_order_created_email(order_id, user_id, reverse("orders-receipt", kwargs={"pk": order_id}))
+    return len(owners)
+
+
+def send_order_created_email(order_id: int, user_id: int, receipt) -> None:
+    """Письмо «заказ создан» (имитация — лог); receipt — путь к PDF или ссылка на него."""
+    with metrics.phase("email"):
+        logger.info("Order #%s receipt at %s; email sent to user %s", order_id, str(receipt), user_id)
+
+
+@shared_task(
+    bind=True,
     name="orders.order_shipped_notify_external",
-    autoretry_for=(requests.RequestException, TimeoutError),
+    autoretry_for=(requests.RequestException,),
     retry_kwargs={"max_retries": 3, "countdown": 5},
     retry_backoff=True,
 )
-def order_shipped_notify_external(order_id: int) -> dict:
+def order_shipped_notify_external(self, order_id: int) -> dict:
+    """
+    Вызов внешнего API при статусе shipped (notifier: общая сессия + circuit breaker).
+    Ретраи при сетевых ошибках; при открытом breaker — отложенный ретрай без сетевого вызова.
+    """
+    try:
+        with metrics.phase("http"):
+            return notifier.send_shipped(order_id)
+    except notifier.CircuitOpenError as exc:
+        raise self.retry(exc=exc, countdown=max(exc.retry_after, 1))
+
+
+@shared_task(name="orders.notify_shipped_batch")
+def notify_shipped_batch(order_ids: list, attempt: int = 0) -> int:
+    """
+    Пакет уведомлений об отправке (notifier.notify_shipped: пул соединений, ограниченная
+    конкурентность). Неотправленные — одной отложенной задачей с экспоненциальной паузой
+    (не раньше закрытия breaker), до ORDERS_NOTIFY_MAX_ATTEMPTS попыток.
+    Возвращает число отправленных.
+    """
+    with metrics.phase("http"):
+        sent, failed = notifier.notify_shipped(order_ids)
+    if failed:
+        if attempt + 1 < getattr(settings, "ORDERS_NOTIFY_MAX_ATTEMPTS", 4):
+            countdown = max(5 * 2 ** attempt, getattr(settings, "ORDERS_NOTIFY_BREAKER_RESET", 30) if notifier.breaker.is_open else 0)
+            notify_shipped_batch.apply_async((failed, attempt + 1), countdown=countdown)
+        else:
+            logger.error("Shipped notifications dropped after %s attempts: %s", attempt + 1, failed)
+    logger.info("Shipped notifications batch: %s sent, %s failed", len(sent), len(failed))
+    return len(sent)
+
+
+def enqueue_receipts(order_ids: list) -> None:
+    """
+    Поставить генерацию PDF для пачки заказов.
+    Письмо о заказе уходит в любом режиме; режим определяет только рендер PDF.
+    ORDERS_RECEIPTS_MODE=lazy — одна задача писем на пачку (order_created_send_email), PDF
+    рендерится при первом GET /orders/{id}/receipt/;
+    task — задача рендера и письма на заказ (одним group-вызовом);
+    batch — строки ReceiptJob, их разбирает render_pending_receipts (без обращения к брокеру).
+    """
+    mode = getattr(settings, "ORDERS_RECEIPTS_MODE", "lazy")
+    if not order_ids:
+        return
+    if mode == "lazy":
+        order_created_send_email.delay(list(order_ids))
+        return
+    if mode == "batch":
+        ReceiptJob.objects.bulk_create([ReceiptJob(order_id=oid) for oid in order_ids], ignore_conflicts=True)
+        return
+    if len(order_ids) == 1:
+        order_created_generate_pdf_and_email.delay(order_ids[0])
+        return
+    group(order_created_generate_pdf_and_email.s(oid) for oid in order_ids).apply_async()
+
+
+def enqueue_shipped_notifications(order_ids: list) -> None:
+    """Уведомления об отправке: задача notify_shipped_batch на каждые ORDERS_NOTIFY_BATCH_SIZE заказов."""
+    if not order_ids:
+        return
+    size = getattr(settings, "ORDERS_NOTIFY_BATCH_SIZE", 200)
+    chunks = [list(order_ids[i:i + size]) for i in range(0, len(order_ids), size)]
+    if len(chunks) == 1:
+        notify_shipped_batch.delay(chunks[0])
+        return
+    group(notify_shipped_batch.s(chunk) for chunk in chunks).apply_async()
+
+
+@shared_task(name="orders.relay_outbox")
+def relay_outbox(batch_size: int = None, max_batches: int = 20) -> int:
+    """
+    Публикация событий outbox в Celery пачками: order.created → enqueue_receipts,
+    order.shipped → enqueue_shipped_notifications (один вызов на topic в пачке).
+    Ошибка брокера откатывает пачку — события остаются в таблице. Возвращает число событий.
+    """
+    batch_size = batch_size or getattr(settings, "ORDERS_OUTBOX_BATCH_SIZE", 500)
+    handlers = {
+        OutboxEvent.TOPIC_ORDER_CREATED: enqueue_receipts,
+        OutboxEvent.TOPIC_ORDER_SHIPPED: enqueue_shipped_notifications,
+    }
+    published = 0
+    for _ in range(max_batches):
+        count = outbox.relay(handlers, batch_size)
+        published += count
+        if count < batch_size:
+            break
+    return published
+
+
+@shared_task(name="orders.render_pending_receipts")
+def render_pending_receipts(batch_size: int = None, max_batches: int = 10) -> int:
+    """
+    Пакетный рендер квитанций по ReceiptJob.
+    Пачка: задания забираются select_for_update(skip_locked) в короткой транзакции и помечаются
+    (attempts + 1, processed_at — время захвата: другой воркер не возьмёт их
+    ORDERS_RECEIPTS_CLAIM_SECONDS); заказы — одним запросом с prefetch items__product,
+    PDF рендерятся в пуле процессов (receipts.render_many) уже без транзакции — на SQLite
+    она держала бы блокировку записи и приём заказов на весь рендер.
+    Письмо о заказе (send_order_created_email) — по каждой готовой квитанции, как у задачи на заказ.
+    Неудачное задание остаётся pending до ORDERS_RECEIPTS_MAX_ATTEMPTS попыток;
+    задание, чей заказ успели удалить/архивировать, — failed.
+    Возвращает число готовых квитанций.
+    """
+    batch_size = batch_size or getattr(settings, "ORDERS_RECEIPTS_BATCH_SIZE", 200)
+    max_attempts = getattr(settings, "ORDERS_RECEIPTS_MAX_ATTEMPTS", 3)
+    claim_seconds = getattr(settings, "ORDERS_RECEIPTS_CLAIM_SECONDS", 600)
+    rendered = 0
+    for _ in range(max_batches):
+        claimed_at = timezone.now()
+        with metrics.phase("claim"), transaction.atomic():
+            jobs = list(
+                ReceiptJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=ReceiptJob.STATUS_PENDING)
+                .filter(Q(processed_at__isnull=True) | Q(processed_at__lt=claimed_at - timedelta(seconds=claim_seconds)))
+                .order_by("id")[:batch_size]
+            )
+            for job in jobs:
+                job.attempts += 1
+                job.processed_at = claimed_at
+            ReceiptJob.objects.bulk_update(jobs, ["attempts", "processed_at"])
+        if not jobs:
+            break
+
+        with metrics.phase("fetch"):
+            orders = Order.objects.prefetch_related("items__product").in_bulk([j.order_id for j in jobs])
+        ready = []
+        for job in jobs:
+            if job.order_id in orders:
+                ready.append(job)
+            else:
+                job.status = ReceiptJob.STATUS_FAILED
+                job.error = "Заказ не найден (удалён или перенесён в архив)"
+        payloads = [receipts.receipt_payload(orders[j.order_id]) for j in ready]
+        digests = [receipts.content_hash(p) for p in payloads]
+        with metrics.phase("render"):
+            results = receipts.render_many(payloads)
+
+        done = []
+        for job, digest, (pdf, error) in zip(ready, digests, results):
+            if error:
+                job.error = error
+                if job.attempts >= max_attempts:
+                    job.status = ReceiptJob.STATUS_FAILED
+                else:
+                    job.processed_at = None  # снова доступно для захвата
+                continue
+            with metrics.phase("write"):
+                pdf_file = receipts.store_receipt(digest, pdf)
+            job.status = ReceiptJob.STATUS_DONE
+            job.error = ""
+            job.processed_at = timezone.now()
+            rendered += 1
+            done.append((job.order_id, pdf_file))
+        ReceiptJob.objects.bulk_update(jobs, ["status", "error", "processed_at"])
+
+        # письма — после записи результатов: сбой отправки не вернёт готовую квитанцию в pending
+        for order_id, pdf_file in done:
+            send_order_created_email(order_id, orders[order_id].user_id, pdf_file)
+
+        if len(jobs) < batch_size:
+            break
+    return rendered
+
+
+@shared_task(name="orders.process_order_intents")
+def process_order_intents(batch_size: int = None, max_batches: int = 10) -> int:
+    """
+    Разбор заявок асинхронного приёма (OrderIntent) пачками.
+    Каждая пачка — одна транзакция: заявки забираются select_for_update(skip_locked),
+    заказы создаются через services.place_orders (продукты блокируются один раз на пачку).
+    Возвращает число обработанных заявок.
+    """
+    batch_size = batch_size or getattr(settings, "ORDERS_INTAKE_BATCH_SIZE", 200)
+    processed = 0
+    for _ in range(max_batches):
+        created_ids = []
+        with transaction.atomic():
+            intents = list(
+                OrderIntent.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=OrderIntent.STATUS_PENDING)
+                .order_by("id")[:batch_size]
+            )
+            if not intents:
+                break
+
+            results = place_orders([{"user_id": i.user_id, "items": i.items} for i in intents])
+            now = timezone.now()
+            for intent, (order, error) in zip(intents, results):
+                intent.processed_at = now
+                if error:
+                    intent.status = OrderIntent.STATUS_FAILED
+                    intent.error = error
+                else:
+                    intent.status = OrderIntent.STATUS_DONE
+                    intent.order = order
+                    created_ids.append(order.id)
+            OrderIntent.objects.bulk_update(intents, ["status", "order", "error", "processed_at"])
+
+        processed += len(intents)
+        logger.info("Order intents batch: %s processed, %s orders created", len(intents), len(created_ids))
+        if len(intents) < batch_size:
+            break
+    return processed
+
+
+@shared_task(name="orders.rebuild_sales_rollups")
+def rebuild_sales_rollups(date_from: str = None, date_to: str = None) -> int:
+    """
+    Reconciliation агрегатов продаж за дни [date_from, date_to] (YYYY-MM-DD, UTC).
+    По умолчанию — вчера (ночной запуск по beat).
+    """
+    yesterday = timezone.now().date() - timedelta(days=1)
+    start = parse_date(date_from) if date_from else yesterday
+    end = parse_date(date_to) if date_to else yesterday
+    orders = rollups.rebuild(start, end)
+    logger.info("Sales rollups rebuilt for %s..%s from %s orders", start, end, orders)
+    return orders
+
+
+@shared_task(name="orders.archive_finished_orders")
+def archive_finished_orders(older_than_days: int = None, batch_size: int = None, max_batches: int = 100) -> int:
     """
-    Имитация вызова внешнего API при статусе shipped.
-    Ретраи при сетевых ошибках.
+    Перенос завершённых (delivered/cancelled) заказов старше older_than_days в архив
+    пачками по batch_size. Возвращает число перенесённых заказов.
     """
-    # небольшой «джиттер», чтобы показать ретраи в логах (необязательно)
-    time.sleep(0.2)
+    older_than_days = older_than_days or getattr(settings, "ORDERS_ARCHIVE_AFTER_DAYS", 90)
+    batch_size = batch_size or getattr(settings, "ORDERS_ARCHIVE_BATCH_SIZE", 1000)
+    moved = 0
+    for _ in range(max_batches):
+        count = archive.archive_batch(older_than_days, batch_size)
+        moved += count
+        if count < batch_size:
+            break
+    logger.info("Archived %s finished orders older than %s days", moved, older_than_days)
+    return moved
 
-    # пример: дергаем фейковый API
-    url = "https://jsonplaceholder.typicode.com/posts"
-    payload = {"title": f"order-{order_id}", "body": "shipped", "userId": 1}
-    resp = requests.post(url, json=payload, timeout=5)
-    resp.raise_for_status()
-    data = resp.json()
 
-    logger.info("Order #%s shipped notification sent. External id=%s", order_id, data.get("id"))
-    return data
+@shared_task(name="orders.verify_order_totals")
+def verify_order_totals(batch_size: int = 1000, repair: bool = True) -> int:
+    """Сверка/починка total_price пачками (services.verify_order_totals)."""
+    mismatched = verify_totals(batch_size=batch_size, repair=repair)
+    if mismatched:
+        logger.warning("Order totals: %s mismatches found (repair=%s)", mismatched, repair)
+    return mismatched
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.orders.models import Order, OrderItem
+
+
+def _make_orders(user, *created):
+    """Заказы с заданным created_at (auto_now_add перезаписываем через update)."""
+    orders = []
+    for ts in created:
+        order = Order.objects.create(user=user)
+        Order.objects.filter(pk=order.pk).update(created_at=ts)
+        orders.append(order)
+    return orders
+
+
+@pytest.mark.django_db
+def test_admin_orders_date_range_is_half_open_on_days(admin_client, user):
+    inside_start, inside_end, after = _make_orders(
+        user,
+        datetime(2025, 3, 1, 0, 0, 0, tzinfo=dt_timezone.utc),
+        datetime(2025, 3, 2, 23, 59, 59, tzinfo=dt_timezone.utc),
+        datetime(2025, 3, 3, 0, 0, 0, tzinfo=dt_timezone.utc),
+    )
+
+    r = admin_client.get(reverse("admin-orders-list"), {"date_from": "2025-03-01", "date_to": "2025-03-02"})
+    assert r.status_code == 200
+    ids = {o["id"] for o in r.json()["results"]}
+    assert ids == {inside_start.id, inside_end.id}
+
+    # некорректная дата игнорируется, а не роняет запрос
+    r_bad = admin_client.get(reverse("admin-orders-list"), {"date_from": "2025-13-40"})
+    assert r_bad.status_code == 200
+    assert r_bad.json()["count"] == 3
+
+
+@pytest.mark.django_db
+def test_admin_orders_estimated_count_is_cached_per_filter(admin_client, user):
+    _make_orders(user, *[datetime(2025, 3, 1, h, tzinfo=dt_timezone.utc) for h in range(5)])
+    url = reverse("admin-orders-list")
+
+    r1 = admin_client.get(url, {"page_size": 2})
+    body = r1.json()
+    assert body["count"] == 5
+    assert len(body["results"]) == 2
+    assert body["next"] is not None
+
+    # count берётся из кэша по фильтрам: новые заказы не делают точный COUNT(*)
+    _make_orders(user, datetime(2025, 3, 2, tzinfo=dt_timezone.utc))
+    r2 = admin_client.get(url, {"page_size": 2, "page": 3})
+    body2 = r2.json()
+    assert body2["count"] == 5
+    # следующая страница определяется по «лишней» строке, а не по устаревшему count
+    assert len(body2["results"]) == 2
+    assert body2["next"] is None
+
+    cache.clear()
+    assert admin_client.get(url, {"page_size": 2}).json()["count"] == 6
+
+
+@pytest.mark.django_db
+def test_admin_orders_export_streams_csv_and_jsonl(admin_client, user, products, settings, monkeypatch):
+    p1, p2 = products
+    settings.ORDERS_EXPORT_CHUNK_SIZE = 2  # несколько пачек на 3 заказа
+    orders = _make_orders(user, *[datetime(2025, 3, 1, h, tzinfo=dt_timezone.utc) for h in range(3)])
+    OrderItem.objects.create(order=orders[0], product=p1, quantity=2, price_at_purchase=p1.price)
+    OrderItem.objects.create(order=orders[0], product=p2, quantity=1, price_at_purchase=p2.price)
+
+    # выгрузка не трогает кэш
+    import apps.common.caching as caching
+    monkeypatch.setattr(caching, "cache", None)
+
+    url = reverse("admin-orders-export")
+    r_csv = admin_client.get(url, {"fmt": "csv", "status": "pending"})
+    assert r_csv.status_code == 200
+    assert r_csv.streaming
+    rows = list(csv.DictReader(io.StringIO(b"".join(r_csv.streaming_content).decode())))
+    assert [int(r["id"]) for r in rows] == [o.id for o in reversed(orders)]
+    first = rows[-1]
+    assert first["items_count"] == "2"
+    assert first["total_price"] == "1020.00"
+    assert first["created_at"] == "2025-03-01 00:00:00"
+
+    r_jsonl = admin_client.get(url, {"fmt": "jsonl", "date_to": "2025-03-01"})
+    lines = [json.loads(line) for line in b"".join(r_jsonl.streaming_content).decode().splitlines()]
+    assert len(lines) == 3
+    assert lines[-1]["items"][0] == {"product_id": p1.id, "quantity": 2, "price_at_purchase": "500.00"}
+
+    assert admin_client.get(url, {"fmt": "xml"}).status_code == 400
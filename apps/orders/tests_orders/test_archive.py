@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.orders import rollups, tasks
+from apps.orders.models import ArchivedOrder, Order, OrderItem, SalesRollup
+
+
+@pytest.mark.django_db
+def test_finished_orders_move_to_archive_and_detail_falls_back(api_client, other_client, products):
+    p1, p2 = products
+    url = reverse("orders-list")
+    old = api_client.post(url, {"items": [{"product_id": p1.id, "quantity": 1}, {"product_id": p2.id, "quantity": 2}]}, format="json").json()
+    fresh = api_client.post(url, {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json").json()
+
+    Order.objects.filter(pk=old["id"]).update(
+        status=Order.STATUS_DELIVERED, updated_at=timezone.now() - timedelta(days=120)
+    )
+    Order.objects.filter(pk=fresh["id"]).update(status=Order.STATUS_DELIVERED)
+
+    assert tasks.archive_finished_orders(older_than_days=90) == 1
+    assert not Order.objects.filter(pk=old["id"]).exists()
+    assert not OrderItem.objects.filter(order_id=old["id"]).exists()
+    assert ArchivedOrder.objects.get(pk=old["id"]).items.count() == 2
+    assert Order.objects.filter(pk=fresh["id"]).exists()
+
+    # деталь по старому id отдаётся из архива в прежнем формате
+    detail_url = reverse("orders-detail", kwargs={"pk": old["id"]})
+    r = api_client.get(detail_url)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["status"] == "delivered"
+    assert body["total_price"] == old["total_price"]
+    assert {i["product_name"] for i in body["items"]} == {"Phone", "Case"}
+    assert set(body["items"][0]) == set(old["items"][0])
+
+    assert other_client.get(detail_url).status_code == 403
+    assert api_client.patch(detail_url, {"status": "cancelled"}, format="json").status_code == 400
+
+    # пересборка агрегатов учитывает архив
+    today = timezone.now().date()
+    assert rollups.rebuild(today, today) == 2
+    total = SalesRollup.objects.get(period="day", dimension="total")
+    assert (total.orders_count, total.units) == (2, 4)
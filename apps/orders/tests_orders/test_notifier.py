@@ -0,0 +1,70 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from apps.orders import notifier, tasks
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        srv = self.server
+        with srv.lock:
+            srv.requests.append(body["title"])
+            srv.peers.add(self.client_address)
+        code = srv.status
+        out = json.dumps({"id": len(srv.requests)}).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api(settings, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.lock = threading.Lock()
+    server.requests, server.peers, server.status = [], set(), 201
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.ORDERS_NOTIFY_URL = f"http://127.0.0.1:{server.server_port}/posts"
+    settings.ORDERS_NOTIFY_CONCURRENCY = 4
+    # свежие сессия и breaker на тест
+    monkeypatch.setattr(notifier, "_SESSION", None)
+    monkeypatch.setattr(notifier, "breaker", notifier.CircuitBreaker(threshold=3, reset_timeout=60))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_notify_shipped_reuses_pooled_connections(stub_api):
+    ids = list(range(1, 41))
+    sent, failed = notifier.notify_shipped(ids)
+    assert sorted(sent) == ids and failed == []
+    assert sorted(stub_api.requests) == sorted(f"order-{i}" for i in ids)
+    # 40 запросов — не больше соединений, чем потоков
+    assert len(stub_api.peers) <= 4
+
+
+def test_circuit_breaker_stops_calls_and_batch_task_requeues(stub_api, monkeypatch):
+    stub_api.status = 503
+    requeued = []
+    monkeypatch.setattr(tasks.notify_shipped_batch, "apply_async", lambda args, countdown: requeued.append((args, countdown)))
+
+    assert tasks.notify_shipped_batch(list(range(1, 21))) == 0
+    # после 3 ошибок breaker разомкнут: остальные заказы в сеть не уходят
+    assert len(stub_api.requests) <= 3 + 4
+    assert notifier.breaker.is_open
+    [((failed, attempt), countdown)] = requeued
+    assert sorted(failed) == list(range(1, 21)) and attempt == 1 and countdown >= 30
+
+    with pytest.raises(notifier.CircuitOpenError):
+        notifier.send_shipped(1)
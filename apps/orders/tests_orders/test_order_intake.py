@@ -0,0 +1,62 @@
+import pytest
+from django.urls import reverse
+
+from apps.orders.models import Order, OrderIntent
+
+
+@pytest.mark.django_db
+def test_async_intake_accepts_and_worker_creates_orders(api_client, products, monkeypatch):
+    p1, p2 = products
+
+    import apps.orders.tasks as tasks
+    enqueued = []
+    monkeypatch.setattr(tasks, "enqueue_receipts", lambda ids: enqueued.extend(ids))
+
+    url = reverse("orders-list") + "?async=true"
+    r1 = api_client.post(url, {"items": [{"product_id": p1.id, "quantity": 2}]}, format="json")
+    r2 = api_client.post(url, {"items": [{"product_id": p2.id, "quantity": 5}]}, format="json")
+    assert r1.status_code == 202, r1.json()
+    assert r2.status_code == 202
+    assert r1["Location"] == r1.json()["status_url"]
+
+    # до воркера заказов нет, заявка pending
+    assert Order.objects.count() == 0
+    status_url = reverse("orders-intent-detail", kwargs={"pk": r1.json()["intent_id"]})
+    assert api_client.get(status_url).json()["status"] == "pending"
+
+    # воркер разбирает обе заявки одной пачкой
+    assert tasks.process_order_intents() == 2
+    assert tasks.relay_outbox() == 2
+
+    body = api_client.get(status_url).json()
+    assert body["status"] == "done"
+    order = Order.objects.get(pk=body["order"])
+    assert float(order.total_price) == 2 * 500
+    assert sorted(enqueued) == sorted(Order.objects.values_list("id", flat=True))
+
+    p1.refresh_from_db(); p2.refresh_from_db()
+    assert p1.stock == 8
+    assert p2.stock == 45
+
+
+@pytest.mark.django_db
+def test_async_intake_failed_intent_reports_stock_error(api_client, other_client, products, monkeypatch):
+    p1, _ = products
+
+    import apps.orders.tasks as tasks
+    monkeypatch.setattr(tasks, "enqueue_receipts", lambda ids: None)
+
+    url = reverse("orders-list") + "?async=true"
+    # первая заявка съедает почти весь stock, вторая в той же пачке уже не проходит
+    ok = api_client.post(url, {"items": [{"product_id": p1.id, "quantity": 9}]}, format="json")
+    bad = api_client.post(url, {"items": [{"product_id": p1.id, "quantity": 2}]}, format="json")
+    tasks.process_order_intents()
+
+    assert OrderIntent.objects.get(pk=ok.json()["intent_id"]).status == "done"
+    intent = OrderIntent.objects.get(pk=bad.json()["intent_id"])
+    assert intent.status == "failed"
+    assert intent.error["details"][0] == {"product_id": p1.id, "available": 1, "requested": 2}
+
+    # чужая заявка недоступна
+    status_url = reverse("orders-intent-detail", kwargs={"pk": intent.pk})
+    assert other_client.get(status_url).status_code == 403
@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.orders import tasks
+from apps.orders.models import Order, OrderItem
+
+
+@pytest.mark.django_db
+def test_item_writes_apply_deltas_to_total(api_client, products):
+    p1, p2 = products
+    created = api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json")
+    order = Order.objects.get(pk=created.json()["id"])
+    assert order.total_price == Decimal("500.00")
+
+    item = OrderItem.objects.create(order=order, product=p2, quantity=2)
+    assert Order.objects.get(pk=order.pk).total_price == Decimal("540.00")
+    assert order.total_price == Decimal("540.00")  # закэшированный order тоже обновлён
+
+    # изменение количества: без повторного чтения позиции, без агрегата по заказу
+    item = OrderItem.objects.get(pk=item.pk)
+    item.quantity = 5
+    with CaptureQueriesContext(connection) as ctx:
+        item.save()
+    sqls = [q["sql"] for q in ctx.captured_queries]
+    assert not any(sql.startswith("SELECT") for sql in sqls)
+    assert Order.objects.get(pk=order.pk).total_price == Decimal("600.00")
+
+    item.delete()
+    assert Order.objects.get(pk=order.pk).total_price == Decimal("500.00")
+
+
+@pytest.mark.django_db
+def test_verify_order_totals_repairs_drift(api_client, products):
+    p1, _ = products
+    ok = api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json").json()
+    broken = api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 2}]}, format="json").json()
+    Order.objects.filter(pk=broken["id"]).update(total_price=Decimal("1.00"))
+
+    assert tasks.verify_order_totals(batch_size=1, repair=False) == 1
+    assert Order.objects.get(pk=broken["id"]).total_price == Decimal("1.00")
+
+    assert tasks.verify_order_totals(batch_size=1) == 1
+    assert Order.objects.get(pk=broken["id"]).total_price == Decimal("1000.00")
+    assert Order.objects.get(pk=ok["id"]).total_price == Decimal("500.00")
+    assert tasks.verify_order_totals() == 0
@@ -1,12 +1,18 @@
 import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from apps.catalog.models import Product
 from apps.orders.models import Order, OrderItem
+from apps.orders.serializers import OrderStatusPatchSerializer
 
 
 @pytest.mark.django_db
-def test_create_order_success_and_celery_called(api_client, products, monkeypatch):
+def test_create_order_success_and_celery_called(api_client, products, monkeypatch, settings):
     p1, p2 = products
+    settings.ORDERS_RECEIPTS_MODE = "task"
 
     # замокаем Celery-задачи (delay)
     called = {"created": None, "shipped": None}
@@ -42,7 +48,9 @@ def test_create_order_success_and_celery_called(api_client, products, monkeypatc
     assert p2.stock == 47 # 50 - 3
     assert float(data["total_price"]) == 3 * float(500) + 3 * float(20)
 
-    # задача создания была вызвана
+    # запрос брокер не трогает: событие в outbox, задачу ставит relay
+    assert called["created"] is None
+    assert tasks.relay_outbox() == 1
     assert called["created"] == order_id
 
     # список заказов пользователя: MISS -> HIT
@@ -66,6 +74,26 @@ def test_create_order_success_and_celery_called(api_client, products, monkeypatc
     assert d2["X-Cache"] == "HIT"
 
 
+@pytest.mark.django_db
+def test_default_receipt_mode_still_sends_order_created_email(api_client, products, monkeypatch):
+    import apps.orders.tasks as tasks
+
+    p1, _ = products
+    queued, sent = [], []
+    monkeypatch.setattr(tasks.order_created_send_email, "delay", queued.append)
+    monkeypatch.setattr(tasks, "send_order_created_email", lambda *args: sent.append(args))
+    monkeypatch.setattr(tasks.receipts, "render_receipt_pdf", lambda payload: pytest.fail("PDF в lazy-режиме не рендерим"))
+
+    order_id = api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json").json()["id"]
+    assert tasks.relay_outbox() == 1
+    assert queued == [[order_id]]
+
+    assert tasks.order_created_send_email(*queued) == 1
+    [(sent_order, user_id, receipt)] = sent
+    assert (sent_order, receipt) == (order_id, reverse("orders-receipt", kwargs={"pk": order_id}))
+    assert user_id == Order.objects.get(pk=order_id).user_id
+
+
 @pytest.mark.django_db
 def test_create_order_insufficient_stock(api_client, products):
     p1, _ = products
@@ -100,7 +128,7 @@ def test_status_transitions_and_shipped_task(api_client, products, monkeypatch):
     # замокаем shipped-задачу
     shipped_called = {"order": None}
     import apps.orders.tasks as tasks
-    monkeypatch.setattr(tasks.order_shipped_notify_external, "delay", lambda oid: shipped_called.__setitem__("order", oid))
+    monkeypatch.setattr(tasks.notify_shipped_batch, "delay", lambda ids: shipped_called.__setitem__("order", ids))
 
     # создаём заказ
     create = api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json")
@@ -116,7 +144,9 @@ def test_status_transitions_and_shipped_task(api_client, products, monkeypatch):
     patch2 = api_client.patch(reverse("orders-detail", kwargs={"pk": order_id}), {"status": "shipped"}, format="json")
     assert patch2.status_code == 200
     assert patch2.json()["status"] == "shipped"
-    assert shipped_called["order"] == order_id
+    assert shipped_called["order"] is None
+    tasks.relay_outbox()
+    assert shipped_called["order"] == [order_id]
 
     # shipped -> pending (запрещено)
     patch_bad = api_client.patch(reverse("orders-detail", kwargs={"pk": order_id}), {"status": "pending"}, format="json")
@@ -142,3 +172,72 @@ def test_admin_orders_list_filters(admin_client, api_client, products):
     q2 = admin_client.get(url, {"status": "pending"})
     assert q2.status_code == 200
     assert q2["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db
+def test_status_transition_is_compare_and_set(api_client, products):
+    p1, _ = products
+    create = api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json")
+    order = Order.objects.get(pk=create.json()["id"])  # загружен в статусе pending
+
+    # конкурентный переход, о котором экземпляр не знает
+    Order.objects.filter(pk=order.pk).update(status=Order.STATUS_CANCELLED)
+
+    with pytest.raises(ValidationError):
+        order.transition_to(Order.STATUS_PROCESSING)
+    order.refresh_from_db()
+    assert order.status == Order.STATUS_CANCELLED
+
+    # повтор того же статуса — no-op без записи
+    assert order.transition_to(Order.STATUS_CANCELLED) is False
+
+
+@pytest.mark.django_db
+def test_status_patch_does_not_reread_order(api_client, products, django_assert_num_queries):
+    p1, _ = products
+    create = api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json")
+    order = Order.objects.get(pk=create.json()["id"])
+
+    ser = OrderStatusPatchSerializer(order, data={"status": "processing"}, partial=True)
+    assert ser.is_valid()
+    # SAVEPOINT + условный UPDATE + RELEASE — без SELECT статуса
+    with django_assert_num_queries(3):
+        ser.save()
+    assert Order.objects.get(pk=order.pk).status == Order.STATUS_PROCESSING
+
+
+@pytest.mark.django_db
+def test_order_detail_query_count_does_not_depend_on_items(api_client, category):
+    prods = [
+        Product.objects.create(name=f"P{i}", description="d", price=10, stock=100, category=category)
+        for i in range(12)
+    ]
+
+    def queries_for(n_items):
+        payload = {"items": [{"product_id": p.id, "quantity": 1} for p in prods[:n_items]]}
+        with CaptureQueriesContext(connection) as create_ctx:
+            order_id = api_client.post(reverse("orders-list"), payload, format="json").json()["id"]
+        with CaptureQueriesContext(connection) as detail_ctx:
+            r = api_client.get(reverse("orders-detail", kwargs={"pk": order_id}))
+        assert r["X-Cache"] == "MISS"
+        assert len(r.json()["items"]) == n_items
+        return len(create_ctx.captured_queries), len(detail_ctx.captured_queries)
+
+    # POST (201 с деталью) и GET MISS — константное число запросов
+    assert queries_for(1) == queries_for(12)
+
+
+@pytest.mark.django_db
+def test_clean_validates_against_last_saved_status(user):
+    created = Order.objects.create(user=user, status=Order.STATUS_PENDING, total_price=0)
+    order = Order.objects.get(pk=created.pk)
+    order.status = Order.STATUS_PROCESSING
+    order.save()
+    order.status = Order.STATUS_SHIPPED
+    order.full_clean()  # processing → shipped, а не устаревший pending → shipped
+
+    Order.objects.filter(pk=order.pk).update(status=Order.STATUS_DELIVERED)
+    order.refresh_from_db()
+    order.status = Order.STATUS_CANCELLED
+    with pytest.raises(ValidationError):
+        order.full_clean()
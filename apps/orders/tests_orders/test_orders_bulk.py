@@ -0,0 +1,108 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.orders.models import Order, OrderItem
+
+
+@pytest.mark.django_db
+def test_bulk_create_per_order_results_and_single_enqueue(api_client, products, monkeypatch):
+    p1, p2 = products
+
+    import apps.orders.tasks as tasks
+    batches = []
+    monkeypatch.setattr(tasks, "enqueue_receipts", lambda ids: batches.append(list(ids)))
+
+    payload = [
+        {"items": [{"product_id": p1.id, "quantity": 2}, {"product_id": p2.id, "quantity": 1}]},
+        {"items": [{"product_id": p1.id, "quantity": 0}]},    # невалидно на уровне сериализатора
+        {"items": [{"product_id": p1.id, "quantity": 100}]},  # не хватает stock
+        {"items": [{"product_id": p2.id, "quantity": 4}]},
+    ]
+    r = api_client.post(reverse("orders-bulk-create"), payload, format="json")
+    assert r.status_code == 200, r.json()
+    body = r.json()
+    assert body["created"] == 2 and body["failed"] == 2
+
+    res = body["results"]
+    assert [x["status"] for x in res] == ["created", "error", "error", "created"]
+    assert res[0]["total_price"] == "1020.00"
+    assert "items" in res[1]["errors"]
+    assert res[2]["errors"]["details"][0]["product_id"] == p1.id
+
+    assert Order.objects.count() == 2
+    assert OrderItem.objects.count() == 3
+    # PDF ставятся одним вызовом relay, версии списков подняты один раз
+    assert batches == []
+    assert tasks.relay_outbox() == 2
+    assert batches == [[res[0]["id"], res[3]["id"]]]
+    assert cache.get("orders:user:list:version") == 2
+
+    p1.refresh_from_db(); p2.refresh_from_db()
+    assert p1.stock == 8
+    assert p2.stock == 45
+
+
+@pytest.mark.django_db
+def test_bulk_create_rejects_non_list(api_client):
+    r = api_client.post(reverse("orders-bulk-create"), {"items": []}, format="json")
+    assert r.status_code == 400
+
+
+@pytest.mark.django_db
+def test_admin_bulk_status_transitions_setwise(admin_client, api_client, products, monkeypatch):
+    p1, _ = products
+
+    import apps.orders.tasks as tasks
+    notified = []
+    monkeypatch.setattr(tasks, "enqueue_receipts", lambda ids: None)
+    monkeypatch.setattr(tasks, "enqueue_shipped_notifications", lambda ids: notified.append(list(ids)))
+
+    r = api_client.post(reverse("orders-bulk-create"), [{"items": [{"product_id": p1.id, "quantity": 1}]}] * 3, format="json")
+    a, b, c = [x["id"] for x in r.json()["results"]]
+    Order.objects.filter(pk__in=[a, b]).update(status=Order.STATUS_PROCESSING)
+
+    # деталь в кэше — должна быть сброшена
+    detail = api_client.get(reverse("orders-detail", kwargs={"pk": a}))
+    assert detail.json()["status"] == "processing"
+
+    url = reverse("admin-orders-bulk-status")
+    resp = admin_client.post(url, {"ids": [a, b, c, 999999], "status": "shipped"}, format="json")
+    assert resp.status_code == 200, resp.json()
+    body = resp.json()
+    assert sorted(body["updated"]) == sorted([a, b])
+    assert {(s["id"], s["reason"]) for s in body["skipped"]} == {(c, "invalid_transition"), (999999, "not_found")}
+    tasks.relay_outbox()
+    assert notified == [body["updated"]]
+
+    assert set(Order.objects.filter(status="shipped").values_list("id", flat=True)) == {a, b}
+    after = api_client.get(reverse("orders-detail", kwargs={"pk": a}))
+    assert after["X-Cache"] == "MISS"
+    assert after.json()["status"] == "shipped"
+
+    assert api_client.post(url, {"ids": [a], "status": "delivered"}, format="json").status_code == 403
+
+
+@pytest.mark.django_db
+def test_outbox_survives_broker_outage(api_client, products, monkeypatch):
+    p1, _ = products
+
+    import apps.orders.tasks as tasks
+    from apps.orders.models import OutboxEvent
+
+    def broker_down(ids):
+        raise ConnectionError("broker unavailable")
+
+    monkeypatch.setattr(tasks, "enqueue_receipts", broker_down)
+    r = api_client.post(reverse("orders-bulk-create"), [{"items": [{"product_id": p1.id, "quantity": 1}]}] * 2, format="json")
+    assert r.json()["created"] == 2
+
+    with pytest.raises(ConnectionError):
+        tasks.relay_outbox()
+    assert OutboxEvent.objects.count() == 2  # события не потеряны
+
+    published = []
+    monkeypatch.setattr(tasks, "enqueue_receipts", lambda ids: published.append(list(ids)))
+    assert tasks.relay_outbox() == 2
+    assert published == [[x["id"] for x in r.json()["results"]]]
+    assert not OutboxEvent.objects.exists()
@@ -0,0 +1,137 @@
+import pytest
+from django.db import connection
+from django.db.models import Prefetch
+from django.urls import reverse
+
+from apps.orders import receipts, tasks
+from apps.orders.models import Order, OrderItem, ReceiptJob
+
+
+def _stored(tmp_path):
+    return sorted(p.name for p in (tmp_path / "order_receipts").rglob("*.pdf"))
+
+
+@pytest.mark.django_db
+def test_batch_mode_renders_pending_receipts(api_client, products, settings, tmp_path, monkeypatch):
+    p1, p2 = products
+    sent = []
+    monkeypatch.setattr(tasks, "send_order_created_email", lambda order_id, user_id, receipt: sent.append(order_id))
+    settings.ORDERS_RECEIPTS_MODE = "batch"
+    settings.MEDIA_ROOT = str(tmp_path)
+
+    url = reverse("orders-list")
+    ids = [
+        api_client.post(url, {"items": [{"product_id": p1.id, "quantity": 1}, {"product_id": p2.id, "quantity": 2}]}, format="json").json()["id"],
+        api_client.post(url, {"items": [{"product_id": p2.id, "quantity": 1}]}, format="json").json()["id"],
+    ]
+    assert tasks.relay_outbox() == 2
+    assert sorted(ReceiptJob.objects.filter(status="pending").values_list("order_id", flat=True)) == sorted(ids)
+
+    assert tasks.render_pending_receipts(batch_size=10) == 2
+    assert set(ReceiptJob.objects.values_list("status", "attempts")) == {("done", 1)}
+    # письмо о заказе — по каждой готовой квитанции, как в режиме task
+    assert sorted(sent) == sorted(ids)
+    for order in Order.objects.prefetch_related("items__product").filter(pk__in=ids):
+        digest = receipts.content_hash(receipts.receipt_payload(order))
+        pdf = (tmp_path / "order_receipts" / receipts.receipt_relpath(digest)).read_bytes()
+        assert pdf.startswith(b"%PDF") and f"Order #{order.id}".encode() in pdf
+
+    # повторный запуск — заданий нет
+    assert tasks.render_pending_receipts() == 0
+
+
+def test_render_many_in_process_pool(settings):
+    settings.ORDERS_RECEIPTS_WORKERS = 2
+    payloads = [
+        {"id": i, "user_id": 1, "status": "pending", "total_price": "10.00", "items": [("Mouse", 1, "10.00", "10.00")]}
+        for i in range(1, 5)
+    ]
+    results = receipts.render_many(payloads)
+    assert [error for _, error in results] == [None] * 4
+    assert [f"Order #{i}".encode() in pdf for i, (pdf, _) in zip(range(1, 5), results)] == [True] * 4
+    assert results[0][0] == receipts.render_receipt_pdf(payloads[0])
+
+
+@pytest.mark.django_db
+def test_receipt_rendered_lazily_and_rerendered_on_change(api_client, admin_client, other_client, products, settings, tmp_path):
+    p1, _ = products
+    settings.MEDIA_ROOT = str(tmp_path)
+    order_id = api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json").json()["id"]
+    assert not (tmp_path / "order_receipts").exists()  # lazy: при создании ничего не рендерится
+
+    url = reverse("orders-receipt", kwargs={"pk": order_id})
+    r = api_client.get(url)
+    assert r.status_code == 200 and r["Content-Type"] == "application/pdf"
+    assert b"Status: pending" in b"".join(r.streaming_content)
+    [first] = _stored(tmp_path)
+    assert r["ETag"] == f'"{first[:-4]}"'
+
+    # тот же хэш — 304, повторного рендера нет
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=r["ETag"]).status_code == 304
+    api_client.get(url)
+    assert _stored(tmp_path) == [first]
+
+    # смена состояния — новый хэш и новый файл в шардированном каталоге
+    admin_client.patch(reverse("orders-detail", kwargs={"pk": order_id}), {"status": "processing"}, format="json")
+    r2 = api_client.get(url, HTTP_IF_NONE_MATCH=r["ETag"])
+    assert r2.status_code == 200 and r2["ETag"] != r["ETag"]
+    assert len(_stored(tmp_path)) == 2
+    digest = r2["ETag"].strip('"')
+    assert (tmp_path / "order_receipts" / digest[:2] / digest[2:4] / f"{digest}.pdf").exists()
+
+    # отдача веб-сервером
+    settings.ORDERS_RECEIPTS_SENDFILE = "x-accel-redirect"
+    r3 = api_client.get(url)
+    assert r3["X-Accel-Redirect"] == f"/protected/order_receipts/{digest[:2]}/{digest[2:4]}/{digest}.pdf"
+    assert r3.content == b""
+
+    assert other_client.get(url).status_code == 403
+
+
+@pytest.mark.django_db
+def test_receipt_hash_does_not_depend_on_row_order(api_client, products):
+    p1, p2 = products
+    body = {"items": [{"product_id": p1.id, "quantity": 1}, {"product_id": p2.id, "quantity": 2}]}
+    order_id = api_client.post(reverse("orders-list"), body, format="json").json()["id"]
+
+    digests = {
+        receipts.content_hash(receipts.receipt_payload(
+            Order.objects.prefetch_related(Prefetch("items", OrderItem.objects.select_related("product").order_by(ordering)))
+            .get(pk=order_id)
+        ))
+        for ordering in ("id", "-id")
+    }
+    assert len(digests) == 1
+
+
+def test_batch_render_runs_outside_claim_transaction_and_skips_missing_orders(
+    api_client, products, settings, tmp_path, monkeypatch, transactional_db,
+):
+    p1, _ = products
+    settings.ORDERS_RECEIPTS_MODE = "batch"
+    settings.MEDIA_ROOT = str(tmp_path)
+    url = reverse("orders-list")
+    kept, gone = [
+        api_client.post(url, {"items": [{"product_id": p1.id, "quantity": 1}]}, format="json").json()["id"]
+        for _ in range(2)
+    ]
+    tasks.relay_outbox()
+
+    # заказ архивирован/удалён между захватом задания и чтением заказов
+    phase = tasks.metrics.phase
+
+    def racing_phase(name):
+        if name == "fetch":
+            Order.objects.filter(pk=gone).delete()
+        return phase(name)
+    monkeypatch.setattr(tasks.metrics, "phase", racing_phase)
+
+    render_many = receipts.render_many
+
+    def render_outside_transaction(payloads):
+        assert not connection.in_atomic_block
+        return render_many(payloads)
+    monkeypatch.setattr(receipts, "render_many", render_outside_transaction)
+
+    assert tasks.render_pending_receipts(batch_size=10) == 1
+    assert list(ReceiptJob.objects.values_list("order_id", "status")) == [(kept, "done")]
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.common import db_router
+from apps.orders import rollups
+from apps.orders.models import SalesRollup
+
+
+def _rows(dimension):
+    return {
+        (r.period, r.ref_id): (r.orders_count, r.units, str(r.revenue))
+        for r in SalesRollup.objects.filter(dimension=dimension)
+    }
+
+
+@pytest.mark.django_db
+def test_rollups_follow_create_and_cancel_and_rebuild(api_client, products, category):
+    p1, p2 = products
+    url = reverse("orders-list")
+    first = api_client.post(url, {"items": [{"product_id": p1.id, "quantity": 2}, {"product_id": p2.id, "quantity": 1}]}, format="json")
+    second = api_client.post(url, {"items": [{"product_id": p2.id, "quantity": 3}]}, format="json")
+    assert first.status_code == second.status_code == 201
+
+    totals = _rows(SalesRollup.DIMENSION_TOTAL)
+    assert totals[("day", 0)] == (2, 6, "1080.00")
+    assert totals[("hour", 0)] == (2, 6, "1080.00")
+    assert _rows(SalesRollup.DIMENSION_PRODUCT)[("day", p2.id)] == (2, 4, "80.00")
+    assert _rows(SalesRollup.DIMENSION_CATEGORY)[("day", category.id)] == (2, 6, "1080.00")
+
+    # отмена вычитает заказ
+    cancel = api_client.patch(reverse("orders-detail", kwargs={"pk": second.json()["id"]}), {"status": "cancelled"}, format="json")
+    assert cancel.status_code == 200
+    assert _rows(SalesRollup.DIMENSION_TOTAL)[("day", 0)] == (1, 3, "1020.00")
+    assert _rows(SalesRollup.DIMENSION_PRODUCT)[("day", p2.id)] == (1, 1, "20.00")
+
+    # reconciliation даёт те же агрегаты
+    incremental = {d: _rows(d) for d, _ in SalesRollup.DIMENSION_CHOICES}
+    SalesRollup.objects.update(orders_count=0, units=0, revenue=0)
+    today = timezone.now().date()
+    assert rollups.rebuild(today, today) == 1
+    rebuilt = {d: _rows(d) for d, _ in SalesRollup.DIMENSION_CHOICES}
+    assert {d: {k: v for k, v in rows.items() if v[0]} for d, rows in incremental.items()} == rebuilt
+
+
+@pytest.mark.django_db
+def test_sales_report_reads_rollups(admin_client, api_client, products):
+    p1, _ = products
+    api_client.post(reverse("orders-list"), {"items": [{"product_id": p1.id, "quantity": 2}]}, format="json")
+
+    url = reverse("admin-reports-sales")
+    r = admin_client.get(url)
+    assert r.status_code == 200
+    [row] = r.json()
+    assert row["orders_count"] == 1
+    assert row["revenue"] == "1000.00"
+    assert row["bucket"].endswith("00:00:00")
+
+    by_product = admin_client.get(url, {"period": "hour", "group_by": "product"}).json()
+    assert [(x["ref_id"], x["units"]) for x in by_product] == [(p1.id, 2)]
+
+    assert admin_client.get(url, {"group_by": "user"}).status_code == 400
+    assert api_client.get(url).status_code == 403
+
+
+def test_rebuild_scans_primary_inside_bucket_transaction(settings, transactional_db, monkeypatch):
+    settings.DATABASE_REPLICAS = ["default"]
+    scans = []
+    original = rollups._scan
+
+    def spy(*args):
+        scans.append((db_router._replica_reads.get(), connection.in_atomic_block))
+        return original(*args)
+    monkeypatch.setattr(rollups, "_scan", spy)
+
+    today = timezone.now().date()
+    rollups.rebuild(today - timedelta(days=30), today - timedelta(days=1))
+    rollups.rebuild(today, today)
+    # и давние дни: отмена пишет дельту в бакет дня создания заказа
+    assert scans == [(False, True), (False, True)]
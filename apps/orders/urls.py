@@ -2,14 +2,28 @@ from django.urls import path
 from .views import (
     OrderListCreateView,
     OrderDetailView,
+    OrderReceiptView,
+    BulkOrderCreateView,
+    OrderIntentView,
     AdminOrderListView,
+    AdminOrderExportView,
+    AdminOrderBulkStatusView,
+    AdminSalesReportView,
 )
 
 urlpatterns = [
     # заказы пользователя
     path("orders/", OrderListCreateView.as_view(), name="orders-list"),
     path("orders/<int:pk>/", OrderDetailView.as_view(), name="orders-detail"),
+    path("orders/<int:pk>/receipt/", OrderReceiptView.as_view(), name="orders-receipt"),
+    path("orders/bulk/", BulkOrderCreateView.as_view(), name="orders-bulk-create"),
+    path("orders/intents/<int:pk>/", OrderIntentView.as_view(), name="orders-intent-detail"),
 
     # админский список заказов
     path("admin/orders/", AdminOrderListView.as_view(), name="admin-orders-list"),
+    path("admin/orders/export/", AdminOrderExportView.as_view(), name="admin-orders-export"),
+    path("admin/orders/status/", AdminOrderBulkStatusView.as_view(), name="admin-orders-bulk-status"),
+
+    # отчёты (только агрегаты SalesRollup)
+    path("admin/reports/sales/", AdminSalesReportView.as_view(), name="admin-reports-sales"),
 ]
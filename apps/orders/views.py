@@ -1,42 +1,88 @@
-import hashlib
-import random
-from urllib.parse import urlencode
+from datetime import datetime, time, timedelta
 
-from django.core.cache import cache
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, permissions, filters, status
 from rest_framework.response import Response
-
-from apps.orders.models import Order
+from rest_framework.settings import api_settings
+
+from apps.common import timing
+from apps.common.caching import VersionedCacheMixin, hash_params, store
+from apps.common.db_router import replica_alias, replica_reads
+from apps.orders import receipts
+from apps.orders.archive import get_archived_order
+from apps.orders.export import iter_order_chunks, stream_csv, stream_jsonl
+from apps.orders.models import Order, OrderIntent, OrderItem, SalesRollup
+from apps.orders.pagination import AdminOrderPagination
 from apps.orders.serializers import (
+    ArchivedOrderDetailSerializer,
+    OrderBulkStatusSerializer,
     OrderCreateSerializer,
-    OrderListSerializer,
     OrderDetailSerializer,
+    OrderIntentSerializer,
     OrderStatusPatchSerializer,
-    PlainBadRequest
+    PlainBadRequest,
+    order_list_projection,
 )
+from apps.orders.services import place_orders, transition_orders
+from apps.users.services import missing_user_as_401
 
 
-# ---------- cache utils ----------
-
-def _ttl_with_jitter(base: int = 60, jitter: float = 0.10) -> int:
-    delta = int(base * jitter)
-    return base + random.randint(-delta, delta)
-
+# кэш заказов живёт 60с ±10% (VersionedCacheMixin.cache_ttl)
+ORDERS_CACHE_TTL = 60
 
-def _hash_params(params: dict) -> str:
-    encoded = urlencode(sorted(params.items()), doseq=True)
-    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
 
+def _day_start(value: str):
+    """YYYY-MM-DD → aware-datetime начала дня в текущей TZ (None для некорректной даты)."""
+    try:
+        day = parse_date(value)
+    except ValueError:
+        return None
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
 
-def _orders_user_list_version() -> int:
-    v = cache.get("orders:user:list:version")
-    return v if isinstance(v, int) and v > 0 else 1
 
-
-def _orders_admin_list_version() -> int:
-    v = cache.get("orders:admin:list:version")
-    return v if isinstance(v, int) and v > 0 else 1
+def _filter_admin_orders(qs, query_params):
+    """
+    Фильтры админских выборок заказов: ?status=&user=&date_from=&date_to=.
+    Даты — полуинтервал по timestamp [date_from 00:00, date_to+1 00:00), без приведения
+    created_at к дате: так работают индексы (status|user, -created_at).
+    Некорректные даты игнорируем (как price_min/price_max в каталоге).
+    """
+    status_val = query_params.get("status")
+    user_id = query_params.get("user")
+    date_from = _day_start(query_params.get("date_from") or "")
+    date_to = _day_start(query_params.get("date_to") or "")
+
+    if status_val:
+        qs = qs.filter(status=status_val)
+    if user_id:
+        qs = qs.filter(user_id=user_id)
+    if date_from:
+        qs = qs.filter(created_at__gte=date_from)
+    if date_to:
+        qs = qs.filter(created_at__lt=date_to + timedelta(days=1))
+    return qs
+
+
+def _order_detail_queryset():
+    """
+    Заказ для OrderDetailSerializer: позиции одним prefetch-запросом с продуктом (product_name)
+    — число запросов не зависит от количества позиций.
+    """
+    items_qs = (
+        OrderItem.objects
+        .select_related("product")
+        .only("id", "order_id", "product_id", "product__name", "quantity", "price_at_purchase", "created_at")
+        .order_by("id")
+    )
+    return Order.objects.prefetch_related(Prefetch("items", queryset=items_qs))
 
 
 # ---------- permissions ----------
@@ -46,168 +92,408 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         return request.user.is_staff or obj.user_id == request.user.id
 
 
+def _async_intake_requested(request) -> bool:
+    """Асинхронный приём: ?async=true или глобально ORDERS_ASYNC_INTAKE."""
+    flag = str(request.query_params.get("async", "")).lower()
+    if flag:
+        return flag in ("1", "true", "yes")
+    return getattr(settings, "ORDERS_ASYNC_INTAKE", False)
+
+
 # ---------- user endpoints ----------
 
-class OrderListCreateView(generics.GenericAPIView):
+class OrderListCreateView(VersionedCacheMixin, generics.GenericAPIView):
     """
-    GET /api/v1/orders/         — список заказов текущего пользователя (кэш 60с)
+    GET /api/v1/orders/         — список заказов текущего пользователя (кэш 60с, версия списков в значении)
     POST /api/v1/orders/        — создание заказа (см. OrderCreateSerializer)
+    POST /api/v1/orders/?async=true — асинхронный приём: 202 + status_url заявки (OrderIntent)
     """
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["created_at", "total_price", "status"]
     ordering = ["-created_at"]
+    cache_version_key = "orders:user:list:version"
+    cache_ttl = ORDERS_CACHE_TTL
 
     def get_queryset(self):
         return (
-            Order.objects.filter(user=self.request.user)
+            # user_id, а не user: request.user может быть TokenUser (JWT без запроса к БД)
+            Order.objects.filter(user_id=self.request.user.id)
             .only("id", "status", "total_price", "created_at", "updated_at", "user_id")
             .order_by(*self.ordering)
         )
 
-    def get(self, request, *args, **kwargs):
-        """кэш ключ с версией + user + ordering/pagination"""
-        params = {
-            "ordering": ",".join(request.query_params.getlist("ordering")) or "-created_at",
-            "page": request.query_params.get("page", ""),
-            "page_size": request.query_params.get("page_size", ""),
+    def get_cache_params(self) -> dict:
+        return {
+            "ordering": ",".join(self.request.query_params.getlist("ordering")) or "-created_at",
+            "page": self.request.query_params.get("page", ""),
+            "page_size": self.request.query_params.get("page_size", ""),
         }
-        version = _orders_user_list_version()
-        cache_key = f"orders:list:user:{request.user.id}:v{version}:{_hash_params(params)}"
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            resp = Response(cached)
-            resp["X-Cache"] = "HIT"
-            return resp
-
-        qs = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(qs)
-        if page is not None:
-            data = OrderListSerializer(page, many=True).data
-            cache.set(cache_key, data, timeout=_ttl_with_jitter())
-            resp = self.get_paginated_response(data)
-            resp["X-Cache"] = "MISS"
-            return resp
+    def get_cache_key(self) -> str:
+        """ключ: user + ordering/pagination (версия — в значении)"""
+        return f"orders:list:user:{self.request.user.id}:{hash_params(self.get_cache_params())}"
 
-        data = OrderListSerializer(qs, many=True).data
-        cache.set(cache_key, data, timeout=_ttl_with_jitter())
-        resp = Response(data)
-        resp["X-Cache"] = "MISS"
-        return resp
+    def get(self, request, *args, **kwargs):
+        return self.cached_response(self._build_list)
+
+    def _build_list(self):
+        # values_list-проекция вместо OrderListSerializer(many=True): тот же JSON, items_count без N+1
+        qs = order_list_projection.queryset(self.filter_queryset(self.get_queryset()))
+        # реплика — если заказы пользователя недавно не менялись (signals.bump_order_lists → pin_primary)
+        with replica_reads("orders:users", f"user:{self.request.user.id}"):
+            page = self.paginate_queryset(qs)
+            with timing.phase("serialize"):
+                if page is not None:
+                    # кэшируем ответ целиком (вместе с count/next/previous), как и админский список
+                    return self.get_paginated_response(order_list_projection.rows(page)).data
+                return order_list_projection.rows(qs)
 
     def post(self, request, *args, **kwargs):
         ser = OrderCreateSerializer(data=request.data, context={"request": request})
         ser.is_valid(raise_exception=True)
+        if _async_intake_requested(request):
+            return self._accept_intent(request, ser.validated_data)
         try:
             order = ser.save()
         except PlainBadRequest as e:
             return Response(e.payload, status=status.HTTP_400_BAD_REQUEST)
-        # деталь в ответе
-        data = OrderDetailSerializer(order).data
-        # инвалидация списка пользователя (версия поднимет сигнал — см. orders/signals.py)
+        # деталь в ответе (перечитываем с prefetch позиций — без N+1 по product.name)
+        with timing.phase("serialize"):
+            data = OrderDetailSerializer(_order_detail_queryset().get(pk=order.pk)).data
+        # инвалидация списка пользователя (версию поднимает services.place_orders)
         return Response(data, status=status.HTTP_201_CREATED)
 
+    def _accept_intent(self, request, validated_data):
+        """Сохраняем заявку и сразу отвечаем 202; заказ создаст tasks.process_order_intents."""
+        with missing_user_as_401(request.user.id):
+            intent = OrderIntent.objects.create(user_id=request.user.id, items=validated_data["items"])
+        status_url = request.build_absolute_uri(reverse("orders-intent-detail", kwargs={"pk": intent.pk}))
+        resp = Response(
+            {"intent_id": intent.pk, "status": intent.status, "status_url": status_url},
+            status=status.HTTP_202_ACCEPTED,
+        )
+        resp["Location"] = status_url
+        return resp
+
 
-class OrderDetailView(generics.GenericAPIView):
+class BulkOrderCreateView(generics.GenericAPIView):
+    """
+    POST /api/v1/orders/bulk/ — пакетное создание заказов (B2B).
+    Тело: [{"items": [{product_id, quantity}, ...]}, ...] (не больше ORDERS_BULK_MAX_ORDERS).
+    Все заказы пакета создаются одной транзакцией (services.place_orders); ответ — по заказу
+    на каждый элемент в исходном порядке: created (id, total_price) или error (errors).
+    События order.created пишутся в outbox той же транзакцией, версии списков поднимаются один раз.
     """
-    GET    /api/v1/orders/{id}/    — детальная информация (владелец/админ, кэш 60с)
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        payload = request.data
+        max_orders = getattr(settings, "ORDERS_BULK_MAX_ORDERS", 500)
+        if not isinstance(payload, list) or not payload:
+            return Response({"detail": "Ожидается непустой массив заказов"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payload) > max_orders:
+            return Response(
+                {"detail": f"Не больше {max_orders} заказов за запрос"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # валидация всех элементов; невалидные сразу попадают в ответ как error
+        results = [None] * len(payload)
+        entries, positions = [], []
+        for idx, raw in enumerate(payload):
+            ser = OrderCreateSerializer(data=raw, context={"request": request})
+            if not ser.is_valid():
+                results[idx] = {"index": idx, "status": "error", "errors": ser.errors}
+                continue
+            entries.append({"user_id": request.user.id, "items": ser.validated_data["items"]})
+            positions.append(idx)
+
+        created_ids = []
+        if entries:
+            with missing_user_as_401(request.user.id):
+                placed = place_orders(entries)
+            for idx, (order, error) in zip(positions, placed):
+                if error:
+                    results[idx] = {"index": idx, "status": "error", "errors": error}
+                else:
+                    results[idx] = {
+                        "index": idx,
+                        "status": "created",
+                        "id": order.id,
+                        "total_price": f"{order.total_price:.2f}",
+                    }
+                    created_ids.append(order.id)
+
+        return Response(
+            {"created": len(created_ids), "failed": len(payload) - len(created_ids), "results": results},
+            status=status.HTTP_200_OK,
+        )
+
+
+class OrderIntentView(generics.GenericAPIView):
+    """
+    GET /api/v1/orders/intents/{id}/ — статус асинхронной заявки (владелец/админ).
+    status: pending → done (order = id заказа) | failed (error — как у 400 синхронного POST).
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+
+    def get(self, request, *args, **kwargs):
+        intent = get_object_or_404(OrderIntent, pk=kwargs["pk"])
+        self.check_object_permissions(request, intent)
+        return Response(OrderIntentSerializer(intent).data)
+
+
+class OrderDetailView(VersionedCacheMixin, generics.GenericAPIView):
+    """
+    GET    /api/v1/orders/{id}/    — детальная информация (владелец/админ, кэш 60с);
+                                     заказа нет в горячей таблице — ищем в архиве
     PATCH  /api/v1/orders/{id}/    — обновление статуса (владелец ограниченно/админ)
     """
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+    cache_ttl = ORDERS_CACHE_TTL
+
+    def get_cache_key(self) -> str:
+        return f"order:{self.kwargs['pk']}"
+
+    def check_cached(self, data) -> None:
+        # права владельца проверяем и на HIT — по user из закэшированной детали
+        if not (self.request.user.is_staff or data.get("user") == self.request.user.id):
+            self.permission_denied(self.request)
 
     def get_object(self):
-        order = get_object_or_404(Order.objects.select_related("user"), pk=self.kwargs["pk"])
+        order = get_object_or_404(_order_detail_queryset(), pk=self.kwargs["pk"])
+        self.check_object_permissions(self.request, order)
+        return order
+
+    def get_archived_object(self):
+        """Fallback на архив (apps.orders.archive): старые id читаются прозрачно."""
+        order = get_archived_order(self.kwargs["pk"])
+        if order is None:
+            raise Http404
         self.check_object_permissions(self.request, order)
         return order
 
     def get(self, request, *args, **kwargs):
-        pk = kwargs["pk"]
-        cache_key = f"order:{pk}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            resp = Response(cached)
-            resp["X-Cache"] = "HIT"
-            return resp
+        return self.cached_response(self._build_detail)
 
-        obj = self.get_object()
-        data = OrderDetailSerializer(obj).data
-        cache.set(cache_key, data, timeout=_ttl_with_jitter())
-        resp = Response(data)
-        resp["X-Cache"] = "MISS"
-        return resp
+    def _build_detail(self):
+        try:
+            instance, serializer_class = self.get_object(), OrderDetailSerializer
+        except Http404:
+            instance, serializer_class = self.get_archived_object(), ArchivedOrderDetailSerializer
+        with timing.phase("serialize"):
+            return serializer_class(instance).data
 
     def patch(self, request, *args, **kwargs):
-        obj = self.get_object()
+        try:
+            obj = self.get_object()
+        except Http404:
+            # архивные заказы — только финальные статусы, переходов из них нет
+            archived = self.get_archived_object()
+            return Response(
+                {"status": [f"Невозможно изменить статус {archived.status}: заказ в архиве"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         ser = OrderStatusPatchSerializer(obj, data=request.data, partial=True)
         ser.is_valid(raise_exception=True)
         ser.save()
         # инвалидация детали (сигналы тоже почистят, но сразу ответим актуальными данными)
-        data = OrderDetailSerializer(obj).data
-        cache.set(f"order:{obj.pk}", data, timeout=_ttl_with_jitter())
+        with timing.phase("serialize"):
+            data = OrderDetailSerializer(obj).data
+        store(self.get_cache_key(), data, ttl=self.cache_ttl)
         return Response(data, status=status.HTTP_200_OK)
 
 
+class OrderReceiptView(generics.GenericAPIView):
+    """
+    GET /api/v1/orders/{id}/receipt/ — PDF-квитанция (владелец/админ, в т.ч. архивные заказы).
+    PDF рендерится при первом запросе и хранится по хэшу состояния заказа
+    (receipts.ensure_receipt): повторный GET рендера не делает, смена статуса — новый файл.
+    ETag — тот же хэш: If-None-Match отвечаем 304 без чтения файла.
+    Отдача по ORDERS_RECEIPTS_SENDFILE: X-Accel-Redirect (nginx) / X-Sendfile (Apache, lighttpd),
+    иначе FileResponse (wsgi.file_wrapper — sendfile у gunicorn/uwsgi).
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+
+    def get_object(self):
+        pk = self.kwargs["pk"]
+        order = Order.objects.prefetch_related("items__product").filter(pk=pk).first() or get_archived_order(pk)
+        if order is None:
+            raise Http404
+        self.check_object_permissions(self.request, order)
+        return order
+
+    def get(self, request, *args, **kwargs):
+        order = self.get_object()
+        payload = receipts.receipt_payload(order)
+        digest = receipts.content_hash(payload)
+        etag = f'"{digest}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            resp = HttpResponseNotModified()
+            resp["ETag"] = etag
+            return resp
+
+        path, _, _ = receipts.ensure_receipt(payload, digest)
+        mode = getattr(settings, "ORDERS_RECEIPTS_SENDFILE", "")
+        if mode == "x-accel-redirect":
+            resp = HttpResponse(content_type="application/pdf")
+            resp["X-Accel-Redirect"] = settings.ORDERS_RECEIPTS_ACCEL_PREFIX + receipts.receipt_relpath(digest)
+        elif mode == "x-sendfile":
+            resp = HttpResponse(content_type="application/pdf")
+            resp["X-Sendfile"] = str(path)
+        else:
+            resp = FileResponse(path.open("rb"), content_type="application/pdf")
+        resp["Content-Disposition"] = f'inline; filename="order_{order.pk}.pdf"'
+        resp["ETag"] = etag
+        resp["Cache-Control"] = "private, no-cache"
+        return resp
+
+
 # ---------- admin endpoints ----------
 
-class AdminOrderListView(generics.GenericAPIView):
+class AdminOrderListView(VersionedCacheMixin, generics.GenericAPIView):
     """
     GET /api/v1/admin/orders/
     Фильтры: ?status=...&user=<id>&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
-    Кэш: 60с, версия admin-листа.
+    Пагинация: ?page=&page_size= (AdminOrderPagination; count — оценка, см. ORDERS_ADMIN_COUNT_MODE).
+    Кэш: 60с, версия admin-листа (кэшируется страница целиком, вместе с count/next/previous).
     """
     permission_classes = [permissions.IsAdminUser]
     filter_backends = [filters.OrderingFilter]
+    pagination_class = AdminOrderPagination
     ordering_fields = ["created_at", "total_price", "status", "user_id"]
     ordering = ["-created_at"]
+    cache_prefix = "admin:orders:list"
+    cache_version_key = "orders:admin:list:version"
+    cache_ttl = ORDERS_CACHE_TTL
+
+    def _filter_params(self) -> dict:
+        return {
+            "status": self.request.query_params.get("status", ""),
+            "user": self.request.query_params.get("user", ""),
+            "date_from": self.request.query_params.get("date_from", ""),
+            "date_to": self.request.query_params.get("date_to", ""),
+        }
 
     def get_queryset(self):
         qs = Order.objects.all().order_by(*self.ordering)
-        status_val = self.request.query_params.get("status")
-        user_id = self.request.query_params.get("user")
-        date_from = self.request.query_params.get("date_from")
-        date_to = self.request.query_params.get("date_to")
-
-        if status_val:
-            qs = qs.filter(status=status_val)
-        if user_id:
-            qs = qs.filter(user_id=user_id)
-        if date_from:
-            qs = qs.filter(created_at__date__gte=date_from)
-        if date_to:
-            qs = qs.filter(created_at__date__lte=date_to)
-        return qs
+        return _filter_admin_orders(qs, self.request.query_params)
+
+    def get_count_cache_key(self) -> str:
+        """Ключ кэша count для EstimatedCountPaginator: только фильтры (без страницы/сортировки)."""
+        return f"admin:orders:count:{hash_params(self._filter_params())}"
+
+    def get_cache_params(self) -> dict:
+        return {
+            **self._filter_params(),
+            "ordering": ",".join(self.request.query_params.getlist("ordering")) or "-created_at",
+            "page": self.request.query_params.get("page", ""),
+            "page_size": self.request.query_params.get("page_size", ""),
+        }
 
     def get(self, request, *args, **kwargs):
-        params = {
-            "status": request.query_params.get("status", ""),
-            "user": request.query_params.get("user", ""),
-            "date_from": request.query_params.get("date_from", ""),
-            "date_to": request.query_params.get("date_to", ""),
-            "ordering": ",".join(request.query_params.getlist("ordering")) or "-created_at",
-            "page": request.query_params.get("page", ""),
-            "page_size": request.query_params.get("page_size", ""),
-        }
-        version = _orders_admin_list_version()
-        cache_key = f"admin:orders:list:v{version}:{_hash_params(params)}"
+        return self.cached_response(self._build_list)
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            resp = Response(cached)
-            resp["X-Cache"] = "HIT"
-            return resp
+    def _build_list(self):
+        qs = order_list_projection.queryset(self.filter_queryset(self.get_queryset()))
+        # реплика — если заказы недавно не менялись (signals.bump_order_lists закрепляет "orders:admin")
+        with replica_reads("orders:admin"):
+            page = self.paginate_queryset(qs)
+            with timing.phase("serialize"):
+                if page is not None:
+                    return self.get_paginated_response(order_list_projection.rows(page)).data
+                return order_list_projection.rows(qs)
+
+
+class AdminOrderBulkStatusView(generics.GenericAPIView):
+    """
+    POST /api/v1/admin/orders/status/ — массовая смена статуса (склад).
+    Тело: {"ids": [...], "status": "shipped"}.
+    Переходы проверяются по множеству (Order.VALID_TRANSITIONS) и применяются одним условным
+    UPDATE на исходный статус (services.transition_orders); для shipped события уведомлений
+    пишутся в outbox той же транзакцией.
+    Ответ: {"updated": [ids], "skipped": [{id, reason, status}]}.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        ser = OrderBulkStatusSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        target = ser.validated_data["status"]
+        updated_ids, skipped = transition_orders(ser.validated_data["ids"], target)
+        return Response({"updated": updated_ids, "skipped": skipped}, status=status.HTTP_200_OK)
 
-        qs = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(qs)
-        if page is not None:
-            data = OrderListSerializer(page, many=True).data
-            cache.set(cache_key, data, timeout=_ttl_with_jitter())
-            resp = self.get_paginated_response(data)
-            resp["X-Cache"] = "MISS"
-            return resp
 
-        data = OrderListSerializer(qs, many=True).data
-        cache.set(cache_key, data, timeout=_ttl_with_jitter())
-        resp = Response(data)
-        resp["X-Cache"] = "MISS"
+class AdminOrderExportView(generics.GenericAPIView):
+    """
+    GET /api/v1/admin/orders/export/?fmt=csv|jsonl
+    Фильтры — как у AdminOrderListView (?status=&user=&date_from=&date_to=).
+    Потоковая выгрузка (StreamingHttpResponse): values_list + iterator(chunk_size), позиции —
+    одним запросом на пачку. Память постоянна, кэш не используется.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    formats = {
+        "csv": (stream_csv, "text/csv; charset=utf-8"),
+        "jsonl": (stream_jsonl, "application/x-ndjson; charset=utf-8"),
+    }
+
+    def get(self, request, *args, **kwargs):
+        fmt = (request.query_params.get("fmt") or "csv").lower()
+        if fmt not in self.formats:
+            return Response(
+                {"detail": f"Неизвестный формат: {fmt}. Доступны: {', '.join(self.formats)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        stream, content_type = self.formats[fmt]
+
+        # поток читается после выхода из вьюхи — реплика выбирается явно (using), а не replica_reads()
+        qs = _filter_admin_orders(Order.objects.using(replica_alias()).order_by("-created_at", "-id"), request.query_params)
+        chunk_size = getattr(settings, "ORDERS_EXPORT_CHUNK_SIZE", 2000)
+        resp = StreamingHttpResponse(stream(iter_order_chunks(qs, chunk_size)), content_type=content_type)
+        resp["Content-Disposition"] = f'attachment; filename="orders.{fmt}"'
         return resp
+
+
+class AdminSalesReportView(generics.GenericAPIView):
+    """
+    GET /api/v1/admin/reports/sales/
+    Параметры: ?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD (по умолчанию последние 30 дней, UTC)
+               &period=day|hour (day)  &group_by=total|product|category (total)
+    Читает только SalesRollup: стоимость O(бакетов), а не O(заказов).
+    Ответ: [{bucket, ref_id, orders_count, units, revenue}] — ref_id = product_id/category_id (0 для total).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        period = request.query_params.get("period", SalesRollup.PERIOD_DAY)
+        group_by = request.query_params.get("group_by", SalesRollup.DIMENSION_TOTAL)
+        if period not in dict(SalesRollup.PERIOD_CHOICES):
+            return Response({"period": [f"Недопустимое значение: {period}"]}, status=status.HTTP_400_BAD_REQUEST)
+        if group_by not in dict(SalesRollup.DIMENSION_CHOICES):
+            return Response({"group_by": [f"Недопустимое значение: {group_by}"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = timezone.now().date()
+        start = _day_start(request.query_params.get("date_from") or "") or _day_start(
+            (today - timedelta(days=29)).isoformat()
+        )
+        end = _day_start(request.query_params.get("date_to") or "") or _day_start(today.isoformat())
+
+        rows = (
+            SalesRollup.objects
+            .filter(period=period, dimension=group_by, bucket__gte=start, bucket__lt=end + timedelta(days=1))
+            .order_by("bucket", "ref_id")
+            .values_list("bucket", "ref_id", "orders_count", "units", "revenue")
+        )
+        with replica_reads():
+            data = [
+                {
+                    "bucket": timezone.localtime(bucket).strftime(api_settings.DATETIME_FORMAT),
+                    "ref_id": ref_id,
+                    "orders_count": orders_count,
+                    "units": units,
+                    "revenue": f"{revenue:.2f}",
+                }
+                for bucket, ref_id, orders_count, units, revenue in rows
+            ]
+        return Response(data)
@@ -0,0 +1,16 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser as ClaimsTokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+class TokenUser(ClaimsTokenUser):
+    """
+    request.user для JWTStatelessUserAuthentication (SIMPLE_JWT.TOKEN_USER_CLASS): строится
+    из claims access-токена без запроса к БД — id и is_staff (см. serializers.TokenObtainPairSerializer).
+    id приводится к int, как у User.pk: сравнения с user_id заказов и ключи кэша — те же.
+    Полная модель, если нужна, — apps.users.services.get_request_user (кэш).
+    """
+
+    @cached_property
+    def id(self) -> int:
+        return int(self.token[api_settings.USER_ID_CLAIM])
@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError
+from rest_framework.exceptions import AuthenticationFailed
+
+from apps.common.caching import ttl_with_jitter
+from apps.users.authentication import TokenUser
+
+# полная модель пользователя в кэше: 5 минут ±10% (сбрасывается сигналами users.signals)
+USER_CACHE_TTL = 300
+
+
+def user_cache_key(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """User по id через кэш (None — нет такого пользователя); промах — один запрос к БД."""
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, timeout=ttl_with_jitter(USER_CACHE_TTL))
+    return user
+
+
+def get_request_user(request):
+    """
+    Полная модель User для вьюх, которым мало claims токена (email, группы, права):
+    TokenUser → get_cached_user, иначе request.user как есть (сессия, Basic, force_authenticate).
+    """
+    user = request.user
+    if isinstance(user, TokenUser):
+        return get_cached_user(user.id)
+    return user
+
+
+@contextmanager
+def missing_user_as_401(user_id):
+    """
+    Запись с FK на пользователя из stateless JWT: токен переживает удаление пользователя,
+    и INSERT падает IntegrityError (на SQLite — при коммите). Такой запрос — 401
+    user_not_found, как у JWTAuthentication, а не 500; прочие нарушения — как есть.
+    """
+    try:
+        yield
+    except IntegrityError:
+        if get_user_model().objects.filter(pk=user_id).exists():
+            raise
+        raise AuthenticationFailed("Пользователь не найден.", code="user_not_found")
@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.services import user_cache_key
+
+
+# ---- User: инвалидация кэша модели (services.get_cached_user) ----
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid="user_saved_cache_invalidation")
+def user_saved(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
+
+
+@receiver(post_delete, sender=get_user_model(), dispatch_uid="user_deleted_cache_invalidation")
+def user_deleted(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
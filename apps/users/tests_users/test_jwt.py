@@ -0,0 +1,139 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.catalog.models import Category, Product
+from apps.orders.models import Order
+from apps.users.authentication import TokenUser
+from apps.users.services import get_cached_user, get_request_user
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _tokens(username: str, password: str = "pass") -> dict:
+    response = APIClient().post(reverse("token-obtain"), {"username": username, "password": password}, format="json")
+    assert response.status_code == 200
+    return response.json()
+
+
+def _bearer(access: str) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+@pytest.fixture
+def buyer(db):
+    user = User.objects.create_user("buyer", password="pass")
+    category = Category.objects.create(name="Tools", slug="tools")
+    product = Product.objects.create(name="Saw", price=15, stock=10, category=category)
+    Order.objects.create(user=user, total_price=0)
+    return user, product
+
+
+def test_access_token_carries_id_and_is_staff_claims(db):
+    admin = User.objects.create_user("boss", password="pass", is_staff=True)
+    access = AccessToken(_tokens("boss")["access"])
+    user = TokenUser(access)
+    assert (user.id, user.pk, user.is_staff) == (admin.pk, admin.pk, True)
+
+
+def test_order_list_hit_with_jwt_does_not_touch_db(buyer, django_assert_num_queries):
+    user, product = buyer
+    client = _bearer(_tokens("buyer")["access"])
+
+    first = client.get(reverse("orders-list"))
+    assert first["X-Cache"] == "MISS"
+    with django_assert_num_queries(0):
+        again = client.get(reverse("orders-list"))
+    assert again["X-Cache"] == "HIT"
+    assert again.content == first.content
+
+    created = client.post(reverse("orders-list"), {"items": [{"product_id": product.id, "quantity": 1}]}, format="json")
+    assert created.status_code == 201
+    assert Order.objects.get(pk=created.json()["id"]).user_id == user.pk
+
+
+def test_order_detail_hit_checks_owner_from_claims(buyer, django_assert_num_queries):
+    user, _ = buyer
+    order = Order.objects.get(user=user)
+    User.objects.create_user("stranger", password="pass")
+    url = reverse("orders-detail", kwargs={"pk": order.pk})
+
+    owner = _bearer(_tokens("buyer")["access"])
+    stranger = _bearer(_tokens("stranger")["access"])
+    assert owner.get(url)["X-Cache"] == "MISS"
+    with django_assert_num_queries(0):
+        assert owner.get(url)["X-Cache"] == "HIT"
+        assert stranger.get(url).status_code == 403
+
+
+def test_admin_endpoints_use_is_staff_claim_and_refresh_updates_it(db):
+    admin = User.objects.create_user("boss", password="pass", is_staff=True)
+    tokens = _tokens("boss")
+    assert _bearer(tokens["access"]).get(reverse("admin-orders-list")).status_code == 200
+
+    admin.is_staff = False
+    admin.save()
+    refreshed = APIClient().post(reverse("token-refresh"), {"refresh": tokens["refresh"]}, format="json").json()
+    assert AccessToken(refreshed["access"])["is_staff"] is False
+    assert _bearer(refreshed["access"]).get(reverse("admin-orders-list")).status_code == 403
+
+
+def test_invalid_token_is_rejected_with_bearer_challenge(db):
+    response = _bearer("not-a-token").get(reverse("orders-list"))
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"].startswith("Bearer")
+
+
+def test_request_user_lookup_is_cached_and_invalidated(buyer, rf, django_assert_num_queries):
+    user, _ = buyer
+    request = rf.get("/")
+    request.user = TokenUser(AccessToken(_tokens("buyer")["access"]))
+
+    assert get_request_user(request) == user
+    with django_assert_num_queries(0):
+        assert get_request_user(request).username == "buyer"
+
+    user.email = "buyer@example.com"
+    user.save()
+    assert get_cached_user(user.pk).email == "buyer@example.com"
+
+    request.user = user
+    assert get_request_user(request) is user
+
+
+def test_refresh_reads_is_staff_from_db_not_user_cache(db):
+    admin = User.objects.create_user("boss", password="pass", is_staff=True)
+    tokens = _tokens("boss")
+    assert get_cached_user(admin.pk).is_staff  # модель в кэше
+    User.objects.filter(pk=admin.pk).update(is_staff=False)  # без сигнала: кэш не сброшен
+
+    refreshed = APIClient().post(reverse("token-refresh"), {"refresh": tokens["refresh"]}, format="json")
+    assert refreshed.status_code == 200
+    assert AccessToken(refreshed.json()["access"])["is_staff"] is False
+
+
+def test_deleted_user_token_gets_401(transactional_db, buyer):
+    _, product = buyer
+    gone = User.objects.create_user("gone", password="pass")
+    tokens = _tokens("gone")
+    gone.delete()
+
+    body = {"items": [{"product_id": product.id, "quantity": 1}]}
+    for url, data in ((reverse("orders-list"), body), (reverse("orders-bulk-create"), [body])):
+        response = _bearer(tokens["access"]).post(url, data, format="json")
+        assert response.status_code == 401
+        assert response.json() == {"detail": "Пользователь не найден."}
+    refreshed = APIClient().post(reverse("token-refresh"), {"refresh": tokens["refresh"]}, format="json")
+    assert refreshed.status_code == 401
@@ -0,0 +1,11 @@
+from django.urls import path
+from rest_framework_simplejwt.views import TokenVerifyView
+
+from .views import TokenObtainPairView, TokenRefreshView
+
+urlpatterns = [
+    # JWT
+    path("auth/token/", TokenObtainPairView.as_view(), name="token-obtain"),
+    path("auth/token/refresh/", TokenRefreshView.as_view(), name="token-refresh"),
+    path("auth/token/verify/", TokenVerifyView.as_view(), name="token-verify"),
+]
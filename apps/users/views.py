@@ -1,3 +1,16 @@
-from django.shortcuts import render
+from rest_framework_simplejwt import views as jwt_views
 
-# Create your views here.
+from apps.users.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+
+
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    """
+    POST /api/v1/auth/token/ {username, password} → {access, refresh}
+    access несёт claims id и is_staff: запросы с Authorization: Bearer <access> не читают User из БД.
+    """
+    serializer_class = TokenObtainPairSerializer
+
+
+class TokenRefreshView(jwt_views.TokenRefreshView):
+    """POST /api/v1/auth/token/refresh/ {refresh} → {access} (is_staff — актуальный)."""
+    serializer_class = TokenRefreshSerializer
@@ -0,0 +1,63 @@
+"""
+Сравнение двух прогонов benchmarks.run:
+
+    python -m benchmarks.compare base.json head.json [--metric p95_ms] [--threshold 10]
+
+Печатает таблицу по сценариям; код возврата 1, если metric какого-либо сценария
+вырос больше чем на threshold % или выросло число запросов к БД.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "queries_mean")
+
+
+def _delta(base: float, head: float) -> float:
+    return (head - base) / base * 100 if base else 0.0
+
+
+def compare(base: dict, head: dict, metric: str, threshold: float) -> tuple:
+    rows, regressions = [], []
+    for name in sorted(set(base["scenarios"]) | set(head["scenarios"])):
+        b, h = base["scenarios"].get(name), head["scenarios"].get(name)
+        if b is None or h is None:
+            rows.append((name, "only in " + ("head" if b is None else "base"), "", "", ""))
+            continue
+        change = _delta(b[metric], h[metric])
+        # для throughput рост — хорошо
+        worse = -change if metric == "throughput_rps" else change
+        flag = ""
+        if worse > threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        if h["queries_mean"] > b["queries_mean"]:
+            flag = (flag + " +queries").strip()
+            regressions.append(name)
+        rows.append((name, f"{b[metric]:.2f}", f"{h[metric]:.2f}", f"{change:+.1f}%", flag))
+    return rows, sorted(set(regressions))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Сравнение результатов benchmarks.run")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--metric", choices=METRICS, default="p95_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="допустимое ухудшение, %%")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as fh:
+        base = json.load(fh)
+    with open(args.head) as fh:
+        head = json.load(fh)
+
+    print(f"{args.metric}: {base['meta']['commit']} → {head['meta']['commit']}")
+    rows, regressions = compare(base, head, args.metric, args.threshold)
+    print(f"{'scenario':<34}{'base':>12}{'head':>12}{'change':>10}  ")
+    for name, b, h, change, flag in rows:
+        print(f"{name:<34}{b:>12}{h:>12}{change:>10}  {flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Микробенчмарк JSON-рендера больших списков: стандартный JSONRenderer DRF против FastJSONRenderer.
+
+    python -m benchmarks.render --items 5000 --repeat 30
+
+Данные — в форме ответов API: products (выход ProductListSerializer: цены строкой),
+orders (даты уже строками DATETIME_FORMAT) и raw (Decimal/datetime — через encoder.default).
+Без БД и HTTP: измеряется только renderer.render; вывод обоих рендеров сверяется побайтно.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from apps.common import renderers  # noqa: E402
+from apps.common.renderers import FastJSONRenderer  # noqa: E402
+
+
+def datasets(items: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    prices = [Decimal(rnd.randint(50, 9_999_999)) / 100 for _ in range(items)]
+    moments = [base + timedelta(seconds=rnd.randint(0, 365 * 86400), microseconds=rnd.randint(0, 999_999)) for _ in range(items)]
+    return {
+        "products": [
+            {"id": i, "name": f"Product {i} — ёлка", "price": str(prices[i]), "category": f"Category {i % 50}"}
+            for i in range(items)
+        ],
+        "orders": [
+            {"id": i, "status": "delivered", "total_price": str(prices[i]),
+             "created_at": moments[i].strftime("%Y-%m-%d %H:%M:%S"), "updated_at": moments[i].strftime("%Y-%m-%d %H:%M:%S")}
+            for i in range(items)
+        ],
+        "raw": [{"id": i, "price": prices[i], "created_at": moments[i]} for i in range(items)],
+    }
+
+
+def measure(renderer, data, repeat: int) -> tuple:
+    timings = []
+    output = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = renderer.render(data, "application/json", {})
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), output
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000, help="элементов в списке")
+    parser.add_argument("--repeat", type=int, default=30, help="повторов рендера (берётся медиана)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="записать результаты в JSON")
+    args = parser.parse_args(argv)
+
+    if renderers.orjson is None:
+        print("orjson не установлен: FastJSONRenderer работает через stdlib, сравнивать нечего")
+
+    results = {}
+    print(f"{'dataset':<10} {'bytes':>10} {'stdlib ms':>10} {'fast ms':>10} {'speedup':>8}")
+    for name, data in datasets(args.items, args.seed).items():
+        std_ms, std_out = measure(JSONRenderer(), data, args.repeat)
+        fast_ms, fast_out = measure(FastJSONRenderer(), data, args.repeat)
+        if std_out != fast_out:
+            raise SystemExit(f"{name}: вывод рендеров отличается")
+        results[name] = {
+            "bytes": len(std_out),
+            "stdlib_ms": round(std_ms, 3),
+            "fast_ms": round(fast_ms, 3),
+            "speedup": round(std_ms / fast_ms, 2) if fast_ms else None,
+        }
+        row = results[name]
+        print(f"{name:<10} {row['bytes']:>10} {row['stdlib_ms']:>10.2f} {row['fast_ms']:>10.2f} {row['speedup']:>7}x")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"items": args.items, "repeat": args.repeat, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
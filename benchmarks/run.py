@@ -0,0 +1,261 @@
+"""
+Бенчмарк горячих эндпоинтов: p50/p95/p99, throughput и число SQL-запросов на запрос.
+
+    python -m benchmarks.run --out benchmarks/results/HEAD.json
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/HEAD.json
+
+Запросы идут через django.test.Client в процессе (без сети): измеряется стек Django/DRF,
+БД и кэш. БД — временный файл SQLite (пересоздаётся), кэш — locmem
+(или memcached: BENCH_CACHE_LOCATION=127.0.0.1:11211).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from apps.catalog.models import Category, Product  # noqa: E402
+
+User = get_user_model()
+
+SIZES = {
+    "small": {"categories": 20, "products": 2_000, "users": 200, "orders": 5_000},
+    "medium": {"categories": 50, "products": 10_000, "users": 1_000, "orders": 50_000},
+}
+
+
+# ---------- измерение ----------
+
+class _QueryCounter:
+    """execute_wrapper: число SQL-запросов текущего потока."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def run_scenario(name: str, make_request, requests: int, concurrency: int = 1, before_each=None, client_factory=None) -> dict:
+    """
+    make_request(client, i) -> response. before_each(i) — вне замера (например, сброс кэша).
+    concurrency > 1 — пул потоков, у каждого свой Client и своё соединение с БД.
+    """
+    latencies, queries, statuses = [], [], {}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = client_factory(i) if client_factory else Client()
+        if before_each:
+            before_each(i)
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            resp = make_request(client, i)
+            elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed * 1000)
+            queries.append(counter.count)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    wall_started = time.perf_counter()
+    if concurrency == 1:
+        for i in range(requests):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(requests)))
+            # соединения потоков пула закрываем сами — иначе SQLite-файл остаётся занятым
+            pool.map(lambda _: connections.close_all(), range(concurrency))
+    wall = time.perf_counter() - wall_started
+
+    ordered = sorted(latencies)
+    result = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "p50_ms": round(_percentile(ordered, 0.50), 3),
+        "p95_ms": round(_percentile(ordered, 0.95), 3),
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "throughput_rps": round(requests / wall, 1),
+        "queries_mean": round(statistics.fmean(queries), 2),
+        "queries_max": max(queries),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+    print(
+        f"{name:<32} p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+        f"p99={result['p99_ms']:>8.2f}ms rps={result['throughput_rps']:>8.1f} "
+        f"q={result['queries_mean']:>5.1f} {result['statuses']}",
+        file=sys.stderr,
+    )
+    return result
+
+
+# ---------- сценарии ----------
+
+def _anon_client(i):
+    # троттлинг анонимов — по IP: у каждого потока свой адрес, чтобы не упираться в 60/min
+    return Client(REMOTE_ADDR=f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}")
+
+
+def scenarios(requests: int, concurrency: int) -> dict:
+    categories = list(Category.objects.values_list("id", flat=True))
+    product_ids = list(Product.objects.filter(is_active=True).order_by("id").values_list("id", flat=True))
+    hot_products = product_ids[:50]
+    buyers = list(User.objects.filter(username__startswith="seed").order_by("id")[:max(concurrency, 1) * 4])
+    admin = User.objects.create_superuser("bench-admin", "admin@example.com", "x")
+    ip = iter(range(1, 10**6))
+
+    def anon(i):
+        return _anon_client(next(ip))
+
+    def logged_in(user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def clear_cache(i):
+        cache.clear()
+
+    def list_filters(i):
+        cat = categories[i % len(categories)]
+        return {"category": cat, "price_min": "10", "price_max": "2500"}
+
+    out = {}
+    out["product_list_miss"] = run_scenario(
+        "product_list_miss", lambda c, i: c.get("/api/v1/products/"),
+        requests=max(requests // 10, 5), before_each=clear_cache, client_factory=anon,
+    )
+    anon(0).get("/api/v1/products/")  # прогрев
+    out["product_list_hit"] = run_scenario(
+        "product_list_hit", lambda c, i: c.get("/api/v1/products/"),
+        requests=requests, concurrency=concurrency, client_factory=anon,
+    )
+    out["product_list_filtered_miss"] = run_scenario(
+        "product_list_filtered_miss", lambda c, i: c.get("/api/v1/products/", list_filters(i)),
+        requests=requests, before_each=clear_cache, client_factory=anon,
+    )
+    out["product_list_search_miss"] = run_scenario(
+        "product_list_search_miss", lambda c, i: c.get("/api/v1/products/", {"search": f"product 0{i % 10}"}),
+        requests=requests, before_each=clear_cache, client_factory=anon,
+    )
+    out["product_detail_miss"] = run_scenario(
+        "product_detail_miss", lambda c, i: c.get(f"/api/v1/products/{product_ids[i % len(product_ids)]}/"),
+        requests=requests, before_each=clear_cache, client_factory=anon,
+    )
+    for pk in hot_products:  # прогрев
+        anon(0).get(f"/api/v1/products/{pk}/")
+    out["product_detail_hit"] = run_scenario(
+        "product_detail_hit", lambda c, i: c.get(f"/api/v1/products/{hot_products[i % len(hot_products)]}/"),
+        requests=requests, concurrency=concurrency, client_factory=anon,
+    )
+
+    def place_order(c, i):
+        items = [{"product_id": hot_products[(i * 7 + k) % len(hot_products)], "quantity": 1} for k in range(3)]
+        return c.post("/api/v1/orders/", {"items": items}, content_type="application/json")
+
+    out["order_create"] = run_scenario(
+        "order_create", place_order, requests=requests, concurrency=concurrency,
+        client_factory=lambda i: logged_in(buyers[i % len(buyers)]),
+    )
+
+    admin_client = logged_in(admin)
+    out["admin_order_list_miss"] = run_scenario(
+        "admin_order_list_miss", lambda c, i: c.get("/api/v1/admin/orders/", {"page": 1 + i % 20}),
+        requests=requests, before_each=clear_cache, client_factory=lambda i: admin_client,
+    )
+    out["admin_order_list_filtered_miss"] = run_scenario(
+        "admin_order_list_filtered_miss",
+        lambda c, i: c.get("/api/v1/admin/orders/", {"status": ["pending", "delivered"][i % 2], "page": 1 + i % 5}),
+        requests=requests, before_each=clear_cache, client_factory=lambda i: admin_client,
+    )
+    admin_client.get("/api/v1/admin/orders/")
+    out["admin_order_list_hit"] = run_scenario(
+        "admin_order_list_hit", lambda c, i: c.get("/api/v1/admin/orders/"),
+        requests=requests, client_factory=lambda i: admin_client,
+    )
+    return out
+
+
+# ---------- прогон ----------
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default="benchmarks/results/latest.json", help="куда записать JSON с результатами")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small", help="объём сгенерированных данных")
+    parser.add_argument("--requests", type=int, default=200, help="запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=8, help="потоков в конкурентных сценариях")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    db_name = Path(settings.DATABASES["default"]["NAME"])
+    if db_name.exists():
+        db_name.unlink()
+    call_command("migrate", verbosity=0, interactive=False)
+    cache.clear()
+    seeded = dict(SIZES[args.size], seed=args.seed)
+    call_command("seed_store", **seeded, stdout=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "cache": settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1],
+            "size": args.size,
+            "data": seeded,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": scenarios(args.requests, args.concurrency),
+    }
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+    print(f"results written to {out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# Настройки для бенчмарков (python -m benchmarks.run): отдельная БД и кэш без внешних сервисов.
+import os
+import tempfile
+
+os.environ.setdefault("SECRET_KEY", "benchmarks-only-not-a-secret")
+os.environ.setdefault("DEBUG", "False")
+
+from online_store.settings import *  # noqa: E402,F401,F403
+
+ALLOWED_HOSTS = ["testserver", "127.0.0.1", "localhost"]
+
+# отдельный файл SQLite (пересоздаётся прогоном); IMMEDIATE — конкурентные POST ждут блокировку,
+# а не падают с "database is locked" при апгрейде read → write
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get("BENCH_DB_NAME", os.path.join(tempfile.gettempdir(), "online_store_bench.sqlite3")),
+        "OPTIONS": {"timeout": 30, "transaction_mode": "IMMEDIATE"},
+    }
+}
+
+# locmem по умолчанию; BENCH_CACHE_LOCATION=127.0.0.1:11211 — локальный memcached
+if os.environ.get("BENCH_CACHE_LOCATION"):
+    CACHES = {
+        "default": {
+            "BACKEND": "apps.common.cache.TimedPyMemcacheCache",
+            "LOCATION": os.environ["BENCH_CACHE_LOCATION"],
+            "TIMEOUT": 300,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "apps.common.cache.TimedLocMemCache",
+            "LOCATION": "benchmarks",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 100000},
+        }
+    }
+
+# брокер не нужен: побочные эффекты заказов идут через outbox, relay в прогоне не запускается
+CELERY_TASK_ALWAYS_EAGER = True
+ORDERS_RECEIPTS_MODE = "lazy"
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+LOGGING = {"version": 1, "disable_existing_loggers": False, "root": {"level": "WARNING"}}
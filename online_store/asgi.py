@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_store.settings')
+# под ASGI каталог отдают нативные async-вьюхи (CATALOG_ASYNC_VIEWS=false — sync DRF)
+os.environ.setdefault('CATALOG_ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
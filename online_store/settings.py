@@ -1,4 +1,6 @@
 import os
+from datetime import timedelta
+from celery.schedules import crontab
 from decouple import config
 from pathlib import Path
 
@@ -38,6 +40,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # первым: в разбивку Server-Timing попадают сессии и аутентификация
+    'apps.common.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,13 +74,34 @@ WSGI_APPLICATION = 'online_store.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# постоянные соединения (сек; 0 — соединение на запрос), отдельно для primary и реплик
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", 0))
+DB_REPLICA_CONN_MAX_AGE = int(os.environ.get("DB_REPLICA_CONN_MAX_AGE", DB_CONN_MAX_AGE))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_MAX_AGE > 0,
     }
 }
 
+# реплики чтения: DB_REPLICAS="db_replica1.sqlite3,db_replica2.sqlite3" → алиасы replica1, replica2...
+# (копии primary; в тестах — зеркала default). Чтения на них — только в apps.common.db_router.replica_reads()
+for _i, _name in enumerate(filter(None, os.environ.get("DB_REPLICAS", "").split(",")), start=1):
+    DATABASES[f"replica{_i}"] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / _name.strip(),
+        'CONN_MAX_AGE': DB_REPLICA_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_REPLICA_CONN_MAX_AGE > 0,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica")]
+DATABASE_ROUTERS = ["apps.common.db_router.ReplicaRouter"]
+# сколько секунд после своей записи читатель закреплён за primary (≥ лага репликации)
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get("DATABASE_REPLICA_PIN_SECONDS", 10))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -97,15 +122,37 @@ AUTH_PASSWORD_VALIDATORS = [
 
 CACHES = {
     'default': {
-        "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
-        #
+        # PyMemcacheCache + замер обращений в фазу "cache" Server-Timing
+        "BACKEND": "apps.common.cache.TimedPyMemcacheCache",
         "LOCATION": "127.0.0.1:11211",
         "TIMEOUT": 300,
     }
 }
 
+# лимит размера значения (байт, после pickle): больше — memcached не примет, считается set_failures
+CACHE_MAX_VALUE_BYTES = int(os.environ.get("CACHE_MAX_VALUE_BYTES", 1024 * 1024))
+
+# Server-Timing: заголовок с разбивкой db/cache/serialize/render (по умолчанию только при DEBUG)
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", str(DEBUG)).lower() in ("true", "1", "yes")
+# запросы дольше порога (мс) логируются warning'ом в "apps.common.timing" с фазами и SQL; 0 — выключено
+SERVER_TIMING_SLOW_MS = float(os.environ.get("SERVER_TIMING_SLOW_MS", 0))
+
+# публичные GET каталога — нативные async-вьюхи (включается в asgi.py; под WSGI — sync DRF)
+CATALOG_ASYNC_VIEWS = os.environ.get("CATALOG_ASYNC_VIEWS", "False").lower() in ("true", "1", "yes")
+
+# JWT: request.user строится из claims access-токена (id, is_staff) без запроса к БД;
+# False — JWTAuthentication с чтением User на каждый запрос
+JWT_STATELESS_USER = os.environ.get("JWT_STATELESS_USER", "True").lower() in ("true", "1", "yes")
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication"
+        if JWT_STATELESS_USER else "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # сессия — admin и browsable API
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.SearchFilter",
@@ -116,6 +163,24 @@ REST_FRAMEWORK = {
         "user": "240/min",  # для аутентифицированных (UserCatalogThrottle)
     },
     "DATETIME_FORMAT": "%Y-%m-%d %H:%M:%S",
+    # JSON через orjson (если установлен), вывод байт-в-байт как у стандартного JSONRenderer
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.common.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "apps.common.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.environ.get("JWT_ACCESS_TOKEN_MINUTES", 5))),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=int(os.environ.get("JWT_REFRESH_TOKEN_DAYS", 1))),
+    "AUTH_HEADER_TYPES": ("Bearer",),
+    # id (int) и is_staff из claims — apps.users.authentication.TokenUser
+    "TOKEN_USER_CLASS": "apps.users.authentication.TokenUser",
 }
 
 SPECTACULAR_SETTINGS = {
@@ -143,6 +208,13 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Покрывающие индексы заказов (Index.include) работают только на PostgreSQL: SQLite include
+# игнорирует и предупреждает models.W040. Глушим только на SQLite (dev/тесты) — на PostgreSQL
+# предупреждение не спрячет проблему в других моделях
+SILENCED_SYSTEM_CHECKS = (
+    ['models.W040'] if any(db['ENGINE'] == 'django.db.backends.sqlite3' for db in DATABASES.values()) else []
+)
+
 # Celery (Redis)
 CELERY_BROKER_URL = "redis://127.0.0.1:6379/0"
 CELERY_RESULT_BACKEND = "redis://127.0.0.1:6379/1"
@@ -151,3 +223,83 @@ CELERY_TASK_TIME_LIMIT = 60
 CELERY_TASK_SOFT_TIME_LIMIT = 50
 CELERY_TASK_DEFAULT_QUEUE = "default"
 CELERY_TASK_IGNORE_RESULT = True
+# метрики задач (apps.common.metrics): как часто процесс воркера сбрасывает их в кэш, сек
+TASK_METRICS_FLUSH_INTERVAL = float(os.environ.get("TASK_METRICS_FLUSH_INTERVAL", 10))
+
+# Заказы: асинхронный приём (202 Accepted + OrderIntent, см. tasks.process_order_intents)
+ORDERS_ASYNC_INTAKE = os.environ.get("ORDERS_ASYNC_INTAKE", 'False').lower() in ('true', '1', 'yes')
+ORDERS_INTAKE_BATCH_SIZE = int(os.environ.get("ORDERS_INTAKE_BATCH_SIZE", 200))
+# Заказы: count в AdminOrderListView — "estimated" (кэш по фильтрам/статистика БД) или "exact"
+ORDERS_ADMIN_COUNT_MODE = os.environ.get("ORDERS_ADMIN_COUNT_MODE", "estimated")
+ORDERS_ADMIN_COUNT_TTL = int(os.environ.get("ORDERS_ADMIN_COUNT_TTL", 300))
+# Заказы: размер пачки потоковой выгрузки /api/v1/admin/orders/export/
+ORDERS_EXPORT_CHUNK_SIZE = int(os.environ.get("ORDERS_EXPORT_CHUNK_SIZE", 2000))
+# Заказы: максимум заказов в одном POST /api/v1/orders/bulk/
+ORDERS_BULK_MAX_ORDERS = int(os.environ.get("ORDERS_BULK_MAX_ORDERS", 500))
+# Заказы: максимум id в одном POST /api/v1/admin/orders/status/
+ORDERS_BULK_STATUS_MAX_IDS = int(os.environ.get("ORDERS_BULK_STATUS_MAX_IDS", 1000))
+# Заказы: архивация завершённых заказов (tasks.archive_finished_orders)
+ORDERS_ARCHIVE_AFTER_DAYS = int(os.environ.get("ORDERS_ARCHIVE_AFTER_DAYS", 90))
+ORDERS_ARCHIVE_BATCH_SIZE = int(os.environ.get("ORDERS_ARCHIVE_BATCH_SIZE", 1000))
+ORDERS_ARCHIVE_DATABASE = os.environ.get("ORDERS_ARCHIVE_DATABASE", "default")
+# Заказы: квитанции PDF — lazy (рендер при первом GET /orders/{id}/receipt/, письмо — задачей
+# на пачку) | task (задача на заказ) | batch (ReceiptJob + tasks.render_pending_receipts);
+# письмо «заказ создан» уходит в любом режиме
+ORDERS_RECEIPTS_MODE = os.environ.get("ORDERS_RECEIPTS_MODE", "lazy")
+ORDERS_RECEIPTS_BATCH_SIZE = int(os.environ.get("ORDERS_RECEIPTS_BATCH_SIZE", 200))
+ORDERS_RECEIPTS_MAX_ATTEMPTS = int(os.environ.get("ORDERS_RECEIPTS_MAX_ATTEMPTS", 3))
+# сколько захваченное задание недоступно другим воркерам (упавший воркер — повтор после)
+ORDERS_RECEIPTS_CLAIM_SECONDS = int(os.environ.get("ORDERS_RECEIPTS_CLAIM_SECONDS", 600))
+# число процессов пула рендера (0 — по числу ядер)
+ORDERS_RECEIPTS_WORKERS = int(os.environ.get("ORDERS_RECEIPTS_WORKERS", 0))
+# отдача PDF веб-сервером: "" (FileResponse) | x-accel-redirect (nginx, internal location
+# с alias на MEDIA_ROOT/order_receipts/) | x-sendfile (Apache mod_xsendfile, lighttpd)
+ORDERS_RECEIPTS_SENDFILE = os.environ.get("ORDERS_RECEIPTS_SENDFILE", "")
+ORDERS_RECEIPTS_ACCEL_PREFIX = os.environ.get("ORDERS_RECEIPTS_ACCEL_PREFIX", "/protected/order_receipts/")
+
+# Заказы: уведомления об отправке во внешний API (apps.orders.notifier)
+ORDERS_NOTIFY_URL = os.environ.get("ORDERS_NOTIFY_URL", "https://jsonplaceholder.typicode.com/posts")
+ORDERS_NOTIFY_CONNECT_TIMEOUT = float(os.environ.get("ORDERS_NOTIFY_CONNECT_TIMEOUT", 2))
+ORDERS_NOTIFY_READ_TIMEOUT = float(os.environ.get("ORDERS_NOTIFY_READ_TIMEOUT", 5))
+# одновременных запросов на процесс (= размер пула соединений)
+ORDERS_NOTIFY_CONCURRENCY = int(os.environ.get("ORDERS_NOTIFY_CONCURRENCY", 16))
+ORDERS_NOTIFY_BATCH_SIZE = int(os.environ.get("ORDERS_NOTIFY_BATCH_SIZE", 200))
+ORDERS_NOTIFY_MAX_ATTEMPTS = int(os.environ.get("ORDERS_NOTIFY_MAX_ATTEMPTS", 4))
+# circuit breaker: ошибок подряд до размыкания и пауза до пробного вызова (сек)
+ORDERS_NOTIFY_BREAKER_THRESHOLD = int(os.environ.get("ORDERS_NOTIFY_BREAKER_THRESHOLD", 5))
+ORDERS_NOTIFY_BREAKER_RESET = float(os.environ.get("ORDERS_NOTIFY_BREAKER_RESET", 30))
+# Заказы: relay transactional outbox (tasks.relay_outbox)
+ORDERS_OUTBOX_BATCH_SIZE = int(os.environ.get("ORDERS_OUTBOX_BATCH_SIZE", 500))
+
+# пакетный рендер — отдельная очередь; её воркер запускается с --pool=solo|threads,
+# чтобы задача могла поднять свой пул процессов
+CELERY_TASK_ROUTES = {
+    "orders.render_pending_receipts": {"queue": "receipts"},
+}
+
+CELERY_BEAT_SCHEDULE = {
+    "orders-relay-outbox": {
+        "task": "orders.relay_outbox",
+        "schedule": 1.0,
+    },
+    "orders-process-intents": {
+        "task": "orders.process_order_intents",
+        "schedule": 1.0,
+    },
+    "orders-render-receipts": {
+        "task": "orders.render_pending_receipts",
+        "schedule": 2.0,
+    },
+    "orders-archive-finished": {
+        "task": "orders.archive_finished_orders",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "orders-verify-totals": {
+        "task": "orders.verify_order_totals",
+        "schedule": crontab(hour=4, minute=30),
+    },
+    "orders-rebuild-sales-rollups": {
+        "task": "orders.rebuild_sales_rollups",
+        "schedule": crontab(hour=3, minute=0),
+    },
+}
@@ -16,4 +16,6 @@ urlpatterns = [
     # бизнес-эндпоинты
     path('api/v1/', include('apps.catalog.urls')),
     path('api/v1/', include('apps.orders.urls')),
+    path('api/v1/', include('apps.common.urls')),
+    path('api/v1/', include('apps.users.urls')),
 ]